@@ -0,0 +1,64 @@
+# Arquivo: calibrar_probabilidade.py (na pasta raiz do projeto)
+
+from pathlib import Path
+
+import pandas as pd
+
+from src.ValidadorNEES.tri.calibracao import (
+    calibrar,
+    dados_calibracao,
+    salvar_calibrador,
+)
+from src.ValidadorNEES.tri.validacao_lote import carregar_parametros_reais
+
+PROJECT_ROOT = Path(__file__).parent
+
+# --- CONFIGURAÇÃO ---
+# Provedor/modelo que gerou os resultados: cada um tem o seu calibrador
+LLM_PROVIDER = "google"
+LLM_MODEL = "gemini-1.5-flash-8b"
+CAMINHO_ITENS = (
+    PROJECT_ROOT / "data" / "01_raw" / "ENEM" / "2022" / "2017_ENUNCIADOS_SEM_IMAGEM.csv"
+)
+CAMINHO_RESULTADOS = (
+    PROJECT_ROOT / "data" / "03_processed" / "resultados_simulacao_2017.csv"
+)
+TIPOS_CALIBRADOR = ("sigmoide", "platt", "isotonica")
+NUM_FOLDS = 5
+SEMENTE = 2017
+CAMINHO_CALIBRADOR = (
+    PROJECT_ROOT
+    / "data"
+    / "03_processed"
+    / f"calibrador_{LLM_PROVIDER}_{LLM_MODEL}.json"
+)
+
+
+def main() -> None:
+    df_real = carregar_parametros_reais(CAMINHO_ITENS)
+    df_resultados = pd.read_csv(CAMINHO_RESULTADOS)
+    p_simulada, p_real = dados_calibracao(df_resultados, df_real)
+    print(f"Calibrando com {len(p_simulada)} itens ({NUM_FOLDS} folds)...")
+
+    resultado = calibrar(
+        p_simulada, p_real, TIPOS_CALIBRADOR, num_folds=NUM_FOLDS, semente=SEMENTE
+    )
+    print("\n--- Validação cruzada (fixo = sigmoide atual) ---")
+    print(resultado.validacao.to_string(index=False))
+
+    salvar_calibrador(
+        resultado.calibrador,
+        CAMINHO_CALIBRADOR,
+        metadados={
+            "provedor": LLM_PROVIDER,
+            "modelo": LLM_MODEL,
+            "num_itens": len(p_simulada),
+            "validacao": resultado.validacao.to_dict(orient="records"),
+        },
+    )
+    print(f"\nCalibrador escolhido: {resultado.calibrador!r}")
+    print(f"Salvo em '{CAMINHO_CALIBRADOR}'.")
+
+
+if __name__ == "__main__":
+    main()
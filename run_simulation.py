@@ -1,25 +1,108 @@
 # Arquivo: run_simulation.py (na pasta raiz do projeto)
 
+import argparse
+import asyncio
+import subprocess
+import sys
 from pathlib import Path
+from typing import Optional
 
+import pandas as pd
 from dotenv import load_dotenv
 
 # Importações do LangChain
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda
 
+from src.ValidadorNEES.core.prova import Prova
+from src.ValidadorNEES.gerador.gerador_desenho import carregar_parametros_previos
 from src.ValidadorNEES.gerador.gerador_prova import GeradorProva
 from src.ValidadorNEES.gerador.gerador_respondentes import GeradorRespondentes
-from src.ValidadorNEES.infraestrutura.provedor_llm import get_llm
+from src.ValidadorNEES.infraestrutura.cache_respostas import (
+    CacheCandidatos,
+    CacheRespostas,
+    envolver_com_cache,
+)
+from src.ValidadorNEES.infraestrutura.controle_concorrencia import (
+    ControladorConcorrencia,
+    PoliticaRetentativa,
+)
+from src.ValidadorNEES.infraestrutura.limitador_taxa import LimitadorTaxa
+from src.ValidadorNEES.infraestrutura.provedor_llm import (
+    RoteadorLLM,
+    criar_endpoint,
+    get_llm,
+    get_parametros_logprobs,
+    identificar_llm,
+)
+from src.ValidadorNEES.simulador.amostragem_sequencial import MonitorPrecisao
+from src.ValidadorNEES.simulador.amostrador_logprobs import AmostradorLogprobs
+from src.ValidadorNEES.simulador.fragmentacao import (
+    Fragmento,
+    criar_fragmentos,
+    juntar_fragmentos,
+)
+from src.ValidadorNEES.simulador.registro_respostas import RegistroRespostas
+from src.ValidadorNEES.simulador.respostas_estruturadas import RespostasProva
 from src.ValidadorNEES.simulador.simulador import Simulador
+from src.ValidadorNEES.tri.cat import MotorCAT
+from src.ValidadorNEES.tri.estimador_online import EstimadorOnline
 
 load_dotenv()
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent
-LLM_PROVIDER = "google"
+LLM_PROVIDER = "google"  # "mock" simula as respostas localmente via 3PL (sem rede)
 LLM_MODEL = "gemini-1.5-flash-8b"
+# Pool de chaves/provedores para o RoteadorLLM (vazio = apenas LLM_PROVIDER/LLM_MODEL).
+# Ex: [{"provider": "google", "model_name": LLM_MODEL,
+#       "api_key": os.getenv("GOOGLE_API_KEY_2"), "requisicoes_por_minuto": 4000}]
+ENDPOINTS_LLM = []
 NUM_RESPONDENTES = 500
+# Semente da população: necessária para retomar uma execução a partir do registro
+SEMENTE_POPULACAO = 2017
+# Semente da execução fragmentada: cada fragmento recebe uma semente derivada dela
+# (ver --num-fragmentos e --fragmento abaixo)
+SEMENTE_EXECUCAO = 2017
+
+# Modo de execução do simulador:
+#   "sincrono"   -> lotes com pausa fixa (Simulador.executar)
+#   "assincrono" -> requisições em voo limitadas por RPM/TPM (Simulador.executar_async)
+#   "agrupado"   -> um prompt por (nível da persona, item), com k candidatos por
+#                   requisição (Simulador.executar_agrupado)
+#   "logprobs"   -> uma distribuição A–E por (nível da persona, item), com respostas
+#                   sorteadas localmente (Simulador.executar_logprobs; exige
+#                   provedor com logprobs, ex: "openai")
+#   "prova"      -> todos os itens (ou blocos) em uma requisição por respondente,
+#                   com saída estruturada (Simulador.executar_prova_inteira)
+#   "sequencial" -> para de chamar a LLM para um item/nível assim que a proporção
+#                   de acerto atinge a precisão desejada (Simulador.executar_sequencial)
+#   "cat"        -> teste adaptativo: itens escolhidos um a um pela habilidade
+#                   provisória (Simulador.executar_cat; exige CAMINHO_PARAMETROS_ITENS)
+MODO_EXECUCAO = "assincrono"
+# Requisições em voo e cota do provedor (None = sem limite)
+MAX_REQUISICOES_EM_VOO = 45
+LIMITE_REQUISICOES_POR_MINUTO = 4000
+LIMITE_TOKENS_POR_MINUTO = 4_000_000
+# Concorrência adaptativa (AIMD): cresce com sucessos e recua em 429/timeout.
+# Opcional: ligada, MAX_REQUISICOES_EM_VOO é ignorado e as requisições em voo
+# vão de CONCORRENCIA_INICIAL até CONCORRENCIA_MAXIMA.
+CONCORRENCIA_ADAPTATIVA = False
+CONCORRENCIA_INICIAL = 8
+CONCORRENCIA_MAXIMA = 256
+MAX_TENTATIVAS = 6
+# Modo "logprobs": tokens mais prováveis consultados e semente do sorteio local
+TOP_LOGPROBS = 20
+SEMENTE_AMOSTRAGEM = 2017
+# Modo "prova": itens por requisição (None = prova inteira)
+ITENS_POR_REQUISICAO = None
+# Modo "sequencial": largura máxima do IC (95%) da proporção de acerto por item/nível
+LARGURA_IC_ALVO = 0.10
+# Modo "cat": erro padrão que encerra o teste e orçamento de itens por aluno
+ERRO_PADRAO_ALVO_CAT = 0.3
+MAX_ITENS_CAT = 15
+# Estimativas online de A/B/% de acerto exibidas a cada N respostas (None = desligado)
+ESTIMATIVAS_ONLINE_A_CADA = 5000
 CAMINHO_PROVA = (
     PROJECT_ROOT
     / "data"
@@ -28,12 +111,30 @@ CAMINHO_PROVA = (
     / "2022"
     / "2017_ENUNCIADOS_SEM_IMAGEM.csv"
 )
+# Parâmetros prévios dos itens (NU_PARAM_A/B/C), usados pelo modo "cat"
+CAMINHO_PARAMETROS_ITENS = (
+    PROJECT_ROOT / "data" / "01_raw" / "ENEM" / "2022" / "itens_prova_2017.csv"
+)
 CAMINHO_HABILIDADES = (
     PROJECT_ROOT / "data" / "01_raw" / "ENEM" / "2022" / "habilidades_alunos.csv"
 )
 CAMINHO_SAIDA_RESULTADOS = (
     PROJECT_ROOT / "data" / "03_processed" / "resultados_simulacao_2017.csv"
 )
+CAMINHO_DISTRIBUICOES = (
+    PROJECT_ROOT / "data" / "03_processed" / "distribuicoes_logprobs_2017.json"
+)
+# Cache (SQLite) das respostas da LLM, reaproveitado entre execuções.
+# Com MODO_REPLAY, só usa respostas já em cache (nenhuma chamada à LLM).
+USAR_CACHE_RESPOSTAS = True
+MODO_REPLAY = False
+MAX_ENTRADAS_CACHE = None
+CAMINHO_CACHE_RESPOSTAS = PROJECT_ROOT / "data" / "03_processed" / "cache_respostas.sqlite"
+# Log (JSONL) com cada resposta concluída, um por MODO_EXECUCAO (ex:
+# registro_simulacao_2017.cat.jsonl); apague-o para começar do zero
+CAMINHO_REGISTRO_RESPOSTAS = (
+    PROJECT_ROOT / "data" / "03_processed" / "registro_simulacao_2017.jsonl"
+)
 
 
 # para organizar a cadeia no Runnable
@@ -44,40 +145,327 @@ def criar_lista_de_mensagens(inputs: dict) -> list:
     return [respondente.get_system_message(), item.get_human_message()]
 
 
-# orquestrador das chamadas de funções
-def main():
-    print("--- INICIANDO SIMULAÇÃO TRI COM LLM (VERSÃO OTIMIZADA) ---")
-
-    print("1. Configurando LLM e montando a cadeia LangChain...")
-    llm = get_llm(provider=LLM_PROVIDER, model_name=LLM_MODEL, temperature=1.0)
-
-    responder_chain = RunnableLambda(criar_lista_de_mensagens) | llm | StrOutputParser()
+def criar_mensagens_prova(inputs: dict) -> list:
+    """Função que conecta a persona do Respondente com um bloco de itens da Prova."""
+    respondente = inputs["respondente"]
+    itens = inputs["itens"]
+    return [respondente.get_system_message(), Prova(itens=itens).get_human_message()]
 
-    print("2. Gerando população e carregando a prova...")
 
+def carregar_populacao_e_prova():
     gerador_populacao = GeradorRespondentes(
         caminho_habilidades=str(CAMINHO_HABILIDADES)
     )
-    populacao = gerador_populacao.gerar_respondentes(numero_de_alunos=NUM_RESPONDENTES)
+    populacao = gerador_populacao.gerar_respondentes(
+        numero_de_alunos=NUM_RESPONDENTES, semente=SEMENTE_POPULACAO
+    )
 
     gerador_prova = GeradorProva(caminho_prova=str(CAMINHO_PROVA))
     prova = gerador_prova.carregar_prova_ingles()
+    return populacao, prova
+
+
+# orquestrador das chamadas de funções
+def imprimir_estimativas(parametros: pd.DataFrame) -> None:
+    """Resumo de um snapshot do `EstimadorOnline` durante a simulação."""
+    estimados = parametros.dropna(subset=["A", "B"])
+    print(
+        f"\n[estimativas online] {int(parametros['N'].sum())} respostas, "
+        f"{len(estimados)}/{len(parametros)} itens estimados | "
+        f"A mediano {estimados['A'].median():.2f}, "
+        f"B mediano {estimados['B'].median():.2f}, "
+        f"% de acerto média {parametros['PROB_ACERTO'].mean():.2f}"
+    )
+
+
+def main(fragmento: Optional[Fragmento] = None):
+    print("--- INICIANDO SIMULAÇÃO TRI COM LLM (VERSÃO OTIMIZADA) ---")
+
+    print("1. Gerando população e carregando a prova...")
+    populacao, prova = carregar_populacao_e_prova()
+
+    # Em uma execução fragmentada, cada fragmento simula parte dos respondentes,
+    # com semente e arquivos de saída próprios
+    caminho_resultados = CAMINHO_SAIDA_RESULTADOS
+    # Um registro por modo: respostas da grade completa não são uma aplicação
+    # CAT (e vice-versa)
+    caminho_registro = CAMINHO_REGISTRO_RESPOSTAS.with_name(
+        f"{CAMINHO_REGISTRO_RESPOSTAS.stem}.{MODO_EXECUCAO}"
+        f"{CAMINHO_REGISTRO_RESPOSTAS.suffix}"
+    )
+    caminho_distribuicoes = CAMINHO_DISTRIBUICOES
+    semente_amostragem = SEMENTE_AMOSTRAGEM
+    if fragmento is not None:
+        print(f"   Executando {fragmento!r}")
+        populacao = fragmento.selecionar(populacao)
+        caminho_resultados = fragmento.caminho(CAMINHO_SAIDA_RESULTADOS)
+        caminho_registro = fragmento.caminho(caminho_registro)
+        caminho_distribuicoes = fragmento.caminho(CAMINHO_DISTRIBUICOES)
+        semente_amostragem = fragmento.semente
+
+    print("2. Configurando LLM e montando a cadeia LangChain...")
+    if ENDPOINTS_LLM:
+        endpoints = [
+            criar_endpoint(
+                temperature=1.0,
+                **({"itens": prova.itens} if config["provider"] == "mock" else {}),
+                **config,
+            )
+            for config in ENDPOINTS_LLM
+        ]
+        llm = RoteadorLLM(endpoints=endpoints)
+    else:
+        kwargs_llm = {"itens": prova.itens} if LLM_PROVIDER == "mock" else {}
+        if LLM_PROVIDER == "mock":
+            kwargs_llm["semente"] = semente_amostragem
+        llm = get_llm(
+            provider=LLM_PROVIDER, model_name=LLM_MODEL, temperature=1.0, **kwargs_llm
+        )
+
+    responder_chain = RunnableLambda(criar_lista_de_mensagens) | llm | StrOutputParser()
+    cache_respostas = None
+    cache_candidatos = None
+    if USAR_CACHE_RESPOSTAS:
+        cache_respostas = CacheRespostas(
+            CAMINHO_CACHE_RESPOSTAS,
+            max_entradas=MAX_ENTRADAS_CACHE,
+            somente_leitura=MODO_REPLAY,
+        )
+        # A chave usa o provedor e o modelo em uso (com a semente, no mock, e
+        # todos os endpoints, no roteador), nunca apenas LLM_MODEL
+        responder_chain = envolver_com_cache(
+            responder_chain, cache_respostas, modelo=identificar_llm(llm), temperatura=1.0
+        )
+        # O modo "agrupado" pede os candidatos direto ao modelo, fora da cadeia
+        cache_candidatos = CacheCandidatos(
+            cache_respostas, modelo=identificar_llm(llm), temperatura=1.0
+        )
 
     # EXECUÇÃO DA SIMULAÇÃO
     print(
         f"3. Iniciando a simulação para {len(populacao)} alunos e {len(prova.itens)} itens..."
     )
-    simulador = Simulador(responder_chain=responder_chain)
-    df_resultados = simulador.executar(prova, populacao)
+    controlador = (
+        ControladorConcorrencia(
+            inicial=CONCORRENCIA_INICIAL, maximo=CONCORRENCIA_MAXIMA
+        )
+        if CONCORRENCIA_ADAPTATIVA
+        else None
+    )
+    if controlador is not None:
+        print(
+            f"   Concorrência adaptativa: {CONCORRENCIA_INICIAL} a {CONCORRENCIA_MAXIMA} "
+            f"requisições em voo (MAX_REQUISICOES_EM_VOO={MAX_REQUISICOES_EM_VOO} ignorado)"
+        )
+    else:
+        print(f"   Concorrência fixa: até {MAX_REQUISICOES_EM_VOO} requisições em voo")
+    estimador_online = None
+    if ESTIMATIVAS_ONLINE_A_CADA is not None:
+        estimador_online = EstimadorOnline(
+            a_cada=ESTIMATIVAS_ONLINE_A_CADA, ao_atualizar=imprimir_estimativas
+        )
+    simulador = Simulador(
+        responder_chain=responder_chain,
+        politica_retentativa=PoliticaRetentativa(max_tentativas=MAX_TENTATIVAS),
+        controlador=controlador,
+        estimador_online=estimador_online,
+    )
+    registro = RegistroRespostas(caminho_registro)
+    limitador = LimitadorTaxa(
+        requisicoes_por_minuto=LIMITE_REQUISICOES_POR_MINUTO,
+        tokens_por_minuto=LIMITE_TOKENS_POR_MINUTO,
+    )
+    if MODO_EXECUCAO == "assincrono":
+        df_resultados = asyncio.run(
+            simulador.executar_async(
+                prova,
+                populacao,
+                max_em_voo=MAX_REQUISICOES_EM_VOO,
+                limitador=limitador,
+                registro=registro,
+            )
+        )
+    elif MODO_EXECUCAO == "agrupado":
+        df_resultados = asyncio.run(
+            simulador.executar_agrupado(
+                prova,
+                populacao,
+                llm_candidatos=llm,
+                max_em_voo=MAX_REQUISICOES_EM_VOO,
+                limitador=limitador,
+                registro=registro,
+                cache_candidatos=cache_candidatos,
+            )
+        )
+    elif MODO_EXECUCAO == "logprobs":
+        # Mesma cadeia, mas sem o StrOutputParser: precisamos da mensagem com logprobs
+        logprobs_chain = RunnableLambda(criar_lista_de_mensagens) | llm.bind(
+            **get_parametros_logprobs(llm, top_k=TOP_LOGPROBS)
+        )
+        amostrador = AmostradorLogprobs(logprobs_chain, semente=semente_amostragem)
+        amostrador.carregar(caminho_distribuicoes)
+        df_resultados = asyncio.run(
+            simulador.executar_logprobs(
+                prova,
+                populacao,
+                amostrador,
+                max_em_voo=MAX_REQUISICOES_EM_VOO,
+                limitador=limitador,
+                registro=registro,
+            )
+        )
+        amostrador.salvar(caminho_distribuicoes)
+    elif MODO_EXECUCAO == "sequencial":
+        monitor = MonitorPrecisao(largura_alvo=LARGURA_IC_ALVO)
+        df_resultados = asyncio.run(
+            simulador.executar_sequencial(
+                prova,
+                populacao,
+                monitor,
+                max_em_voo=MAX_REQUISICOES_EM_VOO,
+                limitador=limitador,
+                registro=registro,
+            )
+        )
+    elif MODO_EXECUCAO == "cat":
+        ids_prova = {item.id_item for item in prova.itens}
+        parametros_itens = {
+            item_id: parametros
+            for item_id, parametros in carregar_parametros_previos(
+                str(CAMINHO_PARAMETROS_ITENS)
+            ).items()
+            if item_id in ids_prova
+        }
+        motor = MotorCAT(
+            parametros_itens,
+            erro_padrao_alvo=ERRO_PADRAO_ALVO_CAT,
+            max_itens=MAX_ITENS_CAT,
+            k_aleatorio=3,
+            semente=semente_amostragem,
+        )
+        df_resultados = asyncio.run(
+            simulador.executar_cat(
+                prova,
+                populacao,
+                motor,
+                max_em_voo=MAX_REQUISICOES_EM_VOO,
+                limitador=limitador,
+                registro=registro,
+            )
+        )
+    elif MODO_EXECUCAO == "prova":
+        prova_chain = RunnableLambda(
+            criar_mensagens_prova
+        ) | llm.with_structured_output(RespostasProva)
+        df_resultados = asyncio.run(
+            simulador.executar_prova_inteira(
+                prova,
+                populacao,
+                prova_chain,
+                itens_por_requisicao=ITENS_POR_REQUISICAO,
+                max_em_voo=MAX_REQUISICOES_EM_VOO,
+                limitador=limitador,
+                registro=registro,
+            )
+        )
+    else:
+        df_resultados = simulador.executar(prova, populacao, registro=registro)
+
+    if cache_respostas is not None:
+        print(f"\nCache de respostas: {cache_respostas.estatisticas()}")
+        cache_respostas.fechar()
+    if isinstance(llm, RoteadorLLM):
+        print("\nUso dos endpoints:")
+        print(llm.estatisticas().to_string(index=False))
 
     # SALVANDO RESULTADOS
     print(f"\n4. Simulação concluída. Foram geradas {len(df_resultados)} respostas.")
-    CAMINHO_SAIDA_RESULTADOS.parent.mkdir(parents=True, exist_ok=True)
-    df_resultados.to_csv(CAMINHO_SAIDA_RESULTADOS, index=False)
-    print(f"Resultados salvos com sucesso em: {CAMINHO_SAIDA_RESULTADOS}")
+    caminho_resultados.parent.mkdir(parents=True, exist_ok=True)
+    df_resultados.to_csv(caminho_resultados, index=False)
+    print(f"Resultados salvos com sucesso em: {caminho_resultados}")
     print("\nAmostra dos resultados:")
     print(df_resultados.head())
 
 
+def juntar(num_fragmentos: int):
+    """Junta os resultados dos fragmentos, verificando a cobertura da grade."""
+    print(f"--- JUNTANDO {num_fragmentos} FRAGMENTOS ---")
+    populacao, prova = carregar_populacao_e_prova()
+    fragmentos = criar_fragmentos(SEMENTE_EXECUCAO, num_fragmentos)
+
+    df_resultados = juntar_fragmentos(
+        [fragmento.caminho(CAMINHO_SAIDA_RESULTADOS) for fragmento in fragmentos],
+        populacao,
+        prova.itens,
+    )
+    df_resultados.to_csv(CAMINHO_SAIDA_RESULTADOS, index=False)
+    print(
+        f"{len(df_resultados)} respostas de {num_fragmentos} fragmentos salvas em: "
+        f"{CAMINHO_SAIDA_RESULTADOS}"
+    )
+
+
+def executar_fragmentos_locais(num_fragmentos: int):
+    """Executa cada fragmento em um processo local e junta os resultados."""
+    processos = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                __file__,
+                "--num-fragmentos",
+                str(num_fragmentos),
+                "--fragmento",
+                str(indice),
+            ]
+        )
+        for indice in range(num_fragmentos)
+    ]
+    codigos = [processo.wait() for processo in processos]
+    if any(codigos):
+        raise SystemExit(f"Fragmentos com erro (códigos de saída): {codigos}")
+
+    juntar(num_fragmentos)
+
+
+def ler_argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulação TRI com LLM.")
+    parser.add_argument(
+        "--num-fragmentos",
+        type=int,
+        default=1,
+        help="Divide a grade (respondente x item) em N fragmentos independentes.",
+    )
+    parser.add_argument(
+        "--fragmento",
+        type=int,
+        default=None,
+        help="Executa apenas o fragmento de índice informado (0 a N-1).",
+    )
+    parser.add_argument(
+        "--juntar",
+        action="store_true",
+        help="Junta os resultados dos N fragmentos já executados.",
+    )
+    parser.add_argument(
+        "--processos-locais",
+        action="store_true",
+        help="Executa os N fragmentos como processos locais e junta os resultados.",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    argumentos = ler_argumentos()
+
+    if argumentos.juntar:
+        juntar(argumentos.num_fragmentos)
+    elif argumentos.processos_locais:
+        executar_fragmentos_locais(argumentos.num_fragmentos)
+    elif argumentos.fragmento is not None:
+        main(
+            criar_fragmentos(SEMENTE_EXECUCAO, argumentos.num_fragmentos)[
+                argumentos.fragmento
+            ]
+        )
+    else:
+        main()
@@ -0,0 +1,112 @@
+import copy
+import hashlib
+import json
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Sequence, Tuple, TypeVar
+
+from langchain_core.messages import BaseMessage
+
+if TYPE_CHECKING:
+    from .item import Item
+    from .respondente import Respondente
+
+M = TypeVar("M", bound=BaseMessage)
+
+
+def assinatura_mensagens(mensagens: Sequence[BaseMessage]) -> str:
+    """
+    Retorna um hash SHA-256 estável (entre processos e execuções) do tipo e do
+    conteúdo das mensagens. Qualquer mudança no texto dos prompts muda o hash.
+    """
+    serializado = json.dumps(
+        [[mensagem.type, mensagem.content] for mensagem in mensagens],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+
+
+class CacheMensagens:
+    """
+    Cache das mensagens de prompt já montadas, compartilhado por todos os
+    respondentes e itens do processo.
+
+    A mensagem de sistema depende apenas do nível da persona (7 níveis) e a
+    mensagem humana apenas do item, então cada uma é montada uma única vez. Cada
+    chamada recebe uma cópia da mensagem guardada, de modo que modificar a
+    mensagem devolvida não afeta as demais requisições.
+
+    Os templates vivem no código (`Respondente._montar_system_message` e
+    `Item._montar_human_message`); ao alterá-los em tempo de execução, chame
+    `invalidar()`. Caches persistidos devem usar `chave_prompt`, que é um hash
+    do conteúdo e, portanto, muda junto com os templates.
+    """
+
+    def __init__(self) -> None:
+        self._mensagens: Dict[Hashable, BaseMessage] = {}
+        self._chaves: Dict[Tuple[Hashable, Hashable], str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._mensagens)
+
+    def __repr__(self) -> str:
+        return f"CacheMensagens(mensagens={len(self._mensagens)})"
+
+    def obter(self, chave: Hashable, montar: Callable[[], M]) -> M:
+        """
+        Retorna uma cópia da mensagem associada a `chave`, montando-a com
+        `montar` apenas na primeira vez.
+        """
+        mensagem = self._mensagens.get(chave)
+        if mensagem is None:
+            mensagem = montar()
+            with self._lock:
+                # Se outra thread montou antes, mantém a primeira instância
+                mensagem = self._mensagens.setdefault(chave, mensagem)
+        # Só o conteúdo (lista de partes texto/imagem) é mutável; os textos não
+        # são copiados
+        return mensagem.model_copy(  # type: ignore[return-value]
+            update={"content": copy.deepcopy(mensagem.content)}
+        )
+
+    def chave_prompt(
+        self,
+        chave_sistema: Hashable,
+        chave_humana: Hashable,
+        mensagens: Callable[[], Sequence[BaseMessage]],
+    ) -> str:
+        """
+        Retorna o hash estável do prompt (sistema + humana), calculado uma vez
+        por par de chaves.
+        """
+        par = (chave_sistema, chave_humana)
+        chave = self._chaves.get(par)
+        if chave is None:
+            chave = assinatura_mensagens(mensagens())
+            with self._lock:
+                self._chaves[par] = chave
+        return chave
+
+    def invalidar(self) -> None:
+        """Descarta todas as mensagens e chaves (ex: após alterar um template)."""
+        with self._lock:
+            self._mensagens.clear()
+            self._chaves.clear()
+
+
+# Cache único do processo, usado por `Respondente` e `Item`
+CACHE_MENSAGENS = CacheMensagens()
+
+
+def chave_prompt(respondente: "Respondente", item: "Item") -> str:
+    """
+    Hash estável do prompt enviado para o par (respondente, item). Depende apenas
+    do nível da persona e do conteúdo do item, sendo a chave natural para cache
+    e deduplicação de respostas.
+    """
+    return CACHE_MENSAGENS.chave_prompt(
+        respondente.get_chave_mensagem(),
+        item.get_chave_mensagem(),
+        lambda: [respondente.get_system_message(), item.get_human_message()],
+    )
@@ -1,7 +1,21 @@
-from typing import List
+from typing import Any, Hashable, List, Optional
 
 from langchain_core.messages import HumanMessage
 
+from .cache_mensagens import CACHE_MENSAGENS
+
+
+# Atributos que entram no prompt e, portanto, na chave da mensagem
+_CAMPOS_PROMPT = frozenset(
+    {
+        "id_item",
+        "tx_enunciado",
+        "arquivos_enunciado",
+        "tx_introducao_alternativas",
+        "tx_alternativas",
+    }
+)
+
 
 class Item:
     """
@@ -47,6 +61,7 @@ class Item:
             gabarito (str): A resposta correta do item
         """
 
+        self._chave_mensagem: Optional[Hashable] = None
         self.id_item = id_item
         self.co_posicao = co_posicao
         self.ano = ano
@@ -56,6 +71,12 @@ class Item:
         self.tx_alternativas = tx_alternativas
         self.gabarito = gabarito
 
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        # Reatribuir um campo do prompt descarta a chave calculada
+        if nome in _CAMPOS_PROMPT:
+            object.__setattr__(self, "_chave_mensagem", None)
+        object.__setattr__(self, nome, valor)
+
     def __repr__(self) -> str:
         """
         Retorna uma representação em string do objeto Item, útil para depuração.
@@ -71,12 +92,40 @@ class Item:
             f"gabarito={self.gabarito!r})"
         )
 
+    def get_chave_mensagem(self) -> Hashable:
+        """
+        Chave da mensagem humana no `CACHE_MENSAGENS`. Inclui todo o conteúdo usado
+        no prompt, de modo que alterar o item gera uma nova mensagem.
+
+        A chave é calculada uma vez e recalculada só quando um campo do prompt é
+        reatribuído; as listas (`arquivos_enunciado`, `tx_alternativas`) devem
+        ser substituídas, não modificadas no lugar.
+        """
+        if self._chave_mensagem is None:
+            self._chave_mensagem = (
+                "item",
+                self.id_item,
+                self.tx_enunciado,
+                tuple(self.arquivos_enunciado),
+                self.tx_introducao_alternativas,
+                tuple(self.tx_alternativas),
+            )
+        return self._chave_mensagem
+
     def get_human_message(self) -> HumanMessage:
         """
         Retorna um objeto langchain_core.messages.human.HumanMessage contendo o enunciado
         da questão e o link para as imagens para a LLM processar o prompt e retornar uma
         resposta.
+
+        A mensagem é montada uma vez por item (ver `CacheMensagens`) e cada
+        chamada recebe uma cópia.
         """
+        return CACHE_MENSAGENS.obter(
+            self.get_chave_mensagem(), self._montar_human_message
+        )
+
+    def _montar_human_message(self) -> HumanMessage:
         content = []
 
         # Enunciado da questão
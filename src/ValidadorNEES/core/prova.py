@@ -1,4 +1,6 @@
-from typing import List
+from typing import List, Optional
+
+from langchain_core.messages import HumanMessage
 
 from .item import Item
 
@@ -13,3 +15,30 @@ class Prova:
 
     def __init__(self, itens: List[Item]) -> None:
         self.itens = itens
+
+    def get_human_message(self, itens: Optional[List[Item]] = None) -> HumanMessage:
+        """
+        Retorna um único objeto langchain_core.messages.HumanMessage com várias
+        questões da prova (todas, se `itens` for None), para que a LLM responda a
+        todas em uma só requisição.
+
+        Cada questão é precedida pelo seu identificador (item_id), que deve ser
+        usado pela LLM na resposta estruturada.
+        """
+        itens = self.itens if itens is None else itens
+
+        content: List = [
+            {
+                "type": "text",
+                "text": (
+                    "Responda a cada uma das questões abaixo. Para cada questão, "
+                    "informe o item_id indicado e a letra escolhida (A, B, C, D ou E)."
+                ),
+            }
+        ]
+
+        for item in itens:
+            content.append({"type": "text", "text": f"Questão item_id={item.id_item}"})
+            content.extend(item.get_human_message().content)
+
+        return HumanMessage(content=content)
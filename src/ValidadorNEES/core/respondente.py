@@ -1,7 +1,10 @@
 import textwrap
+from typing import Final, Hashable, Tuple
 
 from langchain_core.messages import SystemMessage
 
+from .cache_mensagens import CACHE_MENSAGENS
+
 
 class Respondente:
     """
@@ -15,6 +18,18 @@ class Respondente:
         habilidade (float): Habilidade do aluno
     """
 
+    # Limites superiores (em theta - 0.8) de cada um dos 7 níveis da persona
+    LIMITES_NIVEIS: Final[Tuple[float, ...]] = (-2.0, -1.25, -0.5, 0.5, 1.25, 2.0)
+    NOMES_NIVEIS: Final[Tuple[str, ...]] = (
+        "Muito Baixo (Elementar)",
+        "Baixo (Básico)",
+        "Médio-Baixo (Em Desenvolvimento)",
+        "Médio (Regular)",
+        "Médio-Alto (Consistente)",
+        "Alto (Proficiente)",
+        "Muito Alto (Avançado)",
+    )
+
     def __init__(self, id: int, habilidade: float) -> None:
         self.id = id
         self.habilidade = habilidade
@@ -26,6 +41,33 @@ class Respondente:
         # Formata a string para ser informativa e parecer código Python
         return f"Respondente(id={self.id}, habilidade={self.habilidade:.2f})"
 
+    def get_nivel(self) -> int:
+        """
+        Retorna o índice (0 a 6) do nível de habilidade usado na persona.
+
+        O prompt de sistema depende apenas deste nível, então dois respondentes
+        no mesmo nível recebem exatamente a mesma mensagem de sistema.
+        """
+        theta = self.habilidade - 0.8
+
+        for nivel, limite in enumerate(self.LIMITES_NIVEIS):
+            if theta <= limite:
+                return nivel
+
+        return len(self.LIMITES_NIVEIS)
+
+    @classmethod
+    def get_habilidade_central(cls, nivel: int) -> float:
+        """
+        Retorna uma habilidade (theta) representativa do nível informado: o ponto
+        médio da faixa, considerando habilidades limitadas ao intervalo [-3, 3].
+        """
+        limites = (-3.0 - 0.8,) + cls.LIMITES_NIVEIS + (3.0 - 0.8,)
+        if not 0 <= nivel < len(limites) - 1:
+            raise ValueError(f"Nível de habilidade inválido: {nivel}")
+
+        return (limites[nivel] + limites[nivel + 1]) / 2 + 0.8
+
     def _get_habilidade(self) -> str:
         """
         Classifica a habilidade (theta) do aluno em 7 níveis detalhados,
@@ -34,27 +76,12 @@ class Respondente:
         As faixas foram definidas para refletir a concentração de alunos
         em torno da média (0), com menos alunos nos extremos.
         """
-        theta = self.habilidade - 0.8
-
-        if theta <= -2.0:
-            return "Muito Baixo (Elementar)"
-        elif theta <= -1.25:
-            return "Baixo (Básico)"
-        elif theta <= -0.5:
-            return "Médio-Baixo (Em Desenvolvimento)"
-        elif theta <= 0.5:
-            return "Médio (Regular)"
-        elif theta <= 1.25:
-            return "Médio-Alto (Consistente)"
-        elif theta <= 2.0:
-            return "Alto (Proficiente)"
-        else:
-            return "Muito Alto (Avançado)"
+        return self.NOMES_NIVEIS[self.get_nivel()]
 
     def _get_descricao_perfil(self) -> str:
-        theta = self.habilidade - 0.8
+        nivel = self.get_nivel()
 
-        if theta <= -2.0:
+        if nivel == 0:
             return """
         Nível: Theta Muito Baixo (Elementar)
         Compreensão: Extremamente limitada ou nula. O aluno não consegue extrair o sentido geral do texto. A leitura é fragmentada e focada em palavras isoladas.
@@ -63,7 +90,7 @@ class Respondente:
 
         Desempenho Esperado: Acertos no nível da sorte (ou abaixo). Não há um padrão de acerto em nenhum tipo de questão."""
 
-        elif theta <= -1.25:
+        elif nivel == 1:
             return """
         Nível: Theta Baixo (Básico)
         Compreensão: Muito limitada. Consegue identificar palavras-chave e informações explícitas e localizadas, mas não conecta as ideias para formar um sentido completo.
@@ -73,7 +100,7 @@ class Respondente:
         Desempenho Esperado: Acerta apenas as questões mais fáceis, que exigem localizar informação explícita e direta.
             """
 
-        elif theta <= -0.5:
+        elif nivel == 2:
             return """
         Nível 3: Theta Médio-Baixo (Em Desenvolvimento)
         Compreensão: Consegue captar o tema central ou o assunto principal do texto, mas de forma vaga.
@@ -82,7 +109,7 @@ class Respondente:
 
         Desempenho Esperado: Acerta questões fáceis com alguma consistência, mas erra a grande maioria das questões de dificuldade média.
             """
-        elif theta <= 0.5:
+        elif nivel == 3:
             return """
         Nível 4: Theta Médio (Regular)
         Compreensão: Entende bem o texto e a maioria das relações entre suas partes.
@@ -91,7 +118,7 @@ class Respondente:
 
         Desempenho Esperado: Costuma acertar questões fáceis e uma boa parte das médias. Raramente acerta questões difíceis.
             """
-        elif theta <= 1.25:
+        elif nivel == 4:
             return """
         Nível 5: Theta Médio-Alto (Consistente)
         Compreensão: Lê de forma proficiente, compreendendo nuances, ironias e informações implícitas.
@@ -100,7 +127,7 @@ class Respondente:
 
         Desempenho Esperado: Acerta com facilidade as questões fáceis e médias. Começa a ter algum sucesso nas questões difíceis, mas de forma inconsistente.
             """
-        elif theta <= 2.0:
+        elif nivel == 5:
             return """
         Nível: Theta Alto (Proficiente)
         Compreensão: Completa e detalhada. Domina a interpretação textual.
@@ -119,12 +146,23 @@ class Respondente:
         Desempenho Esperado: Alto índice de acerto em todos os níveis de dificuldade, incluindo as questões mais difíceis e ambíguas do exame.       
             """
 
+    def get_chave_mensagem(self) -> Hashable:
+        """Chave da mensagem de sistema no `CACHE_MENSAGENS` (depende só do nível)."""
+        return ("sistema", self.get_nivel())
+
     def get_system_message(self) -> SystemMessage:
         """
         Retorna um objeto langchain_core.messages.SystemMessage contendo as
         peculiaridades do aluno (conforme sua habilidade).
+
+        A mensagem é montada uma vez por nível (ver `CacheMensagens`) e cada
+        chamada recebe uma cópia.
         """
+        return CACHE_MENSAGENS.obter(
+            self.get_chave_mensagem(), self._montar_system_message
+        )
 
+    def _montar_system_message(self) -> SystemMessage:
         prompt_content = f"""
         Você é um simulador de respostas de alunos para questões de Língua Portuguesa do ENEM.
 
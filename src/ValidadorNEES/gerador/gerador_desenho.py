@@ -0,0 +1,288 @@
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+
+from ..core.item import Item
+from ..core.respondente import Respondente
+from ..simulador.planejador import PlanoEntradas
+
+ParametrosItem = Tuple[float, float, float]  # (a, b, c) do modelo 3PL
+
+
+def carregar_parametros_previos(
+    caminho_itens: str, coluna_item: str = "CO_ITEM"
+) -> Dict[str, ParametrosItem]:
+    """
+    Lê parâmetros prévios dos itens de um CSV no formato dos microdados do ENEM
+    (colunas NU_PARAM_A, NU_PARAM_B e, opcionalmente, NU_PARAM_C). Itens sem
+    parâmetros (ex: anulados) são ignorados.
+    """
+    if not os.path.isfile(caminho_itens):
+        raise ValueError("O Caminho fornecido para o arquivo não existe!")
+
+    df_itens = pd.read_csv(caminho_itens, dtype={coluna_item: str})
+    if "NU_PARAM_C" not in df_itens.columns:
+        df_itens["NU_PARAM_C"] = 0.0
+    df_itens = df_itens.dropna(subset=["NU_PARAM_A", "NU_PARAM_B"])
+
+    return {
+        str(id_item): (float(a), float(b), float(c) if pd.notna(c) else 0.0)
+        for id_item, a, b, c in zip(
+            df_itens[coluna_item],
+            df_itens["NU_PARAM_A"],
+            df_itens["NU_PARAM_B"],
+            df_itens["NU_PARAM_C"],
+        )
+    }
+
+
+def parametros_de_estimativa(df_parametros: pd.DataFrame) -> Dict[str, ParametrosItem]:
+    """
+    Converte a saída de `EstimadorTRI.estimar_parametros` (ex: de uma rodada
+    piloto) em parâmetros prévios (a, b, 0).
+    """
+    return {
+        str(id_item): (float(a), float(b), 0.0)
+        for id_item, a, b in zip(
+            df_parametros["ID_QUESTÃO"], df_parametros["A"], df_parametros["B"]
+        )
+    }
+
+
+class DesenhoCalibracao:
+    """
+    Resultado do `GeradorDesenhoCalibracao`: quantos respondentes de cada nível
+    de persona respondem a cada item.
+
+    Attributes:
+        populacao (List[Respondente]): Respondentes do desenho (habilidade igual
+            à habilidade central do seu nível)
+        itens (List[Item]): Itens da prova
+        alocacao (pd.DataFrame): Número de respondentes por item (linhas) e
+            nível (colunas)
+        plano (PlanoEntradas): Pares (respondente, item) a simular, aceito pelos
+            métodos do `Simulador` (argumento `plano`)
+        eficiencia_relativa (pd.Series): Eficiência D do desenho (contagens
+            arredondadas) em relação a sortear a mesma quantidade de
+            respondentes de N(0, 1), por item
+            (ex: 2.0 = a mesma precisão com metade das chamadas)
+    """
+
+    def __init__(
+        self,
+        populacao: List[Respondente],
+        itens: List[Item],
+        alocacao: pd.DataFrame,
+        plano: PlanoEntradas,
+        eficiencia_relativa: pd.Series,
+    ) -> None:
+        self.populacao = populacao
+        self.itens = itens
+        self.alocacao = alocacao
+        self.plano = plano
+        self.eficiencia_relativa = eficiencia_relativa
+
+    def __repr__(self) -> str:
+        return (
+            f"DesenhoCalibracao(itens={len(self.itens)}, "
+            f"respondentes={len(self.populacao)}, respostas={len(self.plano)}, "
+            f"eficiencia_mediana={self.eficiencia_relativa.median():.2f})"
+        )
+
+
+class GeradorDesenhoCalibracao:
+    """
+    Gera um desenho de calibração localmente D-ótimo: para cada item, distribui
+    os respondentes entre os 7 níveis de persona de modo a maximizar o
+    determinante da informação de Fisher dos parâmetros (a, b), dados
+    parâmetros prévios do item.
+
+    Como o prompt só distingue os 7 níveis, os pontos candidatos do desenho são
+    as habilidades centrais dos níveis (`Respondente.get_habilidade_central`).
+    Os pesos ótimos são obtidos pelo algoritmo multiplicativo de Silvey e
+    Titterington, vetorizado para todos os itens.
+
+    Attributes:
+        parametros_previos (Dict[str, ParametrosItem]): (a, b, c) por item_id
+        parametros_padrao (ParametrosItem): Usado para itens sem parâmetros
+        constante_d (float): Constante de escala D do modelo logístico
+    """
+
+    def __init__(
+        self,
+        parametros_previos: Dict[str, ParametrosItem],
+        parametros_padrao: ParametrosItem = (1.0, 0.0, 0.0),
+        constante_d: float = 1.0,
+    ) -> None:
+        self.parametros_previos = parametros_previos
+        self.parametros_padrao = parametros_padrao
+        self.constante_d = constante_d
+
+    def _matrizes_informacao(self, itens: List[Item], theta: np.ndarray) -> np.ndarray:
+        """
+        Informação de Fisher de (a, b) de uma resposta, para cada item e ponto
+        candidato: array (itens, pontos, 2, 2).
+        """
+        parametros = np.array(
+            [
+                self.parametros_previos.get(item.id_item, self.parametros_padrao)
+                for item in itens
+            ]
+        )
+        a, b, c = (parametros[:, k, np.newaxis] for k in range(3))
+
+        logistica = expit(self.constante_d * a * (theta - b))
+        p = c + (1 - c) * logistica
+        derivada = (1 - c) * logistica * (1 - logistica)
+
+        # Gradiente de P em relação a (a, b)
+        gradiente = np.stack(
+            [
+                self.constante_d * (theta - b) * derivada,
+                -self.constante_d * a * derivada,
+            ],
+            axis=-1,
+        )
+        peso = 1 / np.clip(p * (1 - p), 1e-12, None)
+        return (
+            peso[..., np.newaxis, np.newaxis]
+            * gradiente[..., :, np.newaxis]
+            * gradiente[..., np.newaxis, :]
+        )
+
+    @staticmethod
+    def _pesos_d_otimos(
+        informacao: np.ndarray, max_iteracoes: int = 1000, tolerancia: float = 1e-4
+    ) -> np.ndarray:
+        """
+        Pesos D-ótimos (itens, pontos) pelo algoritmo multiplicativo:
+        w <- w * d(theta) / p, com d(theta) = tr(M(w)^-1 I(theta)).
+        """
+        num_itens, num_pontos = informacao.shape[:2]
+        num_parametros = informacao.shape[-1]
+        pesos = np.full((num_itens, num_pontos), 1 / num_pontos)
+        regularizacao = 1e-9 * np.eye(num_parametros)
+
+        for _ in range(max_iteracoes):
+            matriz = np.einsum("ip,ipkl->ikl", pesos, informacao) + regularizacao
+            inversa = np.linalg.inv(matriz)
+            variancia = np.einsum("ikl,iplk->ip", inversa, informacao)
+
+            pesos = pesos * variancia / num_parametros
+            pesos /= pesos.sum(axis=1, keepdims=True)
+
+            # Teorema de equivalência: no ótimo, max d(theta) = p
+            if np.all(variancia.max(axis=1) <= num_parametros * (1 + tolerancia)):
+                break
+
+        return pesos
+
+    @staticmethod
+    def _arredondar(pesos: np.ndarray, total: int) -> np.ndarray:
+        """Converte pesos em contagens inteiras que somam `total` (maiores restos)."""
+        alvo = pesos * total
+        contagens = np.floor(alvo).astype(int)
+        restos = alvo - contagens
+        faltam = total - contagens.sum(axis=1)
+
+        ordem = np.argsort(-restos, axis=1)
+        for i, quantidade in enumerate(faltam):
+            contagens[i, ordem[i, :quantidade]] += 1
+        return contagens
+
+    @staticmethod
+    def _proporcoes_normais(num_amostras: int = 200_000, semente: int = 0) -> np.ndarray:
+        """Proporção de cada nível em uma população N(0, 1) limitada a [-3, 3]."""
+        habilidades = np.clip(
+            np.random.default_rng(semente).normal(size=num_amostras), -3, 3
+        )
+        niveis = np.searchsorted(
+            np.array(Respondente.LIMITES_NIVEIS), habilidades - 0.8, side="left"
+        )
+        return np.bincount(niveis, minlength=len(Respondente.NOMES_NIVEIS)) / num_amostras
+
+    def alocar(
+        self, itens: List[Item], respostas_por_item: int, id_inicial: int = 0
+    ) -> DesenhoCalibracao:
+        """
+        Monta o desenho de calibração com `respostas_por_item` respostas por item.
+
+        Cada nível recebe tantos respondentes quanto o item que mais precisa
+        dele; cada item usa os primeiros respondentes de cada nível, conforme
+        sua alocação.
+
+        Args:
+            itens (List[Item]): Itens a calibrar
+            respostas_por_item (int): Orçamento de respostas (chamadas) por item
+            id_inicial (int): Primeiro id dos respondentes gerados
+
+        Returns:
+            DesenhoCalibracao: População, alocação e plano de pares.
+        """
+        if respostas_por_item < 1:
+            raise ValueError("respostas_por_item deve ser maior ou igual a 1.")
+        if not itens:
+            raise ValueError("É preciso ao menos um item para montar o desenho.")
+
+        num_niveis = len(Respondente.NOMES_NIVEIS)
+        theta = np.array(
+            [Respondente.get_habilidade_central(nivel) for nivel in range(num_niveis)]
+        )
+
+        informacao = self._matrizes_informacao(itens, theta)
+        pesos = self._pesos_d_otimos(informacao)
+        contagens = self._arredondar(pesos, respostas_por_item)
+
+        # Eficiência D (p = 2 parâmetros) em relação a uma amostra N(0, 1), do
+        # desenho de fato aplicado (contagens arredondadas, não os pesos contínuos)
+        proporcoes_normais = self._proporcoes_normais()
+        proporcoes_desenho = contagens / contagens.sum(axis=1, keepdims=True)
+        det_otimo = np.linalg.det(
+            np.einsum("ip,ipkl->ikl", proporcoes_desenho, informacao)
+        )
+        det_normal = np.linalg.det(
+            np.einsum("p,ipkl->ikl", proporcoes_normais, informacao)
+        )
+        eficiencia = np.sqrt(det_otimo / np.clip(det_normal, 1e-300, None))
+
+        # Respondentes por nível (quantos o item mais exigente precisa)
+        por_nivel = contagens.max(axis=0)
+        populacao: List[Respondente] = []
+        inicio_nivel: List[int] = []
+        for nivel, quantidade in enumerate(por_nivel):
+            inicio_nivel.append(len(populacao))
+            populacao.extend(
+                Respondente(id=id_inicial + len(populacao) + k, habilidade=theta[nivel])
+                for k in range(quantidade)
+            )
+
+        num_itens = len(itens)
+        indices = np.sort(
+            np.concatenate(
+                [
+                    (inicio_nivel[nivel] + np.arange(contagens[j, nivel])) * num_itens + j
+                    for j in range(num_itens)
+                    for nivel in range(num_niveis)
+                ]
+            ).astype(np.int64)
+        )
+
+        ids_itens = [item.id_item for item in itens]
+        alocacao = pd.DataFrame(
+            contagens,
+            index=pd.Index(ids_itens, name="item_id"),
+            columns=pd.Index(range(num_niveis), name="nivel"),
+        )
+
+        return DesenhoCalibracao(
+            populacao=populacao,
+            itens=itens,
+            alocacao=alocacao,
+            plano=PlanoEntradas(populacao, itens, indices),
+            eficiencia_relativa=pd.Series(
+                eficiencia, index=alocacao.index, name="eficiencia_relativa"
+            ),
+        )
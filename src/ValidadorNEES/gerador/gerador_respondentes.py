@@ -1,5 +1,5 @@
 import os
-from typing import List, cast
+from typing import List, Optional, cast
 
 import numpy as np
 import pandas as pd
@@ -36,13 +36,22 @@ class GeradorRespondentes:
     #     return cast(pd.Series, resultado_sample)
     #
 
-    def _gerar_sample_habilidades(self, numero_de_alunos: int) -> pd.Series:
+    def _gerar_sample_habilidades(
+        self, numero_de_alunos: int, semente: Optional[int] = None
+    ) -> pd.Series:
         """
         Gera uma amostra de habilidades (theta) para um número especificado de alunos
         a partir de uma distribuição normal padrão (média=0, desvio padrão=1).
         Os valores são limitados ao intervalo [-3, 3].
+
+        Com a mesma `semente`, a mesma população é gerada (necessário para retomar
+        uma simulação interrompida).
         """
-        habilidades_array = np.random.normal(loc=0, scale=1, size=numero_de_alunos)
+        if semente is None:
+            habilidades_array = np.random.normal(loc=0, scale=1, size=numero_de_alunos)
+        else:
+            rng = np.random.default_rng(semente)
+            habilidades_array = rng.normal(loc=0, scale=1, size=numero_de_alunos)
 
         habilidades_array_filtrado = np.clip(habilidades_array, a_min=-3, a_max=3)
 
@@ -50,12 +59,14 @@ class GeradorRespondentes:
 
         return habilidades_series
 
-    def gerar_respondentes(self, numero_de_alunos: int) -> List[Respondente]:
+    def gerar_respondentes(
+        self, numero_de_alunos: int, semente: Optional[int] = None
+    ) -> List[Respondente]:
         """
         Cria uma lista de objetos Respondente mantendo a mesma distribuição
         de habilidades da base de dados original.
         """
-        habilidades_sample = self._gerar_sample_habilidades(numero_de_alunos)
+        habilidades_sample = self._gerar_sample_habilidades(numero_de_alunos, semente)
 
         alunos = [
             Respondente(id=indice, habilidade=valor_habilidade)
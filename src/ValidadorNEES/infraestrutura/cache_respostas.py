@@ -0,0 +1,319 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from ..core.cache_mensagens import chave_prompt
+from ..core.item import Item
+from ..core.respondente import Respondente
+
+# Acessos (acertos) acumulados em memória antes de gravar a ordem do LRU
+TAMANHO_LOTE_ACESSOS = 1_000
+
+
+class CacheRespostas:
+    """
+    Cache persistente (SQLite) das respostas brutas da LLM.
+
+    Cada resposta é indexada por um hash de (prompt, modelo, temperatura,
+    índice da amostra), de modo que reexecutar a simulação com o mesmo prompt e
+    a mesma população reaproveita as respostas em vez de consultar o provedor.
+
+    Quando `max_entradas` é informado, as entradas usadas há mais tempo são
+    removidas (LRU) ao ultrapassar o limite. No modo `somente_leitura`
+    ("replay") o banco é aberto apenas para leitura: nada é gravado e a ordem
+    de uso não é atualizada. Os acertos não gravam nada na hora: o instante do
+    acesso fica em memória e é gravado em lote (a cada `TAMANHO_LOTE_ACESSOS`
+    acertos, antes de cada gravação e ao fechar).
+
+    Attributes:
+        caminho (Path): Arquivo SQLite
+        max_entradas (Optional[int]): Limite de entradas (None = sem limite)
+        somente_leitura (bool): Modo replay
+        acertos (int): Consultas encontradas no cache
+        faltas (int): Consultas não encontradas
+        gravacoes (int): Respostas gravadas
+        removidas (int): Entradas removidas pelo LRU
+    """
+
+    def __init__(
+        self,
+        caminho: Union[str, Path],
+        max_entradas: Optional[int] = None,
+        somente_leitura: bool = False,
+    ) -> None:
+        if max_entradas is not None and max_entradas < 1:
+            raise ValueError("max_entradas deve ser maior ou igual a 1.")
+
+        self.caminho = Path(caminho)
+        self.max_entradas = max_entradas
+        self.somente_leitura = somente_leitura
+
+        self.acertos = 0
+        self.faltas = 0
+        self.gravacoes = 0
+        self.removidas = 0
+
+        self._lock = threading.Lock()
+        # Acessos ainda não gravados: chave -> instante no relógio lógico
+        self._acessos: Dict[str, int] = {}
+        self._conexao = self._conectar()
+        self._tamanho, ultimo_acesso = self._conexao.execute(
+            "SELECT COUNT(*), COALESCE(MAX(ultimo_acesso), 0) FROM respostas"
+        ).fetchone()
+        # Relógio lógico do LRU: cresce a cada acesso
+        self._relogio = ultimo_acesso
+
+    def __repr__(self) -> str:
+        return (
+            f"CacheRespostas(caminho={str(self.caminho)!r}, "
+            f"entradas={self._tamanho}, max_entradas={self.max_entradas!r}, "
+            f"somente_leitura={self.somente_leitura!r})"
+        )
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __enter__(self) -> "CacheRespostas":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.fechar()
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self.somente_leitura:
+            if not self.caminho.exists():
+                raise ValueError(
+                    f"O cache {self.caminho} não existe (modo somente leitura)."
+                )
+            return sqlite3.connect(
+                f"{self.caminho.resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+            )
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS respostas ("
+            " chave TEXT PRIMARY KEY,"
+            " resposta TEXT NOT NULL,"
+            " ultimo_acesso INTEGER NOT NULL)"
+        )
+        conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON respostas (ultimo_acesso)"
+        )
+        conexao.commit()
+        return conexao
+
+    @staticmethod
+    def gerar_chave(
+        prompt: str, modelo: str, temperatura: Optional[float], indice_amostra: int
+    ) -> str:
+        """
+        Gera a chave de uma resposta a partir do hash do prompt (sistema +
+        humana, ver `chave_prompt`), do modelo, da temperatura e do índice da
+        amostra.
+        """
+        conteudo = f"{prompt}|{modelo}|{temperatura!r}|{indice_amostra}"
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def obter(self, chave: str) -> Optional[str]:
+        """Retorna a resposta armazenada para `chave` (None se não houver)."""
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT resposta FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+
+            if linha is None:
+                self.faltas += 1
+                return None
+
+            self.acertos += 1
+            if not self.somente_leitura:
+                self._relogio += 1
+                self._acessos[chave] = self._relogio
+                if len(self._acessos) >= TAMANHO_LOTE_ACESSOS:
+                    self._gravar_acessos()
+                    self._conexao.commit()
+            return linha[0]
+
+    def _gravar_acessos(self) -> None:
+        # Atualiza a ordem do LRU com os acessos pendentes (sem commit)
+        if not self._acessos:
+            return
+        self._conexao.executemany(
+            "UPDATE respostas SET ultimo_acesso = ? WHERE chave = ?",
+            [(instante, chave) for chave, instante in self._acessos.items()],
+        )
+        self._acessos.clear()
+
+    def gravar(self, chave: str, resposta: str) -> None:
+        """Armazena a resposta e aplica o limite de entradas, se houver."""
+        if self.somente_leitura:
+            raise ValueError("Não é possível gravar em um cache somente leitura.")
+
+        with self._lock:
+            # Os acessos pendentes entram antes, para que a remoção do LRU e a
+            # nova entrada vejam a ordem de uso atualizada
+            self._gravar_acessos()
+            existia = (
+                self._conexao.execute(
+                    "SELECT 1 FROM respostas WHERE chave = ?", (chave,)
+                ).fetchone()
+                is not None
+            )
+            self._relogio += 1
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO respostas (chave, resposta, ultimo_acesso) "
+                "VALUES (?, ?, ?)",
+                (chave, resposta, self._relogio),
+            )
+            if not existia:
+                self._tamanho += 1
+            self.gravacoes += 1
+
+            if self.max_entradas is not None and self._tamanho > self.max_entradas:
+                self._remover_antigas()
+            self._conexao.commit()
+
+    def _remover_antigas(self) -> None:
+        # Remove um pouco além do excesso para não rodar o DELETE a cada gravação
+        excesso = self._tamanho - self.max_entradas
+        quantidade = excesso + max(1, self.max_entradas // 20)
+        quantidade = min(quantidade, self._tamanho - 1)
+
+        cursor = self._conexao.execute(
+            "DELETE FROM respostas WHERE chave IN ("
+            " SELECT chave FROM respostas ORDER BY ultimo_acesso LIMIT ?)",
+            (quantidade,),
+        )
+        self._tamanho -= cursor.rowcount
+        self.removidas += cursor.rowcount
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores de uso do cache na execução atual."""
+        consultas = self.acertos + self.faltas
+        return {
+            "entradas": self._tamanho,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "gravacoes": self.gravacoes,
+            "removidas": self.removidas,
+        }
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._acessos:
+                self._gravar_acessos()
+                self._conexao.commit()
+            self._conexao.close()
+
+
+class CacheCandidatos:
+    """
+    Acesso ao `CacheRespostas` para as requisições com vários candidatos do
+    modo agrupado (`Simulador.executar_agrupado`), que não passam pela cadeia.
+
+    Usa as mesmas chaves de `envolver_com_cache` (índice da amostra = id do
+    respondente), então as respostas são compartilhadas entre os modos
+    assíncrono e agrupado.
+
+    Attributes:
+        cache (CacheRespostas): Cache onde as respostas são lidas/gravadas
+        modelo (str): Identificação do modelo, parte da chave
+        temperatura (Optional[float]): Temperatura da geração, parte da chave
+    """
+
+    def __init__(
+        self, cache: CacheRespostas, modelo: str, temperatura: Optional[float] = None
+    ) -> None:
+        self.cache = cache
+        self.modelo = modelo
+        self.temperatura = temperatura
+
+    def __repr__(self) -> str:
+        return f"CacheCandidatos(cache={self.cache!r}, modelo={self.modelo!r})"
+
+    def gerar_chave(self, respondente: Respondente, item: Item) -> str:
+        return self.cache.gerar_chave(
+            chave_prompt(respondente, item), self.modelo, self.temperatura, respondente.id
+        )
+
+    def obter(self, respondentes: Sequence[Respondente], item: Item) -> List[Optional[str]]:
+        """Resposta em cache de cada respondente para o item (None se não houver)."""
+        return [self.cache.obter(self.gerar_chave(r, item)) for r in respondentes]
+
+    def gravar(
+        self, respondentes: Sequence[Respondente], item: Item, respostas: Sequence[str]
+    ) -> None:
+        for respondente, resposta in zip(respondentes, respostas):
+            self.cache.gravar(self.gerar_chave(respondente, item), resposta)
+
+
+def envolver_com_cache(
+    cadeia: Runnable,
+    cache: CacheRespostas,
+    modelo: str,
+    temperatura: Optional[float] = None,
+) -> Runnable:
+    """
+    Envolve a cadeia {"respondente", "item"} -> letra com o cache de respostas.
+
+    O índice da amostra é o id do respondente: respondentes com o mesmo prompt
+    (mesmo nível e item) recebem amostras distintas, e a mesma população
+    reencontra as mesmas respostas. Em modo replay, uma falta levanta
+    `ValueError` em vez de consultar a LLM. Na versão assíncrona, as consultas
+    ao SQLite rodam em uma thread (`asyncio.to_thread`) para não bloquear o
+    laço de eventos.
+
+    Args:
+        cadeia (Runnable): Cadeia original (ex: mensagens | llm | parser)
+        cache (CacheRespostas): Cache onde as respostas são lidas/gravadas
+        modelo (str): Nome do modelo, parte da chave
+        temperatura (Optional[float]): Temperatura da geração, parte da chave
+
+    Returns:
+        Runnable: Cadeia com a mesma interface (invoke/ainvoke/batch).
+    """
+
+    def gerar_chave(inputs: Dict[str, Any]) -> str:
+        respondente = inputs["respondente"]
+        return cache.gerar_chave(
+            chave_prompt(respondente, inputs["item"]), modelo, temperatura, respondente.id
+        )
+
+    def verificar_falta(inputs: Dict[str, Any]) -> None:
+        if cache.somente_leitura:
+            raise ValueError(
+                "Resposta ausente no cache (modo replay): "
+                f"respondente {inputs['respondente'].id}, "
+                f"item {inputs['item'].id_item}."
+            )
+
+    def responder(inputs: Dict[str, Any]) -> str:
+        chave = gerar_chave(inputs)
+        resposta = cache.obter(chave)
+        if resposta is None:
+            verificar_falta(inputs)
+            resposta = cadeia.invoke(inputs)
+            cache.gravar(chave, resposta)
+        return resposta
+
+    async def aresponder(inputs: Dict[str, Any]) -> str:
+        chave = gerar_chave(inputs)
+        resposta = await asyncio.to_thread(cache.obter, chave)
+        if resposta is None:
+            verificar_falta(inputs)
+            resposta = await cadeia.ainvoke(inputs)
+            await asyncio.to_thread(cache.gravar, chave, resposta)
+        return resposta
+
+    return RunnableLambda(responder, afunc=aresponder, name="cache_respostas")
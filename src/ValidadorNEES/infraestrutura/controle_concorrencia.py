@@ -0,0 +1,194 @@
+import asyncio
+import random
+import time
+from enum import Enum
+from typing import Optional
+
+
+class TipoErro(Enum):
+    LIMITACAO = "limitacao"  # 429 / timeout: o provedor está sobrecarregado
+    TRANSITORIO = "transitorio"  # 5xx / falha de conexão: vale tentar de novo
+    PERMANENTE = "permanente"  # erro de requisição ou de código: não adianta repetir
+
+
+# Nomes de exceções dos SDKs (OpenAI, Google, httpx) reconhecidos sem importá-los
+_NOMES_LIMITACAO = {"RateLimitError", "ResourceExhausted", "TooManyRequests"}
+_NOMES_TRANSITORIOS = {
+    "APIConnectionError",
+    "InternalServerError",
+    "ServiceUnavailable",
+    "ServerError",
+    "ConnectError",
+    "RemoteProtocolError",
+}
+
+
+def classificar_erro(erro: BaseException) -> TipoErro:
+    """
+    Classifica uma exceção levantada por uma chamada à LLM, usando o código HTTP
+    (`status_code` ou `code`) quando disponível e o nome da classe caso contrário.
+    """
+    codigo = getattr(erro, "status_code", None)
+    if not isinstance(codigo, int):
+        codigo = getattr(erro, "code", None)
+
+    if isinstance(codigo, int):
+        if codigo in (408, 429):
+            return TipoErro.LIMITACAO
+        if codigo >= 500:
+            return TipoErro.TRANSITORIO
+        if 400 <= codigo < 500:
+            return TipoErro.PERMANENTE
+
+    nome = type(erro).__name__
+    if nome in _NOMES_LIMITACAO or isinstance(erro, (TimeoutError, asyncio.TimeoutError)):
+        return TipoErro.LIMITACAO
+    if "Timeout" in nome or "DeadlineExceeded" in nome:
+        return TipoErro.LIMITACAO
+    if nome in _NOMES_TRANSITORIOS or isinstance(erro, ConnectionError):
+        return TipoErro.TRANSITORIO
+
+    return TipoErro.PERMANENTE
+
+
+class PoliticaRetentativa:
+    """
+    Define quantas vezes uma chamada que falhou é repetida e quanto se espera
+    entre as tentativas (backoff exponencial com "full jitter").
+
+    Attributes:
+        max_tentativas (int): Total de tentativas por tarefa (incluindo a primeira)
+        espera_base_segundos (float): Espera base da primeira retentativa
+        espera_maxima_segundos (float): Teto da espera exponencial
+    """
+
+    def __init__(
+        self,
+        max_tentativas: int = 6,
+        espera_base_segundos: float = 1.0,
+        espera_maxima_segundos: float = 60.0,
+    ) -> None:
+        if max_tentativas < 1:
+            raise ValueError("max_tentativas deve ser maior ou igual a 1.")
+
+        self.max_tentativas = max_tentativas
+        self.espera_base_segundos = espera_base_segundos
+        self.espera_maxima_segundos = espera_maxima_segundos
+
+    def __repr__(self) -> str:
+        return (
+            f"PoliticaRetentativa(max_tentativas={self.max_tentativas!r}, "
+            f"espera_base_segundos={self.espera_base_segundos!r}, "
+            f"espera_maxima_segundos={self.espera_maxima_segundos!r})"
+        )
+
+    def deve_repetir(self, erro: BaseException, tentativas: int) -> bool:
+        """Indica se a tarefa deve ser repetida após `tentativas` falhas."""
+        if tentativas >= self.max_tentativas:
+            return False
+        return classificar_erro(erro) is not TipoErro.PERMANENTE
+
+    def espera(self, tentativas: int) -> float:
+        """Tempo de espera (s) antes da próxima tentativa, com jitter uniforme."""
+        teto = min(
+            self.espera_maxima_segundos,
+            self.espera_base_segundos * 2 ** max(0, tentativas - 1),
+        )
+        return random.uniform(0, teto)
+
+
+class ControladorConcorrencia:
+    """
+    Controla o número de requisições simultâneas com a estratégia AIMD
+    (aumento aditivo, redução multiplicativa), como no controle de
+    congestionamento do TCP.
+
+    Cada sucesso aumenta o limite em `incremento / limite` (≈ +incremento por
+    "janela" de respostas); cada limitação (429/timeout) multiplica o limite por
+    `fator_reducao`, no máximo uma vez a cada `intervalo_reducao_segundos` para
+    que uma rajada de 429 não derrube o limite ao mínimo.
+
+    Attributes:
+        limite (float): Limite atual de requisições em voo
+        minimo (int): Limite mínimo
+        maximo (int): Limite máximo
+        incremento (float): Aumento aditivo por janela de sucessos
+        fator_reducao (float): Fator multiplicativo aplicado em limitações
+        intervalo_reducao_segundos (float): Intervalo mínimo entre reduções
+    """
+
+    def __init__(
+        self,
+        inicial: int = 8,
+        minimo: int = 1,
+        maximo: int = 256,
+        incremento: float = 1.0,
+        fator_reducao: float = 0.5,
+        intervalo_reducao_segundos: float = 1.0,
+    ) -> None:
+        if not 1 <= minimo <= inicial <= maximo:
+            raise ValueError("É preciso que 1 <= minimo <= inicial <= maximo.")
+        if not 0 < fator_reducao < 1:
+            raise ValueError("fator_reducao deve estar entre 0 e 1.")
+
+        self.limite = float(inicial)
+        self.minimo = minimo
+        self.maximo = maximo
+        self.incremento = incremento
+        self.fator_reducao = fator_reducao
+        self.intervalo_reducao_segundos = intervalo_reducao_segundos
+
+        self.em_voo = 0
+        self.sucessos = 0
+        self.limitacoes = 0
+        self._ultima_reducao = float("-inf")
+        self._condicao: Optional[asyncio.Condition] = None
+        self._loop_condicao: Optional[asyncio.AbstractEventLoop] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"ControladorConcorrencia(limite={self.limite:.1f}, "
+            f"minimo={self.minimo!r}, maximo={self.maximo!r})"
+        )
+
+    def _get_condicao(self) -> asyncio.Condition:
+        # O controlador pode ser reutilizado em vários `asyncio.run` (um por modo
+        # de execução); a condição precisa pertencer ao loop em execução.
+        loop = asyncio.get_running_loop()
+        if self._condicao is None or self._loop_condicao is not loop:
+            self._condicao = asyncio.Condition()
+            self._loop_condicao = loop
+            self.em_voo = 0
+        return self._condicao
+
+    async def adquirir(self) -> None:
+        """Aguarda até que haja uma vaga abaixo do limite atual."""
+        condicao = self._get_condicao()
+        async with condicao:
+            await condicao.wait_for(lambda: self.em_voo < int(self.limite))
+            self.em_voo += 1
+
+    async def liberar(self) -> None:
+        """Libera a vaga ocupada por uma requisição concluída (com ou sem erro)."""
+        condicao = self._get_condicao()
+        async with condicao:
+            self.em_voo -= 1
+            condicao.notify_all()
+
+    def registrar_sucesso(self) -> None:
+        self.sucessos += 1
+        self.limite = min(self.maximo, self.limite + self.incremento / self.limite)
+
+    def registrar_limitacao(self) -> None:
+        self.limitacoes += 1
+        agora = time.monotonic()
+        if agora - self._ultima_reducao < self.intervalo_reducao_segundos:
+            return
+
+        self._ultima_reducao = agora
+        self.limite = max(self.minimo, self.limite * self.fator_reducao)
+
+    def registrar_erro(self, erro: BaseException) -> None:
+        """Atualiza o limite de acordo com o tipo de erro da chamada."""
+        if classificar_erro(erro) is TipoErro.LIMITACAO:
+            self.registrar_limitacao()
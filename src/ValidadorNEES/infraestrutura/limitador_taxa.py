@@ -0,0 +1,202 @@
+import asyncio
+import threading
+import time
+import weakref
+from typing import List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+
+# Aproximação usual de ~4 caracteres por token para textos em português/inglês
+CARACTERES_POR_TOKEN = 4
+
+
+def estimar_tokens(mensagens: Sequence[BaseMessage], tokens_resposta: int = 1) -> int:
+    """
+    Estima o número de tokens consumidos por uma requisição (entrada + saída)
+    a partir do tamanho do texto das mensagens. Imagens não são contabilizadas.
+    """
+    total_caracteres = 0
+    for mensagem in mensagens:
+        if isinstance(mensagem.content, str):
+            total_caracteres += len(mensagem.content)
+            continue
+        for parte in mensagem.content:
+            if isinstance(parte, dict) and parte.get("type") == "text":
+                total_caracteres += len(parte["text"])
+            elif isinstance(parte, str):
+                total_caracteres += len(parte)
+
+    return total_caracteres // CARACTERES_POR_TOKEN + tokens_resposta
+
+
+class BaldeDeFichas:
+    """
+    Implementação simples do algoritmo "token bucket".
+
+    O balde começa cheio com `capacidade` fichas e é reabastecido continuamente
+    a uma taxa de `taxa_por_segundo`. Cada consumo retira fichas do balde; se não
+    houver fichas suficientes, o chamador deve aguardar o tempo indicado por
+    `tempo_de_espera`.
+
+    Attributes:
+        capacidade (float): Número máximo de fichas que o balde comporta
+        taxa_por_segundo (float): Quantidade de fichas repostas por segundo
+    """
+
+    def __init__(self, capacidade: float, taxa_por_segundo: float) -> None:
+        if capacidade <= 0 or taxa_por_segundo <= 0:
+            raise ValueError("A capacidade e a taxa do balde devem ser positivas.")
+
+        self.capacidade = capacidade
+        self.taxa_por_segundo = taxa_por_segundo
+        self._fichas = capacidade
+        self._ultima_atualizacao = time.monotonic()
+
+    def _reabastecer(self) -> None:
+        agora = time.monotonic()
+        decorrido = agora - self._ultima_atualizacao
+        self._fichas = min(
+            self.capacidade, self._fichas + decorrido * self.taxa_por_segundo
+        )
+        self._ultima_atualizacao = agora
+
+    def tempo_de_espera(self, quantidade: float) -> float:
+        """
+        Retorna quantos segundos faltam para que `quantidade` fichas estejam
+        disponíveis (0 se já estiverem).
+        """
+        self._reabastecer()
+        quantidade = min(quantidade, self.capacidade)
+        falta = quantidade - self._fichas
+        return max(0.0, falta / self.taxa_por_segundo)
+
+    def consumir(self, quantidade: float) -> None:
+        self._reabastecer()
+        self._fichas -= min(quantidade, self.capacidade)
+
+    def fracao_disponivel(self) -> float:
+        """Fração da capacidade disponível no momento (0 a 1)."""
+        self._reabastecer()
+        return max(0.0, self._fichas / self.capacidade)
+
+
+class LimitadorTaxa:
+    """
+    Limita o ritmo de chamadas à LLM por requisições por minuto (RPM) e/ou
+    tokens por minuto (TPM), conforme a cota do provedor.
+
+    Deve ser usado dentro de um loop asyncio: cada requisição chama
+    `await limitador.adquirir(tokens)` antes de ser enviada. Fora de um loop
+    (ex: `Runnable.batch` em threads), use `adquirir_sincrono`.
+
+    O mesmo limitador pode ser compartilhado por vários loops (ex: um
+    `asyncio.run` por execução) e threads: a fila de ordem de chegada é
+    própria de cada loop, mas a cota é uma só, consultada e consumida de forma
+    atômica por todos.
+
+    Attributes:
+        requisicoes_por_minuto (Optional[float]): Limite de requisições por minuto
+        tokens_por_minuto (Optional[float]): Limite de tokens por minuto
+    """
+
+    def __init__(
+        self,
+        requisicoes_por_minuto: Optional[float] = None,
+        tokens_por_minuto: Optional[float] = None,
+    ) -> None:
+        self.requisicoes_por_minuto = requisicoes_por_minuto
+        self.tokens_por_minuto = tokens_por_minuto
+
+        self._balde_requisicoes = (
+            BaldeDeFichas(requisicoes_por_minuto, requisicoes_por_minuto / 60)
+            if requisicoes_por_minuto
+            else None
+        )
+        self._balde_tokens = (
+            BaldeDeFichas(tokens_por_minuto, tokens_por_minuto / 60)
+            if tokens_por_minuto
+            else None
+        )
+        # Um asyncio.Lock por loop (um Lock fica preso ao loop em que é usado)
+        self._locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock_sincrono = threading.Lock()
+        # Protege os baldes, compartilhados pelos caminhos síncrono e assíncrono
+        self._lock_baldes = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"LimitadorTaxa(requisicoes_por_minuto={self.requisicoes_por_minuto!r}, "
+            f"tokens_por_minuto={self.tokens_por_minuto!r})"
+        )
+
+    def tempo_de_espera(self, tokens: int = 0) -> float:
+        """
+        Segundos até haver cota para uma requisição com `tokens` tokens (0 se já
+        houver), sem consumir a cota.
+        """
+        with self._lock_baldes:
+            return self._tempo_de_espera(tokens)
+
+    def _tempo_de_espera(self, tokens: int) -> float:
+        esperas: List[float] = [0.0]
+        if self._balde_requisicoes is not None:
+            esperas.append(self._balde_requisicoes.tempo_de_espera(1))
+        if self._balde_tokens is not None:
+            esperas.append(self._balde_tokens.tempo_de_espera(tokens))
+        return max(esperas)
+
+    def capacidade_restante(self) -> float:
+        """
+        Fração da cota ainda disponível (0 a 1), considerando o balde mais vazio.
+        Sem limites configurados, retorna 1.
+        """
+        fracoes: List[float] = [1.0]
+        with self._lock_baldes:
+            if self._balde_requisicoes is not None:
+                fracoes.append(self._balde_requisicoes.fracao_disponivel())
+            if self._balde_tokens is not None:
+                fracoes.append(self._balde_tokens.fracao_disponivel())
+        return min(fracoes)
+
+    def _tentar_consumir(self, tokens: int) -> float:
+        """
+        Consome a cota se ela já estiver disponível e retorna 0; caso contrário,
+        retorna a espera necessária sem consumir nada.
+        """
+        with self._lock_baldes:
+            espera = self._tempo_de_espera(tokens)
+            if espera > 0:
+                return espera
+            if self._balde_requisicoes is not None:
+                self._balde_requisicoes.consumir(1)
+            if self._balde_tokens is not None:
+                self._balde_tokens.consumir(tokens)
+            return 0.0
+
+    async def adquirir(self, tokens: int = 0) -> None:
+        """
+        Aguarda até que haja cota para uma requisição com `tokens` tokens
+        estimados e a consome.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+
+        # O lock garante que as requisições do loop sejam liberadas em ordem de
+        # chegada
+        async with lock:
+            while True:
+                espera = self._tentar_consumir(tokens)
+                if espera <= 0:
+                    return
+                await asyncio.sleep(espera)
+
+    def adquirir_sincrono(self, tokens: int = 0) -> None:
+        """Versão bloqueante de `adquirir`, para uso em threads."""
+        with self._lock_sincrono:
+            while True:
+                espera = self._tentar_consumir(tokens)
+                if espera <= 0:
+                    return
+                time.sleep(espera)
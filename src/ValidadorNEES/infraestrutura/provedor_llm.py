@@ -1,24 +1,45 @@
+import asyncio
+import hashlib
+import json
 import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import pandas as pd
 from dotenv import load_dotenv
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult, LLMResult
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
+from pydantic import PrivateAttr
+
+from .controle_concorrencia import TipoErro, classificar_erro
+from .limitador_taxa import LimitadorTaxa, estimar_tokens
+from .provedor_mock import ChatMockTRI
 
 load_dotenv()
 
 
-def get_llm(provider: str, model_name: str, **kwargs) -> BaseChatModel:
+def get_llm(
+    provider: str, model_name: str, api_key: Optional[str] = None, **kwargs
+) -> BaseChatModel:
     """
     Fábrica de LLMs que retorna uma instância de um modelo de chat do LangChain
     com base no provedor especificado.
 
     Exige que as chaves de API estejam configuradas como variáveis de ambiente.
-    Ex: GOOGLE_API_KEY, OPENAI_API_KEY, ANTHROPIC_API_KEY.
+    Ex: GOOGLE_API_KEY, OPENAI_API_KEY, ANTHROPIC_API_KEY. Uma chave específica
+    pode ser passada em `api_key` (ex: para montar um pool de chaves).
+
+    O provedor 'mock' não acessa a rede: retorna um `ChatMockTRI`, que responde
+    segundo um modelo 3PL (exige `itens=prova.itens` nos kwargs).
 
     Args:
-        provider (str): O nome do provedor (ex: 'google', 'openai', 'anthropic').
+        provider (str): O nome do provedor (ex: 'google', 'openai', 'mock').
         model_name (str): O nome específico do modelo.
+        api_key (Optional[str]): Chave de API. Se None, usa a variável de ambiente.
         **kwargs: Argumentos adicionais para passar ao construtor do modelo (ex: temperature=0.7).
 
     Returns:
@@ -30,17 +51,423 @@ def get_llm(provider: str, model_name: str, **kwargs) -> BaseChatModel:
     provider = provider.lower()
 
     if provider == "google":
-        if not os.getenv("GOOGLE_API_KEY"):
+        if api_key is not None:
+            kwargs["google_api_key"] = api_key
+        elif not os.getenv("GOOGLE_API_KEY"):
             raise ValueError("A variável de ambiente GOOGLE_API_KEY não foi definida.")
         return ChatGoogleGenerativeAI(model=model_name, **kwargs)
 
     elif provider == "openai":
-        if not os.getenv("OPENAI_API_KEY"):
+        if api_key is not None:
+            kwargs["api_key"] = api_key
+        elif not os.getenv("OPENAI_API_KEY"):
             raise ValueError("A variável de ambiente OPENAI_API_KEY não foi definida.")
         return ChatOpenAI(model=model_name, **kwargs)
 
+    elif provider == "mock":
+        if "itens" not in kwargs:
+            raise ValueError("O provedor 'mock' exige o argumento itens=prova.itens.")
+        return ChatMockTRI(model_name=model_name, **kwargs)
+
     else:
         raise ValueError(
             f"Provedor de LLM '{provider}' não é suportado. "
-            "Opções válidas: 'google', 'openai'"
+            "Opções válidas: 'google', 'openai', 'mock'"
+        )
+
+
+def get_parametros_candidatos(llm: BaseChatModel, n: int) -> Dict[str, Any]:
+    """
+    Retorna os argumentos de geração que pedem `n` respostas candidatas em uma
+    única requisição (ex: `llm.agenerate([mensagens], **parametros)`).
+
+    Args:
+        llm (BaseChatModel): Modelo retornado por `get_llm`.
+        n (int): Número de candidatos desejados.
+
+    Returns:
+        Dict[str, Any]: kwargs a serem repassados para `generate`/`agenerate`.
+
+    Raises:
+        ValueError: Se o modelo não suportar múltiplos candidatos por requisição.
+    """
+    if isinstance(llm, ChatGoogleGenerativeAI):
+        return {"generation_config": {"candidate_count": n}}
+
+    elif isinstance(llm, (ChatOpenAI, ChatMockTRI)):
+        return {"n": n}
+
+    elif isinstance(llm, RoteadorLLM):
+        # O roteador traduz `n` para o formato de cada endpoint
+        for endpoint in llm.endpoints:
+            get_parametros_candidatos(endpoint.llm, n)
+        return {"n": n}
+
+    else:
+        raise ValueError(
+            f"O modelo {type(llm).__name__} não suporta múltiplos candidatos "
+            "por requisição."
+        )
+
+
+def get_parametros_logprobs(llm: BaseChatModel, top_k: int = 20) -> Dict[str, Any]:
+    """
+    Retorna os argumentos que fazem o modelo devolver as log-probabilidades dos
+    `top_k` tokens mais prováveis na primeira posição da resposta
+    (ex: `llm.bind(**parametros)`). A saída é limitada a 1 token, que é a letra.
+
+    Args:
+        llm (BaseChatModel): Modelo retornado por `get_llm`.
+        top_k (int): Número de tokens mais prováveis retornados.
+
+    Returns:
+        Dict[str, Any]: kwargs a serem repassados para `bind`.
+
+    Raises:
+        ValueError: Se o modelo não expuser log-probabilidades.
+    """
+    if isinstance(llm, ChatOpenAI):
+        return {"logprobs": True, "top_logprobs": top_k, "max_tokens": 1}
+
+    elif isinstance(llm, ChatMockTRI):
+        return {"logprobs": True}
+
+    elif isinstance(llm, RoteadorLLM):
+        for endpoint in llm.endpoints:
+            get_parametros_logprobs(endpoint.llm, top_k)
+        return {"logprobs": True, "top_logprobs": top_k}
+
+    else:
+        raise ValueError(
+            f"O modelo {type(llm).__name__} não expõe log-probabilidades dos tokens."
+        )
+
+
+def _traduzir_parametros(llm: BaseChatModel, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte os parâmetros genéricos do roteador (`n`, `logprobs`,
+    `top_logprobs`) para o formato do modelo de um endpoint.
+    """
+    parametros = dict(kwargs)
+    n = int(parametros.pop("n", 1))
+    logprobs = parametros.pop("logprobs", False)
+    top_k = parametros.pop("top_logprobs", 20)
+
+    if n > 1:
+        parametros.update(get_parametros_candidatos(llm, n))
+    if logprobs:
+        parametros.update(get_parametros_logprobs(llm, top_k))
+    return parametros
+
+
+class EndpointLLM:
+    """
+    Um endpoint do pool do `RoteadorLLM`: um modelo já configurado com sua chave
+    de API e a cota (RPM/TPM) dessa chave.
+
+    Attributes:
+        llm (BaseChatModel): Modelo retornado por `get_llm`
+        nome (str): Identificador do endpoint nos relatórios
+        limitador (LimitadorTaxa): Cota do endpoint
+        requisicoes (int): Requisições enviadas
+        sucessos (int): Requisições bem-sucedidas
+        erros (int): Requisições que falharam (qualquer erro)
+        limitacoes (int): Falhas por limitação (429/timeout)
+        tokens_estimados (int): Tokens estimados das requisições enviadas
+        em_voo (int): Requisições em andamento
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        nome: Optional[str] = None,
+        requisicoes_por_minuto: Optional[float] = None,
+        tokens_por_minuto: Optional[float] = None,
+    ) -> None:
+        self.llm = llm
+        self.nome = nome or f"{type(llm).__name__}:{getattr(llm, 'model_name', '')}"
+        self.limitador = LimitadorTaxa(
+            requisicoes_por_minuto=requisicoes_por_minuto,
+            tokens_por_minuto=tokens_por_minuto,
         )
+
+        self.requisicoes = 0
+        self.sucessos = 0
+        self.erros = 0
+        self.limitacoes = 0
+        self.tokens_estimados = 0
+        self.em_voo = 0
+        self.bloqueado_ate = 0.0
+        self._limitacoes_seguidas = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"EndpointLLM(nome={self.nome!r}, {self.limitador!r}, "
+            f"sucessos={self.sucessos}, erros={self.erros})"
+        )
+
+    def registrar_sucesso(self) -> None:
+        self.sucessos += 1
+        self._limitacoes_seguidas = 0
+
+    def registrar_erro(
+        self, erro: BaseException, espera_base: float, espera_maxima: float
+    ) -> TipoErro:
+        """
+        Contabiliza o erro e, se for limitação, tira o endpoint de circulação por
+        um tempo que dobra a cada limitação seguida.
+        """
+        self.erros += 1
+        tipo = classificar_erro(erro)
+        if tipo is TipoErro.LIMITACAO:
+            self.limitacoes += 1
+            self._limitacoes_seguidas += 1
+            espera = min(espera_maxima, espera_base * 2 ** (self._limitacoes_seguidas - 1))
+            self.bloqueado_ate = max(self.bloqueado_ate, time.monotonic() + espera)
+        return tipo
+
+
+def identificar_llm(llm: BaseChatModel) -> str:
+    """
+    Identificação do modelo usada na chave do `CacheRespostas`: tipo do
+    provedor e nome do modelo; para o `ChatMockTRI`, também a semente e um hash
+    dos parâmetros dos itens (que determinam as respostas); para o
+    `RoteadorLLM`, a identificação de todos os endpoints do pool.
+    """
+    if isinstance(llm, RoteadorLLM):
+        endpoints = sorted(identificar_llm(endpoint.llm) for endpoint in llm.endpoints)
+        return f"roteador[{','.join(endpoints)}]"
+
+    if isinstance(llm, ChatMockTRI):
+        parametros = json.dumps(sorted(llm.parametros_itens.items()))
+        resumo = hashlib.sha256(parametros.encode("utf-8")).hexdigest()[:16]
+        return (
+            f"mock:{llm.model_name}:semente={llm.semente}:"
+            f"parametros={resumo}:d={llm.constante_d}"
+        )
+
+    modelo = getattr(llm, "model_name", None) or getattr(llm, "model", "")
+    return f"{llm._llm_type}:{modelo}"
+
+
+def criar_endpoint(
+    provider: str,
+    model_name: str,
+    api_key: Optional[str] = None,
+    nome: Optional[str] = None,
+    requisicoes_por_minuto: Optional[float] = None,
+    tokens_por_minuto: Optional[float] = None,
+    **kwargs,
+) -> EndpointLLM:
+    """
+    Cria um `EndpointLLM` a partir da mesma configuração aceita por `get_llm`,
+    mais a cota da chave.
+    """
+    llm = get_llm(provider, model_name, api_key=api_key, **kwargs)
+    return EndpointLLM(
+        llm,
+        nome=nome or f"{provider}:{model_name}",
+        requisicoes_por_minuto=requisicoes_por_minuto,
+        tokens_por_minuto=tokens_por_minuto,
+    )
+
+
+class RoteadorLLM(BaseChatModel):
+    """
+    Modelo de chat que distribui as requisições entre um pool de endpoints
+    (provedores, modelos e chaves de API diferentes), cada um com sua cota.
+
+    A cada requisição é escolhido o endpoint que pode atendê-la mais cedo e,
+    entre esses, o que tem mais cota restante (e menos requisições em voo).
+    Se o endpoint falhar por limitação (429/timeout) ou erro transitório, a
+    requisição é reenviada ao próximo endpoint; endpoints limitados ficam fora
+    de circulação por `espera_bloqueio_segundos` (dobrando a cada limitação
+    seguida). Erros permanentes são repassados imediatamente.
+
+    Pode ser usado no lugar de qualquer modelo retornado por `get_llm`, inclusive
+    com `get_parametros_candidatos` e `get_parametros_logprobs`, desde que todos
+    os endpoints suportem o recurso. Saída estruturada (`with_structured_output`)
+    não é suportada.
+
+    Attributes:
+        endpoints (List[EndpointLLM]): Pool de endpoints
+        espera_bloqueio_segundos (float): Tempo inicial fora de circulação após
+            uma limitação
+        espera_bloqueio_maxima_segundos (float): Teto desse tempo
+    """
+
+    endpoints: List[Any]
+    espera_bloqueio_segundos: float = 5.0
+    espera_bloqueio_maxima_segundos: float = 60.0
+    model_name: str = "roteador"
+
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        if not self.endpoints:
+            raise ValueError("O RoteadorLLM exige pelo menos um endpoint.")
+
+    @property
+    def _llm_type(self) -> str:
+        return "roteador"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"endpoints": [endpoint.nome for endpoint in self.endpoints]}
+
+    def estatisticas(self) -> pd.DataFrame:
+        """Contadores de cada endpoint (uma linha por endpoint)."""
+        return pd.DataFrame(
+            [
+                {
+                    "endpoint": endpoint.nome,
+                    "requisicoes": endpoint.requisicoes,
+                    "sucessos": endpoint.sucessos,
+                    "erros": endpoint.erros,
+                    "limitacoes": endpoint.limitacoes,
+                    "tokens_estimados": endpoint.tokens_estimados,
+                    "capacidade_restante": endpoint.limitador.capacidade_restante(),
+                }
+                for endpoint in self.endpoints
+            ]
+        )
+
+    def _escolher(
+        self, tokens: int, excluidos: Set[int]
+    ) -> Tuple[Optional[EndpointLLM], float]:
+        """
+        Reserva o melhor endpoint disponível para a requisição. Se todos os
+        candidatos estiverem bloqueados, retorna (None, segundos até o primeiro
+        desbloqueio).
+
+        Raises:
+            ValueError: Se não restar nenhum endpoint candidato.
+        """
+        with self._lock:
+            agora = time.monotonic()
+            candidatos = [
+                endpoint
+                for indice, endpoint in enumerate(self.endpoints)
+                if indice not in excluidos
+            ]
+            if not candidatos:
+                raise ValueError("Todos os endpoints do roteador falharam.")
+
+            disponiveis = [e for e in candidatos if e.bloqueado_ate <= agora]
+            if not disponiveis:
+                return None, min(e.bloqueado_ate for e in candidatos) - agora
+
+            escolhido = min(
+                disponiveis,
+                key=lambda e: (
+                    e.limitador.tempo_de_espera(tokens),
+                    e.em_voo - e.limitador.capacidade_restante(),
+                ),
+            )
+            escolhido.em_voo += 1
+            escolhido.requisicoes += 1
+            escolhido.tokens_estimados += tokens
+            return escolhido, 0.0
+
+    def _registrar(
+        self, endpoint: EndpointLLM, erro: Optional[BaseException]
+    ) -> Optional[TipoErro]:
+        """Atualiza os contadores do endpoint; retorna o tipo do erro, se houver."""
+        with self._lock:
+            if erro is None:
+                endpoint.registrar_sucesso()
+                return None
+            return endpoint.registrar_erro(
+                erro, self.espera_bloqueio_segundos, self.espera_bloqueio_maxima_segundos
+            )
+
+    def _liberar(self, endpoint: EndpointLLM) -> None:
+        with self._lock:
+            endpoint.em_voo -= 1
+
+    def _repassar_erro(self, erro: Exception, indice: int, excluidos: Set[int]) -> None:
+        """
+        Decide entre tentar outro endpoint (limitação ou erro transitório) e
+        repassar o erro (erro permanente ou nenhum endpoint restante).
+        """
+        tipo = classificar_erro(erro)
+        excluidos.add(indice)
+        if tipo is TipoErro.PERMANENTE or len(excluidos) == len(self.endpoints):
+            raise erro
+
+    @staticmethod
+    def _converter_resultado(resultado: LLMResult, endpoint: EndpointLLM) -> ChatResult:
+        geracoes = resultado.generations[0]
+        for geracao in geracoes:
+            geracao.message.response_metadata["endpoint"] = endpoint.nome
+        return ChatResult(generations=geracoes, llm_output=resultado.llm_output)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = estimar_tokens(messages, tokens_resposta=int(kwargs.get("n", 1)))
+        excluidos: Set[int] = set()
+
+        while True:
+            endpoint, espera = self._escolher(tokens, excluidos)
+            if endpoint is None:
+                time.sleep(espera)
+                continue
+
+            erro: Optional[Exception] = None
+            try:
+                endpoint.limitador.adquirir_sincrono(tokens)
+                resultado = endpoint.llm.generate(
+                    [messages],
+                    stop=stop,
+                    metadata=run_manager.metadata if run_manager else None,
+                    **_traduzir_parametros(endpoint.llm, kwargs),
+                )
+            except Exception as excecao:
+                erro = excecao
+            finally:
+                self._liberar(endpoint)
+
+            self._registrar(endpoint, erro)
+            if erro is None:
+                return self._converter_resultado(resultado, endpoint)
+            self._repassar_erro(erro, self.endpoints.index(endpoint), excluidos)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = estimar_tokens(messages, tokens_resposta=int(kwargs.get("n", 1)))
+        excluidos: Set[int] = set()
+
+        while True:
+            endpoint, espera = self._escolher(tokens, excluidos)
+            if endpoint is None:
+                await asyncio.sleep(espera)
+                continue
+
+            erro: Optional[Exception] = None
+            try:
+                await endpoint.limitador.adquirir(tokens)
+                resultado = await endpoint.llm.agenerate(
+                    [messages],
+                    stop=stop,
+                    metadata=run_manager.metadata if run_manager else None,
+                    **_traduzir_parametros(endpoint.llm, kwargs),
+                )
+            except Exception as excecao:
+                erro = excecao
+            finally:
+                self._liberar(endpoint)
+
+            self._registrar(endpoint, erro)
+            if erro is None:
+                return self._converter_resultado(resultado, endpoint)
+            self._repassar_erro(erro, self.endpoints.index(endpoint), excluidos)
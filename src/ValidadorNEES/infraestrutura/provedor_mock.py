@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from ..core.item import Item
+from ..core.respondente import Respondente
+
+LETRAS_ALTERNATIVAS: Tuple[str, ...] = ("A", "B", "C", "D", "E")
+
+ParametrosItem = Tuple[float, float, float]  # (a, b, c) do modelo 3PL
+
+
+class ErroMockLLM(Exception):
+    """
+    Erro artificial levantado pelo `ChatMockTRI` para simular falhas do provedor.
+
+    Attributes:
+        status_code (int): Código HTTP simulado (429 = limite de taxa)
+    """
+
+    def __init__(self, mensagem: str, status_code: int = 429) -> None:
+        super().__init__(mensagem)
+        self.status_code = status_code
+
+
+def gerar_parametros_aleatorios(
+    itens: List[Item], semente: Optional[int] = None
+) -> Dict[str, ParametrosItem]:
+    """
+    Gera parâmetros 3PL plausíveis para os itens (a ~ LogNormal(0, 0.3),
+    b ~ N(0, 1), c = 0.2), úteis como gabarito conhecido em testes de
+    recuperação de parâmetros.
+    """
+    rng = np.random.default_rng(semente)
+    a = rng.lognormal(mean=0.0, sigma=0.3, size=len(itens))
+    b = rng.normal(loc=0.0, scale=1.0, size=len(itens))
+
+    return {
+        item.id_item: (float(a_item), float(b_item), 0.2)
+        for item, a_item, b_item in zip(itens, a, b)
+    }
+
+
+class ChatMockTRI(BaseChatModel):
+    """
+    Modelo de chat falso (sem rede) que responde como um aluno segundo a TRI.
+
+    A partir das mensagens, identifica o nível da persona (mensagem de sistema) e
+    o item (texto da mensagem humana) e sorteia a letra com probabilidade de
+    acerto dada pelo modelo 3PL:
+
+        P(acerto) = c + (1 - c) / (1 + exp(-D * a * (theta - b)))
+
+    onde theta é a habilidade central do nível (`Respondente.get_habilidade_central`).
+    Em caso de erro, uma das outras quatro letras é sorteada uniformemente.
+
+    O sorteio é determinístico: cada resposta depende apenas da semente, do
+    nível, do item e do índice da amostra, lido de `metadata["indices_amostra"]`
+    (o `Simulador` envia o id de cada respondente, um por candidato). Assim, a
+    mesma semente produz as mesmas respostas por respondente em qualquer ordem
+    de chegada das requisições (assíncrono, agrupado, fragmentado). Sem
+    índices, usa-se a contagem de chamadas por (nível, item), que depende da
+    ordem das chamadas.
+
+    Suporta `n` candidatos por chamada e, com `logprobs=True`, devolve as
+    log-probabilidades exatas das letras no mesmo formato da OpenAI.
+
+    Attributes:
+        itens (List[Item]): Itens que o modelo sabe responder
+        parametros_itens (Dict[str, ParametrosItem]): (a, b, c) por item_id
+        parametros_padrao (ParametrosItem): Usado para itens sem parâmetros
+        constante_d (float): Constante de escala D do modelo logístico
+        temperature (float): Temperatura aplicada à distribuição das letras
+            (0 = sempre a letra mais provável)
+        semente (int): Semente do sorteio
+        latencia_segundos (float): Latência artificial por chamada
+        taxa_erro (float): Probabilidade de cada chamada falhar com `ErroMockLLM`
+    """
+
+    itens: List[Any]
+    parametros_itens: Dict[str, Tuple[float, float, float]] = {}
+    parametros_padrao: Tuple[float, float, float] = (1.0, 0.0, 0.2)
+    constante_d: float = 1.0
+    temperature: float = 1.0
+    semente: int = 0
+    latencia_segundos: float = 0.0
+    taxa_erro: float = 0.0
+    model_name: str = "mock-tri"
+
+    _itens_por_texto: Dict[str, Item] = PrivateAttr(default_factory=dict)
+    _contadores: Dict[Tuple[int, str], int] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _rng_erros: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._itens_por_texto = {
+            self._texto_mensagem(item.get_human_message()): item for item in self.itens
+        }
+        self._rng_erros = np.random.default_rng(self.semente)
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock-tri"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "semente": self.semente}
+
+    @staticmethod
+    def _texto_mensagem(mensagem: BaseMessage) -> str:
+        if isinstance(mensagem.content, str):
+            return mensagem.content
+
+        return "\n".join(
+            parte["text"]
+            for parte in mensagem.content
+            if isinstance(parte, dict) and parte.get("type") == "text"
+        )
+
+    def _identificar(self, mensagens: List[BaseMessage]) -> Tuple[int, Item]:
+        """
+        Retorna (nível da persona, item) a partir das mensagens da requisição.
+        """
+        nivel: Optional[int] = None
+        item: Optional[Item] = None
+
+        for mensagem in mensagens:
+            texto = self._texto_mensagem(mensagem)
+            if isinstance(mensagem, SystemMessage):
+                encontrado = re.search(r"\*\*\*\*(.+?)\*\*\*\*", texto)
+                if encontrado and encontrado.group(1) in Respondente.NOMES_NIVEIS:
+                    nivel = Respondente.NOMES_NIVEIS.index(encontrado.group(1))
+            elif texto in self._itens_por_texto:
+                item = self._itens_por_texto[texto]
+
+        if nivel is None or item is None:
+            raise ValueError(
+                "ChatMockTRI não reconheceu a persona ou o item nas mensagens."
+            )
+
+        return nivel, item
+
+    def probabilidade_acerto(self, nivel: int, item: Item) -> float:
+        """Probabilidade de acerto do modelo 3PL para o nível e o item."""
+        a, b, c = self.parametros_itens.get(item.id_item, self.parametros_padrao)
+        theta = Respondente.get_habilidade_central(nivel)
+        return c + (1 - c) / (1 + math.exp(-self.constante_d * a * (theta - b)))
+
+    def _distribuicao(self, nivel: int, item: Item) -> np.ndarray:
+        p_acerto = self.probabilidade_acerto(nivel, item)
+        gabarito = item.gabarito.strip().upper()
+
+        probabilidades = np.full(len(LETRAS_ALTERNATIVAS), (1 - p_acerto) / 4)
+        if gabarito in LETRAS_ALTERNATIVAS:
+            probabilidades[LETRAS_ALTERNATIVAS.index(gabarito)] = p_acerto
+
+        if self.temperature <= 0:
+            probabilidades = (probabilidades == probabilidades.max()).astype(float)
+        elif self.temperature != 1.0:
+            probabilidades = probabilidades ** (1 / self.temperature)
+        return probabilidades / probabilidades.sum()
+
+    def _sortear(self, nivel: int, item: Item, indice_amostra: Optional[int]) -> str:
+        if indice_amostra is not None:
+            amostra = f"amostra={indice_amostra}"
+        else:
+            with self._lock:
+                chave = (nivel, item.id_item)
+                contador = self._contadores.get(chave, 0)
+                self._contadores[chave] = contador + 1
+            amostra = str(contador)
+
+        semente = hashlib.sha256(
+            f"{self.semente}|{nivel}|{item.id_item}|{amostra}".encode()
+        ).digest()
+        rng = np.random.default_rng(int.from_bytes(semente[:8], "little"))
+
+        indice = rng.choice(len(LETRAS_ALTERNATIVAS), p=self._distribuicao(nivel, item))
+        return LETRAS_ALTERNATIVAS[indice]
+
+    def _talvez_falhar(self) -> None:
+        if self.taxa_erro <= 0:
+            return
+
+        with self._lock:
+            falhou = self._rng_erros.random() < self.taxa_erro
+        if falhou:
+            raise ErroMockLLM("Limite de taxa simulado (429).", status_code=429)
+
+    def _responder(
+        self,
+        mensagens: List[BaseMessage],
+        indices_amostra: Sequence[int] = (),
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._talvez_falhar()
+        nivel, item = self._identificar(mensagens)
+        num_candidatos = int(kwargs.get("n", 1))
+        if indices_amostra and len(indices_amostra) != num_candidatos:
+            raise ValueError(
+                f"{len(indices_amostra)} índices de amostra para {num_candidatos} "
+                "candidatos."
+            )
+
+        metadados: Dict[str, Any] = {"model_name": self.model_name}
+        if kwargs.get("logprobs"):
+            metadados["logprobs"] = {
+                "content": [
+                    {
+                        "token": LETRAS_ALTERNATIVAS[0],
+                        "logprob": 0.0,
+                        "top_logprobs": [
+                            {"token": letra, "logprob": math.log(max(p, 1e-12))}
+                            for letra, p in zip(
+                                LETRAS_ALTERNATIVAS, self._distribuicao(nivel, item)
+                            )
+                        ],
+                    }
+                ]
+            }
+
+        geracoes = [
+            ChatGeneration(
+                message=AIMessage(
+                    content=self._sortear(
+                        nivel, item, indices_amostra[k] if indices_amostra else None
+                    ),
+                    response_metadata=metadados,
+                )
+            )
+            for k in range(num_candidatos)
+        ]
+        return ChatResult(generations=geracoes)
+
+    @staticmethod
+    def _indices_amostra(run_manager: Any) -> Sequence[int]:
+        metadados = getattr(run_manager, "metadata", None) or {}
+        return metadados.get("indices_amostra", ())
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latencia_segundos > 0:
+            time.sleep(self.latencia_segundos)
+        return self._responder(messages, self._indices_amostra(run_manager), **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latencia_segundos > 0:
+            await asyncio.sleep(self.latencia_segundos)
+        return self._responder(messages, self._indices_amostra(run_manager), **kwargs)
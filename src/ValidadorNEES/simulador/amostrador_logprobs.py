@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
+
+from .planejador import GrupoRequisicao
+
+LETRAS_ALTERNATIVAS: Tuple[str, ...] = ("A", "B", "C", "D", "E")
+
+ChaveDistribuicao = Tuple[int, str]  # (nível da persona, item_id)
+
+
+def extrair_distribuicao(mensagem: BaseMessage) -> np.ndarray:
+    """
+    Converte as log-probabilidades do primeiro token da resposta em uma
+    distribuição sobre as letras A–E.
+
+    Tokens equivalentes (ex: "A" e " a") são somados; tokens que não são letras
+    de alternativas são descartados e o restante é renormalizado.
+
+    Raises:
+        ValueError: Se a resposta não trouxer log-probabilidades ou se nenhuma
+            letra de alternativa estiver entre os tokens retornados.
+    """
+    logprobs = mensagem.response_metadata.get("logprobs")
+    if not logprobs or not logprobs.get("content"):
+        raise ValueError(
+            "A resposta não contém log-probabilidades. "
+            "Use `get_parametros_logprobs` ao montar a cadeia."
+        )
+
+    probabilidades = np.zeros(len(LETRAS_ALTERNATIVAS))
+    for candidato in logprobs["content"][0]["top_logprobs"]:
+        token = candidato["token"].strip().upper()
+        if token in LETRAS_ALTERNATIVAS:
+            probabilidades[LETRAS_ALTERNATIVAS.index(token)] += np.exp(
+                candidato["logprob"]
+            )
+
+    total = probabilidades.sum()
+    if total <= 0:
+        raise ValueError("Nenhuma letra de alternativa (A–E) entre os tokens retornados.")
+
+    return probabilidades / total
+
+
+class AmostradorLogprobs:
+    """
+    Obtém, uma única vez por (nível da persona, item), a distribuição do modelo
+    sobre as letras A–E e sorteia localmente quantas respostas forem necessárias.
+
+    Em vez de uma chamada à LLM (temperatura 1.0) para cada aluno simulado, basta
+    uma chamada por prompt distinto; as respostas individuais são amostradas com
+    um gerador NumPy com semente, sem custo adicional de LLM.
+
+    Attributes:
+        cadeia_logprobs (Runnable): Cadeia que recebe {"respondente", "item"} e
+            retorna a mensagem da LLM com log-probabilidades (sem StrOutputParser)
+        temperatura (float): Temperatura aplicada localmente à distribuição
+        distribuicoes (Dict[ChaveDistribuicao, np.ndarray]): Distribuições já obtidas
+    """
+
+    def __init__(
+        self,
+        cadeia_logprobs: Runnable,
+        semente: Optional[int] = None,
+        temperatura: float = 1.0,
+    ) -> None:
+        if temperatura <= 0:
+            raise ValueError("A temperatura deve ser positiva.")
+
+        self.cadeia_logprobs = cadeia_logprobs
+        self.temperatura = temperatura
+        self.distribuicoes: Dict[ChaveDistribuicao, np.ndarray] = {}
+        self._rng = np.random.default_rng(semente)
+
+    def __repr__(self) -> str:
+        return (
+            f"AmostradorLogprobs(temperatura={self.temperatura!r}, "
+            f"distribuicoes={len(self.distribuicoes)})"
+        )
+
+    async def obter_distribuicao(self, grupo: GrupoRequisicao) -> np.ndarray:
+        """
+        Retorna a distribuição A–E do prompt do grupo, consultando a LLM apenas se
+        ela ainda não estiver em cache.
+        """
+        chave = (grupo.nivel, grupo.item.id_item)
+        if chave not in self.distribuicoes:
+            mensagem = await self.cadeia_logprobs.ainvoke(grupo.get_inputs())
+            self.distribuicoes[chave] = extrair_distribuicao(mensagem)
+
+        return self.distribuicoes[chave]
+
+    def amostrar(self, grupo: GrupoRequisicao) -> List[str]:
+        """
+        Sorteia uma letra para cada respondente do grupo a partir da distribuição
+        em cache (ver `obter_distribuicao`).
+        """
+        probabilidades = self.distribuicoes[(grupo.nivel, grupo.item.id_item)]
+
+        if self.temperatura != 1.0:
+            probabilidades = probabilidades ** (1 / self.temperatura)
+            probabilidades = probabilidades / probabilidades.sum()
+
+        indices = self._rng.choice(
+            len(LETRAS_ALTERNATIVAS), size=grupo.num_amostras, p=probabilidades
+        )
+        return [LETRAS_ALTERNATIVAS[indice] for indice in indices]
+
+    def salvar(self, caminho: Union[str, Path]) -> None:
+        """Grava as distribuições em cache em um arquivo JSON."""
+        dados: List[Dict[str, Any]] = [
+            {"nivel": nivel, "item_id": item_id, "probabilidades": list(map(float, p))}
+            for (nivel, item_id), p in self.distribuicoes.items()
+        ]
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+
+    def carregar(self, caminho: Union[str, Path]) -> None:
+        """Carrega distribuições gravadas por `salvar` (se o arquivo existir)."""
+        caminho = Path(caminho)
+        if not caminho.is_file():
+            return
+
+        for linha in json.loads(caminho.read_text(encoding="utf-8")):
+            chave = (int(linha["nivel"]), str(linha["item_id"]))
+            self.distribuicoes[chave] = np.asarray(linha["probabilidades"])
@@ -0,0 +1,155 @@
+from typing import Dict, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from ..core.respondente import Respondente
+
+ChaveEstrato = Tuple[str, int]  # (item_id, nível da persona)
+
+
+def intervalo_wilson(
+    acertos: Union[int, np.ndarray], n: Union[int, np.ndarray], z: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intervalo de confiança de Wilson para uma proporção (funciona também com
+    arrays). Com n = 0, retorna o intervalo [0, 1].
+    """
+    acertos = np.asarray(acertos, dtype=float)
+    n = np.asarray(n, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(n > 0, acertos / n, 0.5)
+        denominador = 1 + z**2 / n
+        centro = (p + z**2 / (2 * n)) / denominador
+        margem = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominador
+
+    inferior = np.where(n > 0, np.clip(centro - margem, 0.0, 1.0), 0.0)
+    superior = np.where(n > 0, np.clip(centro + margem, 0.0, 1.0), 1.0)
+    return inferior, superior
+
+
+class MonitorPrecisao:
+    """
+    Acompanha a proporção de acerto de cada item em cada estrato de habilidade
+    (os 7 níveis da persona) e decide quando um estrato já tem precisão
+    suficiente para parar de receber novas chamadas.
+
+    Um estrato converge quando tem pelo menos `min_amostras` respostas e o
+    intervalo de confiança de Wilson da proporção de acerto tem largura menor
+    ou igual a `largura_alvo`.
+
+    Attributes:
+        largura_alvo (float): Largura máxima do intervalo de confiança
+        confianca (float): Nível de confiança do intervalo (ex: 0.95)
+        min_amostras (int): Respostas mínimas por estrato antes de parar
+        tamanho_rodada (int): Respostas agendadas por estrato a cada rodada
+    """
+
+    def __init__(
+        self,
+        largura_alvo: float = 0.10,
+        confianca: float = 0.95,
+        min_amostras: int = 10,
+        tamanho_rodada: int = 10,
+    ) -> None:
+        if not 0 < largura_alvo <= 1:
+            raise ValueError("largura_alvo deve estar entre 0 e 1.")
+        if not 0 < confianca < 1:
+            raise ValueError("confianca deve estar entre 0 e 1.")
+        if min_amostras < 1 or tamanho_rodada < 1:
+            raise ValueError("min_amostras e tamanho_rodada devem ser maiores que 0.")
+
+        self.largura_alvo = largura_alvo
+        self.confianca = confianca
+        self.min_amostras = min_amostras
+        self.tamanho_rodada = tamanho_rodada
+
+        self._z = float(norm.ppf(1 - (1 - confianca) / 2))
+        self._n: Dict[ChaveEstrato, int] = {}
+        self._acertos: Dict[ChaveEstrato, int] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"MonitorPrecisao(largura_alvo={self.largura_alvo!r}, "
+            f"confianca={self.confianca!r}, min_amostras={self.min_amostras!r})"
+        )
+
+    def registrar(self, item_id: str, nivel: int, acertou: bool) -> None:
+        chave = (item_id, nivel)
+        self._n[chave] = self._n.get(chave, 0) + 1
+        self._acertos[chave] = self._acertos.get(chave, 0) + int(acertou)
+
+    def registrar_resultados(
+        self, df_resultados: pd.DataFrame, respondentes: Dict[int, Respondente]
+    ) -> None:
+        """
+        Alimenta o monitor com resultados já obtidos (ex: de um registro de uma
+        execução anterior). Linhas de respondentes fora de `respondentes` são
+        ignoradas.
+        """
+        for respondente_id, item_id, acertou in zip(
+            df_resultados["respondente_id"],
+            df_resultados["item_id"].astype(str),
+            df_resultados["acertou"],
+        ):
+            respondente = respondentes.get(int(respondente_id))
+            if respondente is not None:
+                self.registrar(item_id, respondente.get_nivel(), bool(acertou))
+
+    def intervalo(self, item_id: str, nivel: int) -> Tuple[float, float]:
+        chave = (item_id, nivel)
+        inferior, superior = intervalo_wilson(
+            self._acertos.get(chave, 0), self._n.get(chave, 0), self._z
+        )
+        return float(inferior), float(superior)
+
+    def convergiu(self, item_id: str, nivel: int) -> bool:
+        if self._n.get((item_id, nivel), 0) < self.min_amostras:
+            return False
+        inferior, superior = self.intervalo(item_id, nivel)
+        return superior - inferior <= self.largura_alvo
+
+    def amostras_na_rodada(self, item_id: str, nivel: int) -> int:
+        """Número de novas respostas a agendar para o estrato nesta rodada."""
+        if self.convergiu(item_id, nivel):
+            return 0
+        faltam_para_minimo = self.min_amostras - self._n.get((item_id, nivel), 0)
+        return max(self.tamanho_rodada, faltam_para_minimo)
+
+    def resumo(self) -> pd.DataFrame:
+        """
+        Proporção de acerto e intervalo de confiança por (item, nível), com a
+        indicação de convergência.
+        """
+        if not self._n:
+            return pd.DataFrame(
+                columns=[
+                    "item_id",
+                    "nivel",
+                    "n",
+                    "prop_acerto",
+                    "ic_inferior",
+                    "ic_superior",
+                    "convergiu",
+                ]
+            )
+
+        chaves = sorted(self._n)
+        n = np.array([self._n[chave] for chave in chaves])
+        acertos = np.array([self._acertos[chave] for chave in chaves])
+        inferior, superior = intervalo_wilson(acertos, n, self._z)
+
+        return pd.DataFrame(
+            {
+                "item_id": [chave[0] for chave in chaves],
+                "nivel": [chave[1] for chave in chaves],
+                "n": n,
+                "prop_acerto": acertos / n,
+                "ic_inferior": inferior,
+                "ic_superior": superior,
+                "convergiu": (n >= self.min_amostras)
+                & (superior - inferior <= self.largura_alvo),
+            }
+        )
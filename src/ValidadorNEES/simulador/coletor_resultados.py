@@ -0,0 +1,256 @@
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..core.item import Item
+from ..core.respondente import Respondente
+from ..tri.estimador_online import EstimadorOnline
+from .amostrador_logprobs import LETRAS_ALTERNATIVAS
+from .planejador import PlanoEntradas
+from .registro_respostas import (
+    COLUNAS_RESULTADOS,
+    TIPOS_RESULTADOS,
+    RegistroRespostas,
+    converter_tipos,
+)
+
+# Código único das respostas que não são uma alternativa nem o gabarito do item
+RESPOSTA_INVALIDA = "INVALIDA"
+
+
+class ColetorResultados:
+    """
+    Acumula as respostas da simulação em buffers colunares tipados, em vez de uma
+    lista de dicionários por linha.
+
+    Cada resposta ocupa um slot em arrays NumPy pré-alocados (ids int32,
+    habilidade float32, códigos int16 para item/letras, acertou int8). Quando o
+    bloco enche, ele é convertido em um DataFrame com colunas categóricas e
+    gravado em `caminho_saida` (CSV, por acréscimo) ou mantido em memória.
+
+    Respostas que não são uma das `LETRAS_ALTERNATIVAS` nem o gabarito do item
+    (textos livres da LLM) recebem o código único `RESPOSTA_INVALIDA`, o que
+    mantém o número de códigos limitado; o texto original fica em
+    `respostas_invalidas` e, havendo registro, na chave "resposta_original".
+
+    Attributes:
+        tamanho_bloco (int): Número de respostas por bloco
+        caminho_saida (Optional[Path]): CSV onde os blocos são gravados. Se None,
+            os blocos ficam em memória.
+        registro (Optional[RegistroRespostas]): Log de retomada, alimentado a cada
+            chamada de `adicionar`
+        estimador_online (Optional[EstimadorOnline]): Estimação incremental dos
+            parâmetros, alimentada a cada chamada de `adicionar`
+        escopo (Optional[PlanoEntradas]): Pares (respondente, item) da execução
+            atual. Havendo registro, só as respostas desses pares são
+            retornadas por `finalizar`.
+        respostas_invalidas (Counter): Ocorrências de cada texto registrado
+            como `RESPOSTA_INVALIDA`
+    """
+
+    def __init__(
+        self,
+        tamanho_bloco: int = 100_000,
+        caminho_saida: Optional[Union[str, Path]] = None,
+        registro: Optional[RegistroRespostas] = None,
+        estimador_online: Optional[EstimadorOnline] = None,
+        escopo: Optional[PlanoEntradas] = None,
+    ) -> None:
+        if tamanho_bloco < 1:
+            raise ValueError("tamanho_bloco deve ser maior ou igual a 1.")
+
+        self.tamanho_bloco = tamanho_bloco
+        self.caminho_saida = Path(caminho_saida) if caminho_saida else None
+        self.registro = registro
+        self.estimador_online = estimador_online
+        self.escopo = escopo
+        # Parte do registro escrita antes desta execução (respostas retomadas)
+        self._bytes_registro_anteriores = registro.tamanho() if registro is not None else 0
+
+        self._respondente_id = np.empty(tamanho_bloco, dtype=np.int32)
+        self._habilidade = np.empty(tamanho_bloco, dtype=np.float32)
+        self._item = np.empty(tamanho_bloco, dtype=np.int16)
+        self._resposta = np.empty(tamanho_bloco, dtype=np.int16)
+        self._posicao = 0
+
+        # Dicionários de códigos: item_id e textos de resposta/gabarito
+        self._codigos_itens: Dict[str, int] = {}
+        self._gabarito_por_item: List[int] = []
+        self._gabarito_texto: List[str] = []
+        self._codigos_letras: Dict[str, int] = {}
+        self.respostas_invalidas: Counter = Counter()
+
+        self._blocos: List[pd.DataFrame] = []
+        self._total = 0
+        self._cabecalho_gravado = False
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _codigo_letra(self, letra: str) -> int:
+        if letra not in self._codigos_letras:
+            self._codigos_letras[letra] = len(self._codigos_letras)
+        return self._codigos_letras[letra]
+
+    def _codigo_item(self, item: Item) -> int:
+        codigo = self._codigos_itens.get(item.id_item)
+        if codigo is None:
+            codigo = len(self._codigos_itens)
+            self._codigos_itens[item.id_item] = codigo
+            # O gabarito é normalizado uma única vez por item
+            gabarito = item.gabarito.strip().upper()
+            self._gabarito_texto.append(gabarito)
+            self._gabarito_por_item.append(self._codigo_letra(gabarito))
+        return codigo
+
+    def adicionar(self, respostas: Iterable[Tuple[Respondente, Item, Any]]) -> None:
+        """
+        Adiciona respostas (respondente, item, resposta bruta da LLM) aos buffers.
+        Se houver registro, as respostas também são gravadas nele de uma vez; se
+        houver estimador online, ele recebe o lote em seguida.
+        """
+        linhas_registro: List[Dict[str, Any]] = []
+        itens_lote: List[str] = []
+        habilidades_lote: List[float] = []
+        acertos_lote: List[int] = []
+
+        for respondente, item, resposta in respostas:
+            resposta_normalizada = str(resposta).strip().upper()
+
+            codigo_item = self._codigo_item(item)
+            resposta_original = None
+            if (
+                resposta_normalizada not in LETRAS_ALTERNATIVAS
+                and resposta_normalizada != self._gabarito_texto[codigo_item]
+            ):
+                self.respostas_invalidas[resposta_normalizada] += 1
+                resposta_original = resposta_normalizada
+                resposta_normalizada = RESPOSTA_INVALIDA
+
+            posicao = self._posicao
+            self._respondente_id[posicao] = respondente.id
+            self._habilidade[posicao] = respondente.habilidade
+            self._item[posicao] = codigo_item
+            self._resposta[posicao] = self._codigo_letra(resposta_normalizada)
+            self._posicao += 1
+            self._total += 1
+
+            if self.estimador_online is not None:
+                itens_lote.append(item.id_item)
+                habilidades_lote.append(respondente.habilidade)
+                acertos_lote.append(
+                    int(self._resposta[posicao] == self._gabarito_por_item[codigo_item])
+                )
+
+            if self.registro is not None:
+                gabarito = self._gabarito_texto[codigo_item]
+                linha = {
+                    "respondente_id": respondente.id,
+                    "habilidade_respondente": respondente.habilidade,
+                    "item_id": item.id_item,
+                    "resposta_gerada": resposta_normalizada,
+                    "gabarito": gabarito,
+                    "acertou": 1 if resposta_normalizada == gabarito else 0,
+                }
+                if resposta_original is not None:
+                    linha["resposta_original"] = resposta_original
+                linhas_registro.append(linha)
+
+            if self._posicao == self.tamanho_bloco:
+                self.descarregar()
+
+        if linhas_registro and self.registro is not None:
+            self.registro.registrar(linhas_registro)
+
+        # Por último: um critério de parada pode interromper a simulação, e as
+        # respostas do lote já devem estar no registro
+        if self.estimador_online is not None:
+            self.estimador_online.registrar(itens_lote, habilidades_lote, acertos_lote)
+
+    def descarregar(self) -> None:
+        """
+        Converte o bloco atual em DataFrame e o grava em disco (ou em memória),
+        liberando os buffers para o próximo bloco.
+        """
+        n = self._posicao
+        if n == 0:
+            return
+
+        itens = np.array(list(self._codigos_itens), dtype=object)
+        letras = np.array(list(self._codigos_letras), dtype=object)
+        codigos_item = self._item[:n]
+        codigos_gabarito = np.asarray(self._gabarito_por_item, dtype=np.int16)[
+            codigos_item
+        ]
+        codigos_resposta = self._resposta[:n]
+
+        bloco = pd.DataFrame(
+            {
+                "respondente_id": self._respondente_id[:n].copy(),
+                "habilidade_respondente": self._habilidade[:n].copy(),
+                "item_id": pd.Categorical.from_codes(codigos_item, categories=itens),
+                "resposta_gerada": pd.Categorical.from_codes(
+                    codigos_resposta, categories=letras
+                ),
+                "gabarito": pd.Categorical.from_codes(
+                    codigos_gabarito, categories=letras
+                ),
+                "acertou": (codigos_resposta == codigos_gabarito).astype(np.int8),
+            },
+            columns=list(COLUNAS_RESULTADOS),
+        )
+        self._posicao = 0
+
+        if self.caminho_saida is None:
+            self._blocos.append(bloco)
+            return
+
+        if not self._cabecalho_gravado:
+            self.caminho_saida.parent.mkdir(parents=True, exist_ok=True)
+        bloco.to_csv(
+            self.caminho_saida,
+            mode="a" if self._cabecalho_gravado else "w",
+            header=not self._cabecalho_gravado,
+            index=False,
+        )
+        self._cabecalho_gravado = True
+
+    def finalizar(self) -> pd.DataFrame:
+        """
+        Descarrega o último bloco, fecha o registro e retorna todos os
+        resultados: os desta execução, dos próprios blocos, e, havendo
+        registro, as respostas retomadas de execuções anteriores que pertencem
+        ao `escopo` (lidas só da parte do log que já existia).
+        """
+        self.descarregar()
+
+        if self.caminho_saida is not None:
+            if not self._cabecalho_gravado:
+                atuais = converter_tipos(pd.DataFrame(columns=list(COLUNAS_RESULTADOS)))
+            else:
+                # Lido direto nos tipos compactos (sem colunas object intermediárias)
+                atuais = pd.read_csv(self.caminho_saida, dtype=TIPOS_RESULTADOS)
+        elif not self._blocos:
+            atuais = converter_tipos(pd.DataFrame(columns=list(COLUNAS_RESULTADOS)))
+        else:
+            # Blocos com categorias diferentes viram object no concat; reconverte
+            atuais = converter_tipos(pd.concat(self._blocos, ignore_index=True))
+
+        if self.registro is None:
+            return atuais
+
+        self.registro.fechar()
+        if not self._bytes_registro_anteriores:
+            return atuais
+
+        anteriores = self.registro.carregar(
+            self.escopo, limite_bytes=self._bytes_registro_anteriores
+        )
+        if anteriores.empty:
+            return atuais
+        return converter_tipos(
+            pd.concat([anteriores, atuais], ignore_index=True)
+        ).drop_duplicates(subset=["respondente_id", "item_id"], keep="first")
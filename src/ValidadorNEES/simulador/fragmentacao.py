@@ -0,0 +1,182 @@
+from pathlib import Path
+from typing import List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..core.item import Item
+from ..core.respondente import Respondente
+from .coletor_resultados import COLUNAS_RESULTADOS, converter_tipos
+
+
+def derivar_sementes(semente_execucao: int, num_fragmentos: int) -> List[int]:
+    """
+    Deriva uma semente independente por fragmento a partir da semente da
+    execução (via `np.random.SeedSequence.spawn`). A mesma semente de execução
+    gera sempre as mesmas sementes, em qualquer máquina.
+    """
+    if num_fragmentos < 1:
+        raise ValueError("num_fragmentos deve ser maior ou igual a 1.")
+
+    sequencias = np.random.SeedSequence(semente_execucao).spawn(num_fragmentos)
+    return [int(sequencia.generate_state(1)[0]) for sequencia in sequencias]
+
+
+class Fragmento:
+    """
+    Uma fatia da grade (respondente x item) que pode ser simulada em um processo
+    ou máquina independente.
+
+    A grade é dividida por respondente: o fragmento `indice` recebe os
+    respondentes nas posições `indice`, `indice + num_fragmentos`, ... da
+    população (todos os itens de cada um). Assim os níveis de persona ficam
+    equilibrados entre os fragmentos e o modo "prova inteira" continua possível.
+
+    Attributes:
+        indice (int): Posição do fragmento (0 a num_fragmentos - 1)
+        num_fragmentos (int): Total de fragmentos da execução
+        semente (int): Semente própria do fragmento (LLM mock, sorteios locais)
+    """
+
+    def __init__(self, indice: int, num_fragmentos: int, semente: int) -> None:
+        if not 0 <= indice < num_fragmentos:
+            raise ValueError(
+                f"Fragmento {indice} inválido para {num_fragmentos} fragmentos."
+            )
+
+        self.indice = indice
+        self.num_fragmentos = num_fragmentos
+        self.semente = semente
+
+    def __repr__(self) -> str:
+        return (
+            f"Fragmento(indice={self.indice!r}, "
+            f"num_fragmentos={self.num_fragmentos!r}, semente={self.semente!r})"
+        )
+
+    def selecionar(self, populacao: List[Respondente]) -> List[Respondente]:
+        """Retorna os respondentes deste fragmento (a população deve ser a mesma
+        em todos os fragmentos, ex: gerada com a mesma semente)."""
+        return populacao[self.indice :: self.num_fragmentos]
+
+    def caminho(self, caminho_base: Union[str, Path]) -> Path:
+        """
+        Caminho de saída próprio do fragmento, derivado do caminho da execução
+        (ex: resultados.csv -> resultados.fragmento_1_de_4.csv).
+        """
+        caminho_base = Path(caminho_base)
+        return caminho_base.with_name(
+            f"{caminho_base.stem}.fragmento_{self.indice}_de_{self.num_fragmentos}"
+            f"{caminho_base.suffix}"
+        )
+
+
+def criar_fragmentos(semente_execucao: int, num_fragmentos: int) -> List[Fragmento]:
+    """Cria os `num_fragmentos` fragmentos de uma execução, com suas sementes."""
+    return [
+        Fragmento(indice, num_fragmentos, semente)
+        for indice, semente in enumerate(
+            derivar_sementes(semente_execucao, num_fragmentos)
+        )
+    ]
+
+
+def verificar_cobertura(
+    df_resultados: pd.DataFrame, populacao: List[Respondente], itens: List[Item]
+) -> pd.DataFrame:
+    """
+    Retorna os pares (respondente_id, item_id) da grade que não aparecem nos
+    resultados (DataFrame vazio se a cobertura for completa).
+    """
+    esperados = pd.MultiIndex.from_product(
+        [[respondente.id for respondente in populacao], [item.id_item for item in itens]],
+        names=["respondente_id", "item_id"],
+    )
+    obtidos = pd.MultiIndex.from_arrays(
+        [
+            df_resultados["respondente_id"].astype("int64"),
+            df_resultados["item_id"].astype(str),
+        ]
+    )
+    return esperados.difference(obtidos).to_frame(index=False)
+
+
+def juntar_fragmentos(
+    caminhos: Sequence[Union[str, Path]],
+    populacao: List[Respondente],
+    itens: List[Item],
+    permitir_incompleto: bool = False,
+) -> pd.DataFrame:
+    """
+    Junta os resultados (CSV) dos fragmentos em uma única tabela, verificando
+    que todos os fragmentos usaram a mesma população e que a grade
+    (respondente x item) está completa.
+
+    Pares repetidos (ex: um fragmento executado duas vezes) são mantidos uma
+    única vez, na primeira ocorrência.
+
+    Args:
+        caminhos (Sequence[Union[str, Path]]): CSVs de resultados dos fragmentos
+        populacao (List[Respondente]): População completa da execução
+        itens (List[Item]): Itens da prova
+        permitir_incompleto (bool): Se True, apenas avisa sobre pares faltantes
+
+    Returns:
+        pd.DataFrame: Resultados de todos os fragmentos, ordenados por
+        respondente e item.
+
+    Raises:
+        ValueError: Se faltar algum arquivo, se as habilidades divergirem da
+            população ou se a grade estiver incompleta (sem `permitir_incompleto`).
+    """
+    faltando = [str(caminho) for caminho in caminhos if not Path(caminho).is_file()]
+    if faltando:
+        raise ValueError(f"Resultados de fragmentos não encontrados: {faltando}")
+
+    df_resultados = pd.concat(
+        [pd.read_csv(caminho, dtype={"item_id": str}) for caminho in caminhos],
+        ignore_index=True,
+    )
+    df_resultados = df_resultados.reindex(columns=list(COLUNAS_RESULTADOS))
+
+    total = len(df_resultados)
+    df_resultados = df_resultados.drop_duplicates(
+        subset=["respondente_id", "item_id"], keep="first"
+    )
+    if len(df_resultados) < total:
+        print(f"{total - len(df_resultados)} respostas repetidas foram descartadas.")
+
+    habilidades = pd.Series(
+        {respondente.id: respondente.habilidade for respondente in populacao}
+    )
+    esperadas = df_resultados["respondente_id"].map(habilidades)
+    divergentes = ~np.isclose(
+        df_resultados["habilidade_respondente"].to_numpy(dtype=float),
+        esperadas.to_numpy(dtype=float),
+        atol=1e-4,
+    )
+    if divergentes.any():
+        raise ValueError(
+            f"{int(divergentes.sum())} respostas têm respondentes fora da população "
+            "ou com habilidade diferente. Os fragmentos usaram a mesma semente?"
+        )
+
+    pares_faltantes = verificar_cobertura(df_resultados, populacao, itens)
+    if len(pares_faltantes):
+        mensagem = (
+            f"{len(pares_faltantes)} pares (respondente, item) não foram simulados "
+            f"em nenhum fragmento (ex: {pares_faltantes.head(3).to_dict('records')})."
+        )
+        if not permitir_incompleto:
+            raise ValueError(mensagem)
+        print(f"AVISO: {mensagem}")
+
+    ordem_itens = {item.id_item: posicao for posicao, item in enumerate(itens)}
+    df_resultados = df_resultados.sort_values(
+        ["respondente_id", "item_id"],
+        key=lambda coluna: (
+            coluna.map(ordem_itens) if coluna.name == "item_id" else coluna
+        ),
+        ignore_index=True,
+    )
+    return converter_tipos(df_resultados)
@@ -0,0 +1,188 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core.item import Item
+from ..core.respondente import Respondente
+
+
+class PlanoEntradas:
+    """
+    Plano preguiçoso dos pares (respondente, item) a simular.
+
+    Em vez de materializar o produto cartesiano como uma lista de dicionários,
+    cada par é identificado por um índice linear k = i * num_itens + j
+    (respondente i, item j). Os inputs da cadeia só são montados quando
+    acessados (`plano[k]` ou iteração).
+
+    Attributes:
+        populacao (List[Respondente]): Alunos simulados
+        itens (List[Item]): Itens da prova
+        escopo (PlanoEntradas): Plano original, antes de `excluir` os pares já
+            concluídos (o próprio plano se nada foi excluído)
+    """
+
+    def __init__(
+        self,
+        populacao: List[Respondente],
+        itens: List[Item],
+        indices: Optional[np.ndarray] = None,
+        escopo: Optional["PlanoEntradas"] = None,
+    ) -> None:
+        self.populacao = populacao
+        self.itens = itens
+        # Índices lineares pendentes; None significa "todos os pares"
+        self._indices = indices
+        self.escopo = escopo if escopo is not None else self
+
+    def __repr__(self) -> str:
+        return (
+            f"PlanoEntradas(respondentes={len(self.populacao)}, "
+            f"itens={len(self.itens)}, pendentes={len(self)})"
+        )
+
+    @property
+    def total_pares(self) -> int:
+        return len(self.populacao) * len(self.itens)
+
+    def __len__(self) -> int:
+        if self._indices is None:
+            return self.total_pares
+        return len(self._indices)
+
+    def par(self, k: int) -> Tuple[Respondente, Item]:
+        """Retorna o k-ésimo par (respondente, item) pendente do plano."""
+        indice = k if self._indices is None else int(self._indices[k])
+        i, j = divmod(indice, len(self.itens))
+        return self.populacao[i], self.itens[j]
+
+    def __getitem__(self, k: int) -> Dict[str, Any]:
+        respondente, item = self.par(k)
+        return {"respondente": respondente, "item": item}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for k in range(len(self)):
+            yield self[k]
+
+    def excluir(self, concluidas: Set[Tuple[int, str]]) -> "PlanoEntradas":
+        """
+        Retorna um novo plano sem os pares (respondente_id, item_id) concluídos.
+        """
+        if not concluidas:
+            return self
+
+        indice_respondente = {r.id: i for i, r in enumerate(self.populacao)}
+        indice_item = {item.id_item: j for j, item in enumerate(self.itens)}
+
+        pendentes = np.ones(self.total_pares, dtype=bool)
+        for respondente_id, item_id in concluidas:
+            i = indice_respondente.get(respondente_id)
+            j = indice_item.get(item_id)
+            if i is not None and j is not None:
+                pendentes[i * len(self.itens) + j] = False
+
+        if self._indices is not None:
+            mascara = np.zeros(self.total_pares, dtype=bool)
+            mascara[self._indices] = True
+            pendentes &= mascara
+
+        return PlanoEntradas(
+            self.populacao, self.itens, np.flatnonzero(pendentes), escopo=self.escopo
+        )
+
+    def contem(self, respondente_ids: Iterable[int], item_ids: Iterable[str]) -> np.ndarray:
+        """
+        Indica, para cada par (respondente_id, item_id), se ele pertence ao
+        plano.
+
+        Returns:
+            np.ndarray: Máscara booleana, uma posição por par.
+        """
+        i = pd.Index([r.id for r in self.populacao]).get_indexer(
+            np.asarray(respondente_ids, dtype=np.int64)
+        )
+        j = pd.Index([item.id_item for item in self.itens]).get_indexer(
+            np.asarray(item_ids, dtype=str).astype(object)
+        )
+        validos = (i >= 0) & (j >= 0)
+        if self._indices is None:
+            return validos
+
+        mascara = np.zeros(self.total_pares, dtype=bool)
+        mascara[self._indices] = True
+        return validos & mascara[np.where(validos, i * len(self.itens) + j, 0)]
+
+
+class GrupoRequisicao:
+    """
+    Conjunto de respondentes que enviariam exatamente o mesmo prompt à LLM:
+    mesmo nível de persona (mesma mensagem de sistema) e mesmo item.
+
+    Attributes:
+        nivel (int): Nível da persona (ver `Respondente.get_nivel`)
+        item (Item): Questão a ser respondida
+        respondentes (List[Respondente]): Respondentes que compartilham o prompt
+    """
+
+    def __init__(self, nivel: int, item: Item, respondentes: List[Respondente]) -> None:
+        self.nivel = nivel
+        self.item = item
+        self.respondentes = respondentes
+
+    def __repr__(self) -> str:
+        return (
+            f"GrupoRequisicao(nivel={self.nivel!r}, "
+            f"item={self.item.id_item!r}, "
+            f"respondentes={len(self.respondentes)})"
+        )
+
+    @property
+    def num_amostras(self) -> int:
+        """Número de respostas (amostras) necessárias para o grupo."""
+        return len(self.respondentes)
+
+    def dividir(self, max_amostras: int) -> List["GrupoRequisicao"]:
+        """
+        Divide o grupo em partes com no máximo `max_amostras` respondentes, para
+        respeitar o limite de candidatos por requisição do provedor.
+        """
+        return [
+            GrupoRequisicao(
+                nivel=self.nivel,
+                item=self.item,
+                respondentes=self.respondentes[inicio : inicio + max_amostras],
+            )
+            for inicio in range(0, len(self.respondentes), max_amostras)
+        ]
+
+    def get_inputs(self) -> Dict[str, Any]:
+        """
+        Retorna o input da cadeia para o grupo, usando o primeiro respondente como
+        representante (todos geram o mesmo prompt).
+        """
+        return {"respondente": self.respondentes[0], "item": self.item}
+
+
+def agrupar_requisicoes(
+    lista_de_inputs: Iterable[Dict[str, Any]],
+) -> List[GrupoRequisicao]:
+    """
+    Agrupa os pares (respondente, item) que geram prompts idênticos.
+
+    Como a mensagem de sistema depende apenas do nível da persona (7 níveis),
+    500 respondentes x 45 itens se reduzem a no máximo 7 x 45 = 315 prompts
+    distintos. A ordem dos grupos segue a primeira ocorrência em `lista_de_inputs`.
+    """
+    grupos: Dict[Tuple[int, str], GrupoRequisicao] = {}
+
+    for inputs in lista_de_inputs:
+        respondente: Respondente = inputs["respondente"]
+        item: Item = inputs["item"]
+        chave = (respondente.get_nivel(), item.id_item)
+
+        if chave not in grupos:
+            grupos[chave] = GrupoRequisicao(nivel=chave[0], item=item, respondentes=[])
+        grupos[chave].respondentes.append(respondente)
+
+    return list(grupos.values())
@@ -0,0 +1,226 @@
+import io
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..core.respondente import Respondente
+from .planejador import PlanoEntradas
+
+ChaveResposta = Tuple[int, str]  # (respondente_id, item_id)
+
+COLUNAS_RESULTADOS: Tuple[str, ...] = (
+    "respondente_id",
+    "habilidade_respondente",
+    "item_id",
+    "resposta_gerada",
+    "gabarito",
+    "acertou",
+)
+
+# Tipos compactos dos resultados (ids int32, habilidade float32, textos
+# categóricos e acertou int8)
+TIPOS_RESULTADOS: Dict[str, str] = {
+    "respondente_id": "int32",
+    "habilidade_respondente": "float32",
+    "item_id": "category",
+    "resposta_gerada": "category",
+    "gabarito": "category",
+    "acertou": "int8",
+}
+
+
+def converter_tipos(df_resultados: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte um DataFrame de resultados para os tipos compactos usados pelo
+    `ColetorResultados` (ver `TIPOS_RESULTADOS`).
+    """
+    return df_resultados.astype(TIPOS_RESULTADOS)
+
+
+class RegistroRespostas:
+    """
+    Log em disco, somente de acréscimo (JSONL), com cada resposta concluída da
+    simulação.
+
+    Cada linha contém um resultado no mesmo formato das linhas do DataFrame
+    retornado pelo `Simulador`. Como as respostas são gravadas assim que chegam,
+    uma execução interrompida (erro de cota, queda, Ctrl-C) pode ser retomada
+    apenas com os pares (respondente, item) que ainda faltam.
+
+    Attributes:
+        caminho (Path): Caminho do arquivo .jsonl
+    """
+
+    def __init__(self, caminho: Union[str, Path]) -> None:
+        self.caminho = Path(caminho)
+        self._arquivo: Optional[IO[str]] = None
+
+    def __repr__(self) -> str:
+        return f"RegistroRespostas(caminho={str(self.caminho)!r})"
+
+    def __enter__(self) -> "RegistroRespostas":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.fechar()
+
+    @staticmethod
+    def _converter_bloco(linhas: List[bytes]) -> pd.DataFrame:
+        """
+        Converte um bloco de linhas do log em DataFrame tipado. O bloco é lido
+        de uma vez pelo `pd.read_json`; só se houver uma linha inválida (ex:
+        escrita interrompida no meio) ele é decodificado linha a linha, e as
+        linhas inválidas são ignoradas.
+        """
+        try:
+            df = pd.read_json(
+                io.StringIO(b"".join(linhas).decode("utf-8")),
+                lines=True,
+                dtype={"item_id": str},
+                convert_dates=False,
+            )
+        except ValueError:
+            validas = []
+            for linha in linhas:
+                try:
+                    validas.append(json.loads(linha))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+            df = pd.DataFrame(validas)
+
+        df = df.reindex(columns=list(COLUNAS_RESULTADOS)).dropna(
+            subset=["respondente_id", "item_id"]
+        )
+        return converter_tipos(df.astype({"item_id": str}))
+
+    def _ler_blocos(
+        self, limite_bytes: Optional[int] = None, tamanho_bloco: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lê o log em blocos de `tamanho_bloco` linhas, cada um convertido para os
+        tipos compactos antes do próximo: os objetos Python da decodificação
+        nunca passam de um bloco. Com `limite_bytes`, lê só o início do log
+        (ex: o que já existia antes da execução atual).
+        """
+        if not self.caminho.is_file():
+            return
+
+        restante = self.tamanho() if limite_bytes is None else limite_bytes
+        with self.caminho.open("rb") as arquivo:
+            while restante > 0:
+                linhas: List[bytes] = []
+                while len(linhas) < tamanho_bloco and restante > 0:
+                    linha = arquivo.readline()
+                    if not linha:
+                        restante = 0
+                        break
+                    restante -= len(linha)
+                    if linha.strip():
+                        linhas.append(linha)
+                if linhas:
+                    yield self._converter_bloco(linhas)
+
+    def tamanho(self) -> int:
+        """Tamanho atual do log em bytes (0 se ele não existir)."""
+        return self.caminho.stat().st_size if self.caminho.is_file() else 0
+
+    def chaves_concluidas(self) -> Set[ChaveResposta]:
+        """
+        Retorna o conjunto de pares (respondente_id, item_id) já registrados.
+        """
+        chaves: Set[ChaveResposta] = set()
+        for bloco in self._ler_blocos():
+            chaves.update(
+                zip(bloco["respondente_id"].tolist(), bloco["item_id"].astype(str).tolist())
+            )
+        return chaves
+
+    def verificar_populacao(self, populacao: List[Respondente]) -> None:
+        """
+        Confirma que os respondentes já registrados têm a mesma habilidade que os
+        da população atual. Sem isso, uma retomada misturaria alunos diferentes
+        sob o mesmo id.
+        """
+        habilidades = pd.Series(
+            {respondente.id: respondente.habilidade for respondente in populacao},
+            dtype="float32",
+        )
+
+        divergentes: Set[int] = set()
+        for bloco in self._ler_blocos():
+            # Comparação na precisão float32 em que o bloco é lido
+            esperadas = bloco["respondente_id"].map(habilidades)
+            diferentes = esperadas.notna() & ~np.isclose(
+                bloco["habilidade_respondente"], esperadas, rtol=0, atol=1e-6
+            )
+            divergentes.update(bloco.loc[diferentes, "respondente_id"].tolist())
+
+        if divergentes:
+            raise ValueError(
+                f"O registro {self.caminho} foi gerado com outra população: "
+                f"habilidades divergentes para os respondentes {sorted(divergentes)[:10]}. "
+                "Use a mesma semente ou outro arquivo de registro."
+            )
+
+    def registrar(self, resultados: Iterable[Dict[str, Any]]) -> None:
+        """
+        Acrescenta os resultados ao final do log e força a escrita em disco.
+        """
+        if self._arquivo is None:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            # Uma última linha truncada ganha a quebra de linha que faltou, para
+            # que a próxima resposta não seja grudada nela
+            truncado = False
+            if self.caminho.is_file() and self.caminho.stat().st_size > 0:
+                with self.caminho.open("rb") as arquivo:
+                    arquivo.seek(-1, 2)
+                    truncado = arquivo.read(1) != b"\n"
+            self._arquivo = self.caminho.open("a", encoding="utf-8")
+            if truncado:
+                self._arquivo.write("\n")
+
+        for resultado in resultados:
+            self._arquivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+
+    def fechar(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def carregar(
+        self, escopo: Optional[PlanoEntradas] = None, limite_bytes: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Retorna as respostas registradas como DataFrame nos tipos compactos
+        (`TIPOS_RESULTADOS`, mesmo sem respostas). O log é lido em blocos já
+        tipados. Se houver chaves repetidas (ex.: a mesma resposta gravada duas
+        vezes), mantém a primeira.
+
+        Args:
+            escopo (Optional[PlanoEntradas]): Se informado, mantém apenas os
+                pares (respondente, item) do plano, descartando respostas de
+                execuções com outra população, outros itens ou outro desenho
+            limite_bytes (Optional[int]): Se informado, lê só os primeiros
+                `limite_bytes` bytes do log (ver `tamanho`)
+
+        Returns:
+            pd.DataFrame: Respostas registradas.
+        """
+        blocos = []
+        for bloco in self._ler_blocos(limite_bytes):
+            if escopo is not None:
+                bloco = bloco[
+                    escopo.contem(bloco["respondente_id"], bloco["item_id"].astype(str))
+                ]
+            blocos.append(bloco)
+
+        if not blocos:
+            return converter_tipos(pd.DataFrame(columns=list(COLUNAS_RESULTADOS)))
+
+        # Blocos com categorias diferentes viram object no concat; reconverte
+        df = converter_tipos(pd.concat(blocos, ignore_index=True))
+        return df.drop_duplicates(subset=["respondente_id", "item_id"], keep="first")
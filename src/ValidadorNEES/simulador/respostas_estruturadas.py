@@ -0,0 +1,42 @@
+from typing import Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+from ..core.item import Item
+
+
+class RespostaItem(BaseModel):
+    """Resposta do aluno simulado para uma questão."""
+
+    item_id: str = Field(description="Identificador da questão (item_id)")
+    letra: Literal["A", "B", "C", "D", "E"] = Field(
+        description="Letra da alternativa escolhida"
+    )
+
+
+class RespostasProva(BaseModel):
+    """Respostas do aluno simulado para todas as questões enviadas."""
+
+    respostas: List[RespostaItem] = Field(
+        description="Uma resposta para cada questão, identificada pelo item_id"
+    )
+
+
+def validar_respostas(respostas: RespostasProva, itens: List[Item]) -> Dict[str, str]:
+    """
+    Confere a resposta estruturada com a lista de itens enviada e retorna o
+    dicionário item_id -> letra apenas com os itens respondidos corretamente.
+
+    Respostas para itens que não foram enviados são descartadas; se um item
+    aparecer mais de uma vez, vale a primeira resposta. Os itens ausentes do
+    dicionário devem ser refeitos individualmente.
+    """
+    ids_enviados = {item.id_item for item in itens}
+
+    letras: Dict[str, str] = {}
+    for resposta in respostas.respostas:
+        item_id = resposta.item_id.strip()
+        if item_id in ids_enviados and item_id not in letras:
+            letras[item_id] = resposta.letra
+
+    return letras
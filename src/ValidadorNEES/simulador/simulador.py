@@ -1,17 +1,98 @@
+import asyncio
 import time
-from typing import List
+from collections import deque
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import pandas as pd
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import Runnable
+from pydantic import ValidationError
 from tqdm import tqdm
 
+from ..core.item import Item
 from ..core.prova import Prova
 from ..core.respondente import Respondente
+from ..infraestrutura.cache_respostas import CacheCandidatos
+from ..infraestrutura.controle_concorrencia import (
+    ControladorConcorrencia,
+    PoliticaRetentativa,
+)
+from ..infraestrutura.limitador_taxa import LimitadorTaxa, estimar_tokens
+from ..infraestrutura.provedor_llm import get_parametros_candidatos
+from ..tri.cat import MotorCAT
+from ..tri.estimador_online import EstimadorOnline
+from .amostragem_sequencial import ChaveEstrato, MonitorPrecisao
+from .amostrador_logprobs import AmostradorLogprobs
+from .coletor_resultados import ColetorResultados
+from .planejador import GrupoRequisicao, PlanoEntradas, agrupar_requisicoes
+from .registro_respostas import RegistroRespostas
+from .respostas_estruturadas import validar_respostas
+
+T = TypeVar("T")
 
 
 class Simulador:
-    def __init__(self, responder_chain: Runnable):
+    def __init__(
+        self,
+        responder_chain: Runnable,
+        tamanho_bloco_resultados: int = 100_000,
+        caminho_saida: Optional[Union[str, Path]] = None,
+        politica_retentativa: Optional[PoliticaRetentativa] = None,
+        controlador: Optional[ControladorConcorrencia] = None,
+        estimador_online: Optional[EstimadorOnline] = None,
+    ):
+        """
+        Args:
+            responder_chain (Runnable): Cadeia {"respondente", "item"} -> letra
+            tamanho_bloco_resultados (int): Respostas acumuladas nos buffers
+                colunares antes de cada descarga (ver `ColetorResultados`)
+            caminho_saida (Optional[Union[str, Path]]): CSV para onde os blocos
+                de resultados são descarregados. Se None, ficam em memória.
+            politica_retentativa (Optional[PoliticaRetentativa]): Retentativas com
+                backoff para chamadas que falham. Se None, usa a política padrão.
+            controlador (Optional[ControladorConcorrencia]): Controle AIMD do número
+                de requisições em voo. Quando informado, substitui `max_em_voo`
+                (e `tamanho_lote`/`delay_segundos` no modo síncrono).
+            estimador_online (Optional[EstimadorOnline]): Recebe cada lote de
+                respostas assim que ele é coletado, para acompanhar a
+                recuperação dos parâmetros durante a execução (e interrompê-la
+                via `criterio_parada`)
+
+        Attributes:
+            falhas (List[Dict[str, Any]]): Pares (respondente, item) que continuaram
+                falhando após todas as tentativas na última execução
+        """
         self.chain = responder_chain
+        self.tamanho_bloco_resultados = tamanho_bloco_resultados
+        self.caminho_saida = caminho_saida
+        self.politica_retentativa = politica_retentativa or PoliticaRetentativa()
+        self.controlador = controlador
+        self.estimador_online = estimador_online
+        self.falhas: List[Dict[str, Any]] = []
+
+    def _criar_coletor(
+        self, registro: Optional[RegistroRespostas], escopo: PlanoEntradas
+    ) -> ColetorResultados:
+        return ColetorResultados(
+            tamanho_bloco=self.tamanho_bloco_resultados,
+            caminho_saida=self.caminho_saida,
+            registro=registro,
+            estimador_online=self.estimador_online,
+            escopo=escopo,
+        )
 
     def executar(
         self,
@@ -19,64 +100,996 @@ class Simulador:
         populacao: List[Respondente],
         tamanho_lote: int = 45,
         delay_segundos: int = 2,
+        registro: Optional[RegistroRespostas] = None,
+        plano: Optional[PlanoEntradas] = None,
     ) -> pd.DataFrame:
         """
         Executa a simulação completa, processando em lotes controlados com delay.
+
+        Se um `registro` for informado, cada lote concluído é gravado em disco e
+        os pares (respondente, item) já presentes no registro não são refeitos.
+
+        Itens que falham são repetidos conforme a política de retentativas; os que
+        continuam falhando vão para `self.falhas`. Com um controlador AIMD, o
+        tamanho do lote acompanha o limite de concorrência e não há delay fixo.
+        """
+        plano = self._planejar_inputs(prova, populacao, registro, plano)
+        self.falhas = []
+
+        descricao_ritmo = (
+            repr(self.controlador)
+            if self.controlador is not None
+            else f"lotes de {tamanho_lote} com delay de {delay_segundos}s"
+        )
+        print(f"\nIniciando simulação com {len(plano)} respostas ({descricao_ritmo})...")
+
+        coletor = self._criar_coletor(registro, plano.escopo)
+        total_de_inputs = len(plano)
+        barra_progresso = tqdm(total=total_de_inputs, desc="Processando respostas")
+
+        # O lote avança pelo plano; com controlador, seu tamanho é o limite atual
+        i = 0
+        while i < total_de_inputs:
+            tamanho = (
+                int(self.controlador.limite)
+                if self.controlador is not None
+                else tamanho_lote
+            )
+            # Monta apenas os inputs do lote atual a partir do plano
+            lote_inputs = [plano[k] for k in range(i, min(i + tamanho, total_de_inputs))]
+            i += len(lote_inputs)
+
+            respostas_do_lote = self._executar_lote_com_retentativas(lote_inputs, tamanho)
+
+            # Adiciona os resultados deste lote aos buffers (e ao registro)
+            coletor.adicionar(
+                (inputs["respondente"], inputs["item"], resposta)
+                for inputs, resposta in respostas_do_lote
+            )
+            barra_progresso.update(len(lote_inputs))
+
+            # Adiciona o delay, mas apenas se este não for o último lote
+            if self.controlador is None and i < total_de_inputs:
+                time.sleep(delay_segundos)
+
+        barra_progresso.close()
+        self._reportar_falhas()
+
+        return coletor.finalizar()
+
+    def _executar_lote_com_retentativas(
+        self, lote_inputs: List[Dict[str, Any]], max_concorrencia: int
+    ) -> List[Tuple[Dict[str, Any], Any]]:
+        """
+        Executa um lote com `chain.batch` sem abortar em erros: os itens que
+        falham são repetidos com backoff e, esgotadas as tentativas, registrados
+        em `self.falhas`. Retorna os pares (inputs, resposta) bem-sucedidos.
+        """
+        politica = self.politica_retentativa
+        concluidos: List[Tuple[Dict[str, Any], Any]] = []
+        pendentes = lote_inputs
+        tentativas = 0
+
+        while pendentes:
+            tentativas += 1
+            respostas = self.chain.batch(
+                pendentes,
+                config=[
+                    {**self._config_amostras(inputs), "max_concurrency": max_concorrencia}
+                    for inputs in pendentes
+                ],
+                return_exceptions=True,
+            )
+
+            repetir = []
+            for inputs, resposta in zip(pendentes, respostas):
+                if not isinstance(resposta, Exception):
+                    concluidos.append((inputs, resposta))
+                    if self.controlador is not None:
+                        self.controlador.registrar_sucesso()
+                    continue
+
+                if self.controlador is not None:
+                    self.controlador.registrar_erro(resposta)
+                if politica.deve_repetir(resposta, tentativas):
+                    repetir.append(inputs)
+                else:
+                    self._adicionar_falha(
+                        inputs["respondente"].id, inputs["item"].id_item, resposta, tentativas
+                    )
+
+            pendentes = repetir
+            if pendentes:
+                time.sleep(politica.espera(tentativas))
+
+        return concluidos
+
+    async def executar_async(
+        self,
+        prova: Prova,
+        populacao: List[Respondente],
+        max_em_voo: int = 45,
+        limitador: Optional[LimitadorTaxa] = None,
+        registro: Optional[RegistroRespostas] = None,
+        plano: Optional[PlanoEntradas] = None,
+    ) -> pd.DataFrame:
+        """
+        Executa a simulação de forma assíncrona, mantendo sempre `max_em_voo`
+        requisições em andamento (via `Runnable.ainvoke`).
+
+        Em vez de lotes separados por pausas fixas, o ritmo é controlado pelo
+        `limitador` (RPM/TPM): assim que uma resposta chega, a próxima requisição
+        é enviada, desde que haja cota disponível.
+
+        Args:
+            prova (Prova): Prova a ser respondida
+            populacao (List[Respondente]): Alunos simulados
+            max_em_voo (int): Número máximo de requisições simultâneas
+            limitador (Optional[LimitadorTaxa]): Limitador de RPM/TPM. Se None,
+                apenas `max_em_voo` limita o ritmo.
+            registro (Optional[RegistroRespostas]): Log em disco onde cada resposta
+                é gravada assim que chega. Pares já registrados são pulados.
+            plano (Optional[PlanoEntradas]): Pares (respondente, item) a simular
+                (ex: `DesenhoCalibracao.plano`). Se None, todos os pares.
+
+        Returns:
+            pd.DataFrame: Mesmo formato retornado por `executar`.
         """
-        lista_de_inputs = [
-            {"respondente": respondente, "item": item}
-            for respondente in populacao
-            for item in prova.itens
+        if max_em_voo < 1:
+            raise ValueError("max_em_voo deve ser maior ou igual a 1.")
+
+        plano = self._planejar_inputs(prova, populacao, registro, plano)
+        total_de_inputs = len(plano)
+        self.falhas = []
+
+        print(
+            f"\nIniciando simulação assíncrona com {total_de_inputs} respostas "
+            f"({self._descrever_concorrencia(max_em_voo)}, {limitador!r})..."
+        )
+
+        coletor = self._criar_coletor(registro, plano.escopo)
+        barra_progresso = tqdm(total=total_de_inputs, desc="Processando respostas")
+
+        async def processar(indice: int) -> None:
+            inputs = plano[indice]
+            if limitador is not None:
+                await limitador.adquirir(self._estimar_tokens(inputs))
+
+            resposta = await self.chain.ainvoke(inputs, self._config_amostras(inputs))
+            coletor.adicionar([(inputs["respondente"], inputs["item"], resposta)])
+            barra_progresso.update(1)
+
+        try:
+            falhas = await self._executar_em_pool(
+                range(total_de_inputs), processar, max_em_voo
+            )
+        finally:
+            barra_progresso.close()
+            if registro is not None:
+                registro.fechar()
+
+        for indice, erro, tentativas in falhas:
+            respondente, item = plano.par(indice)
+            self._adicionar_falha(respondente.id, item.id_item, erro, tentativas)
+        self._reportar_falhas()
+
+        return coletor.finalizar()
+
+    async def executar_agrupado(
+        self,
+        prova: Prova,
+        populacao: List[Respondente],
+        llm_candidatos: Optional[BaseChatModel] = None,
+        max_candidatos: int = 8,
+        max_em_voo: int = 45,
+        limitador: Optional[LimitadorTaxa] = None,
+        registro: Optional[RegistroRespostas] = None,
+        plano: Optional[PlanoEntradas] = None,
+        cache_candidatos: Optional[CacheCandidatos] = None,
+    ) -> pd.DataFrame:
+        """
+        Executa a simulação agrupando os pares (respondente, item) que geram o
+        mesmo prompt (mesmo nível de persona e mesmo item).
+
+        Para cada grupo com k respondentes, pede-se k amostras ao provedor e as
+        respostas são distribuídas de volta entre os respondentes do grupo.
+
+        A redução de chamadas só acontece com `llm_candidatos` (provedor que
+        aceita `n` candidatos por requisição). Sem ele, cada respondente continua
+        custando uma requisição, como em `executar_async`: reaproveitar uma
+        única resposta para o grupo inteiro daria a mesma alternativa a todos os
+        respondentes do nível e distorceria a distribuição das respostas.
+
+        Args:
+            prova (Prova): Prova a ser respondida
+            populacao (List[Respondente]): Alunos simulados
+            llm_candidatos (Optional[BaseChatModel]): Modelo usado para pedir
+                várias respostas candidatas (`n`) em uma única requisição. Se None,
+                as k amostras são obtidas por k chamadas à cadeia, sem redução
+                do número de requisições.
+            max_candidatos (int): Máximo de candidatos por requisição aceito pelo
+                provedor (ex: 8 no Gemini).
+            max_em_voo (int): Número máximo de requisições simultâneas
+            limitador (Optional[LimitadorTaxa]): Limitador de RPM/TPM
+            registro (Optional[RegistroRespostas]): Log em disco das respostas
+            plano (Optional[PlanoEntradas]): Pares (respondente, item) a simular
+                (ex: `DesenhoCalibracao.plano`). Se None, todos os pares.
+            cache_candidatos (Optional[CacheCandidatos]): Cache das respostas
+                pedidas a `llm_candidatos` (sem `llm_candidatos`, o cache é o
+                da própria cadeia); só os respondentes sem resposta em cache
+                entram na requisição
+
+        Returns:
+            pd.DataFrame: Mesmo formato retornado por `executar`.
+        """
+        if max_em_voo < 1 or max_candidatos < 1:
+            raise ValueError("max_em_voo e max_candidatos devem ser maiores que 0.")
+
+        plano = self._planejar_inputs(prova, populacao, registro, plano)
+        grupos = agrupar_requisicoes(plano)
+
+        # Cada requisição pede no máximo `amostras_por_requisicao` respostas
+        amostras_por_requisicao = max_candidatos if llm_candidatos is not None else 1
+        requisicoes = [
+            parte
+            for grupo in grupos
+            for parte in grupo.dividir(amostras_por_requisicao)
         ]
 
+        self.falhas = []
+
+        if llm_candidatos is None:
+            print(
+                "AVISO: executar_agrupado sem llm_candidatos faz uma requisição por "
+                "resposta (nenhuma redução de chamadas); informe um modelo que "
+                "aceite `n` candidatos por requisição."
+            )
         print(
-            f"\nIniciando simulação com {len(lista_de_inputs)} respostas "
-            f"(lotes de {tamanho_lote} com delay de {delay_segundos}s)..."
+            f"\nIniciando simulação agrupada com {len(plano)} respostas: "
+            f"{len(grupos)} prompts distintos em {len(requisicoes)} requisições "
+            f"({self._descrever_concorrencia(max_em_voo)})..."
         )
 
-        respostas_geradas_total = []
-        total_de_inputs = len(lista_de_inputs)
+        coletor = self._criar_coletor(registro, plano.escopo)
+        barra_progresso = tqdm(total=len(plano), desc="Processando respostas")
+
+        async def processar(grupo: GrupoRequisicao) -> None:
+            respostas = await self._amostrar_grupo(
+                grupo, llm_candidatos, limitador, cache_candidatos
+            )
+            coletor.adicionar(
+                (respondente, grupo.item, resposta)
+                for respondente, resposta in zip(grupo.respondentes, respostas)
+            )
+            barra_progresso.update(len(respostas))
+
+        try:
+            falhas = await self._executar_em_pool(requisicoes, processar, max_em_voo)
+        finally:
+            barra_progresso.close()
+            if registro is not None:
+                registro.fechar()
+
+        for grupo, erro, tentativas in falhas:
+            for respondente in grupo.respondentes:
+                self._adicionar_falha(respondente.id, grupo.item.id_item, erro, tentativas)
+        self._reportar_falhas()
 
-        # MODIFICAÇÃO 3: Substituir a chamada única de .batch() por um loop com lotes
-        # O range avança em passos do tamanho do lote
-        # O tqdm cria uma barra de progresso visual
-        for i in tqdm(
-            range(0, total_de_inputs, tamanho_lote), desc="Processando lotes"
-        ):
-            # Pega o pedaço (lote) da lista de inputs
-            lote_inputs = lista_de_inputs[i : i + tamanho_lote]
+        return coletor.finalizar()
+
+    async def executar_logprobs(
+        self,
+        prova: Prova,
+        populacao: List[Respondente],
+        amostrador: AmostradorLogprobs,
+        max_em_voo: int = 45,
+        limitador: Optional[LimitadorTaxa] = None,
+        registro: Optional[RegistroRespostas] = None,
+        plano: Optional[PlanoEntradas] = None,
+    ) -> pd.DataFrame:
+        """
+        Executa a simulação no modo de distribuição por log-probabilidades: uma
+        chamada por (nível da persona, item) para obter a distribuição A–E e, em
+        seguida, sorteio local das respostas de cada respondente.
 
-            # Executa o batch APENAS para o lote atual
-            respostas_do_lote = self.chain.batch(
-                lote_inputs, config={"max_concurrency": 45}
+        As distribuições são obtidas em paralelo e só depois as respostas são
+        sorteadas, na ordem dos grupos, para que a mesma semente produza sempre
+        as mesmas respostas.
+
+        Args:
+            prova (Prova): Prova a ser respondida
+            populacao (List[Respondente]): Alunos simulados
+            amostrador (AmostradorLogprobs): Cadeia de logprobs, cache e RNG
+            max_em_voo (int): Número máximo de requisições simultâneas
+            limitador (Optional[LimitadorTaxa]): Limitador de RPM/TPM
+            registro (Optional[RegistroRespostas]): Log em disco das respostas
+            plano (Optional[PlanoEntradas]): Pares (respondente, item) a simular
+                (ex: `DesenhoCalibracao.plano`). Se None, todos os pares.
+
+        Returns:
+            pd.DataFrame: Mesmo formato retornado por `executar`.
+        """
+        if max_em_voo < 1:
+            raise ValueError("max_em_voo deve ser maior ou igual a 1.")
+
+        plano = self._planejar_inputs(prova, populacao, registro, plano)
+        grupos = agrupar_requisicoes(plano)
+        grupos_sem_distribuicao = [
+            grupo
+            for grupo in grupos
+            if (grupo.nivel, grupo.item.id_item) not in amostrador.distribuicoes
+        ]
+        self.falhas = []
+
+        print(
+            f"\nIniciando simulação por logprobs com {len(plano)} respostas: "
+            f"{len(grupos)} prompts distintos, {len(grupos_sem_distribuicao)} "
+            "ainda sem distribuição em cache..."
+        )
+
+        barra_progresso = tqdm(
+            total=len(grupos_sem_distribuicao), desc="Obtendo distribuições"
+        )
+
+        async def processar(grupo: GrupoRequisicao) -> None:
+            if limitador is not None:
+                await limitador.adquirir(self._estimar_tokens(grupo.get_inputs()))
+            await amostrador.obter_distribuicao(grupo)
+            barra_progresso.update(1)
+
+        try:
+            falhas = await self._executar_em_pool(
+                grupos_sem_distribuicao, processar, max_em_voo
             )
+        finally:
+            barra_progresso.close()
 
-            # Adiciona os resultados deste lote à lista total
-            respostas_geradas_total.extend(respostas_do_lote)
+        # Grupos cuja distribuição não pôde ser obtida não são amostrados
+        for grupo, erro, tentativas in falhas:
+            for respondente in grupo.respondentes:
+                self._adicionar_falha(respondente.id, grupo.item.id_item, erro, tentativas)
+        self._reportar_falhas()
 
-            # Adiciona o delay, mas apenas se este não for o último lote
-            if i + tamanho_lote < total_de_inputs:
-                time.sleep(delay_segundos)
+        coletor = self._criar_coletor(registro, plano.escopo)
+        for grupo in grupos:
+            if (grupo.nivel, grupo.item.id_item) not in amostrador.distribuicoes:
+                continue
+            coletor.adicionar(
+                (respondente, grupo.item, resposta)
+                for respondente, resposta in zip(
+                    grupo.respondentes, amostrador.amostrar(grupo)
+                )
+            )
+
+        return coletor.finalizar()
+
+    async def executar_prova_inteira(
+        self,
+        prova: Prova,
+        populacao: List[Respondente],
+        cadeia_prova: Runnable,
+        itens_por_requisicao: Optional[int] = None,
+        max_em_voo: int = 45,
+        limitador: Optional[LimitadorTaxa] = None,
+        registro: Optional[RegistroRespostas] = None,
+        plano: Optional[PlanoEntradas] = None,
+    ) -> pd.DataFrame:
+        """
+        Executa a simulação enviando a prova inteira (ou blocos de itens) em uma
+        única requisição por respondente, com saída estruturada.
+
+        A persona (mensagem de sistema) é enviada uma vez por bloco, e não uma vez
+        por item. A resposta é validada contra os itens enviados; os itens que a
+        LLM não respondeu são refeitos individualmente pela cadeia padrão.
+
+        Args:
+            prova (Prova): Prova a ser respondida
+            populacao (List[Respondente]): Alunos simulados
+            cadeia_prova (Runnable): Cadeia que recebe {"respondente", "itens"} e
+                retorna um `RespostasProva` (ex: `llm.with_structured_output`)
+            itens_por_requisicao (Optional[int]): Tamanho dos blocos de itens. Se
+                None, todos os itens pendentes vão em uma requisição.
+            max_em_voo (int): Número máximo de requisições simultâneas
+            limitador (Optional[LimitadorTaxa]): Limitador de RPM/TPM
+            registro (Optional[RegistroRespostas]): Log em disco das respostas
+            plano (Optional[PlanoEntradas]): Pares (respondente, item) a simular
+                (ex: `DesenhoCalibracao.plano`). Se None, todos os pares.
+
+        Returns:
+            pd.DataFrame: Mesmo formato retornado por `executar`.
+        """
+        if max_em_voo < 1:
+            raise ValueError("max_em_voo deve ser maior ou igual a 1.")
+        if itens_por_requisicao is not None and itens_por_requisicao < 1:
+            raise ValueError("itens_por_requisicao deve ser maior ou igual a 1.")
+
+        plano = self._planejar_inputs(prova, populacao, registro, plano)
+
+        # Agrupa os itens pendentes por respondente, preservando a ordem da prova
+        itens_pendentes: Dict[int, List[Item]] = {}
+        respondentes: Dict[int, Respondente] = {}
+        for inputs in plano:
+            respondente = inputs["respondente"]
+            respondentes[respondente.id] = respondente
+            itens_pendentes.setdefault(respondente.id, []).append(inputs["item"])
+
+        blocos = []
+        for respondente_id, itens in itens_pendentes.items():
+            tamanho = itens_por_requisicao or len(itens)
+            for inicio in range(0, len(itens), tamanho):
+                blocos.append(
+                    {
+                        "respondente": respondentes[respondente_id],
+                        "itens": itens[inicio : inicio + tamanho],
+                    }
+                )
+
+        self.falhas = []
+
+        print(
+            f"\nIniciando simulação por prova inteira com {len(plano)} "
+            f"respostas em {len(blocos)} requisições "
+            f"({self._descrever_concorrencia(max_em_voo)})..."
+        )
+
+        coletor = self._criar_coletor(registro, plano.escopo)
+        itens_refeitos = 0
+        barra_progresso = tqdm(total=len(plano), desc="Processando respostas")
+
+        async def processar(bloco: Dict[str, Any]) -> None:
+            nonlocal itens_refeitos
+            respondente: Respondente = bloco["respondente"]
+            itens: List[Item] = bloco["itens"]
+
+            if limitador is not None:
+                mensagens = [
+                    respondente.get_system_message(),
+                    prova.get_human_message(itens),
+                ]
+                await limitador.adquirir(
+                    estimar_tokens(mensagens, tokens_resposta=15 * len(itens))
+                )
+
+            try:
+                respostas_estruturadas = await cadeia_prova.ainvoke(bloco)
+            except (OutputParserException, ValidationError):
+                respostas_estruturadas = None
+
+            letras = (
+                validar_respostas(respostas_estruturadas, itens)
+                if respostas_estruturadas is not None
+                else {}
+            )
+
+            respostas_do_bloco = []
+            for item in itens:
+                if item.id_item in letras:
+                    resposta = letras[item.id_item]
+                else:
+                    # Item ausente ou inválido na resposta estruturada: refaz sozinho
+                    inputs = {"respondente": respondente, "item": item}
+                    if limitador is not None:
+                        await limitador.adquirir(self._estimar_tokens(inputs))
+                    resposta = await self.chain.ainvoke(
+                        inputs, self._config_amostras(inputs)
+                    )
+                    itens_refeitos += 1
+
+                respostas_do_bloco.append((respondente, item, resposta))
+
+            coletor.adicionar(respostas_do_bloco)
+            barra_progresso.update(len(respostas_do_bloco))
+
+        try:
+            falhas = await self._executar_em_pool(blocos, processar, max_em_voo)
+        finally:
+            barra_progresso.close()
+            if registro is not None:
+                registro.fechar()
+
+        if itens_refeitos:
+            print(f"{itens_refeitos} itens foram refeitos individualmente.")
+
+        for bloco, erro, tentativas in falhas:
+            for item in bloco["itens"]:
+                self._adicionar_falha(
+                    bloco["respondente"].id, item.id_item, erro, tentativas
+                )
+        self._reportar_falhas()
 
-        # O restante do código permanece o mesmo, mas agora usa a lista preenchida em lotes
-        resultados = []
-        for i, resposta in enumerate(respostas_geradas_total):
-            respondente = lista_de_inputs[i]["respondente"]
-            item = lista_de_inputs[i]["item"]
-
-            resultados.append(
-                {
-                    "respondente_id": respondente.id,
-                    "habilidade_respondente": respondente.habilidade,
-                    "item_id": item.id_item,
-                    "resposta_gerada": resposta.strip().upper(),
-                    "gabarito": item.gabarito.strip().upper(),
-                    "acertou": (
-                        1
-                        if resposta.strip().upper() == item.gabarito.strip().upper()
-                        else 0
-                    ),
-                }
-            )
-
-        return pd.DataFrame(resultados)
+        return coletor.finalizar()
+
+    async def executar_sequencial(
+        self,
+        prova: Prova,
+        populacao: List[Respondente],
+        monitor: MonitorPrecisao,
+        max_em_voo: int = 45,
+        limitador: Optional[LimitadorTaxa] = None,
+        registro: Optional[RegistroRespostas] = None,
+        plano: Optional[PlanoEntradas] = None,
+    ) -> pd.DataFrame:
+        """
+        Executa a simulação com parada antecipada: as chamadas são feitas em
+        rodadas e, para cada item, cada estrato de habilidade (nível da persona)
+        deixa de receber novas chamadas assim que a proporção de acerto atinge a
+        precisão pedida no `monitor`.
+
+        Itens fáceis/saturados convergem em poucas rodadas, então o número de
+        chamadas fica bem abaixo de respondentes x itens. O resultado contém
+        apenas os pares (respondente, item) efetivamente simulados; a precisão
+        alcançada fica em `monitor.resumo()`.
+
+        Args:
+            prova (Prova): Prova a ser respondida
+            populacao (List[Respondente]): Alunos simulados (reserva de amostras)
+            monitor (MonitorPrecisao): Critério de parada e estimativas por estrato
+            max_em_voo (int): Número máximo de requisições simultâneas
+            limitador (Optional[LimitadorTaxa]): Limitador de RPM/TPM
+            registro (Optional[RegistroRespostas]): Log em disco das respostas.
+                Respostas já registradas também alimentam o monitor.
+            plano (Optional[PlanoEntradas]): Pares (respondente, item) a simular
+                (ex: `DesenhoCalibracao.plano`). Se None, todos os pares.
+
+        Returns:
+            pd.DataFrame: Mesmo formato retornado por `executar`.
+        """
+        if max_em_voo < 1:
+            raise ValueError("max_em_voo deve ser maior ou igual a 1.")
+
+        plano = self._planejar_inputs(prova, populacao, registro, plano)
+        self.falhas = []
+
+        if registro is not None:
+            # Só as respostas desta execução (mesma população, itens e plano)
+            df_registro = registro.carregar(plano.escopo)
+            if not df_registro.empty:
+                monitor.registrar_resultados(
+                    df_registro, {r.id: r for r in populacao}
+                )
+
+        # Fila de respondentes pendentes por estrato (item, nível)
+        filas: Dict[ChaveEstrato, deque] = {}
+        for k in range(len(plano)):
+            respondente, item = plano.par(k)
+            chave = (item.id_item, respondente.get_nivel())
+            filas.setdefault(chave, deque()).append((respondente, item))
+
+        print(
+            f"\nIniciando simulação sequencial com até {len(plano)} respostas em "
+            f"{len(filas)} estratos (item x nível), {monitor!r}..."
+        )
+
+        coletor = self._criar_coletor(registro, plano.escopo)
+        barra_progresso = tqdm(total=len(plano), desc="Processando respostas")
+        chamadas = 0
+
+        async def processar(par: Tuple[Respondente, Item]) -> None:
+            respondente, item = par
+            inputs = {"respondente": respondente, "item": item}
+            if limitador is not None:
+                await limitador.adquirir(self._estimar_tokens(inputs))
+
+            resposta = await self.chain.ainvoke(inputs, self._config_amostras(inputs))
+            coletor.adicionar([(respondente, item, resposta)])
+            monitor.registrar(
+                item.id_item, respondente.get_nivel(), self._acertou(resposta, item)
+            )
+            barra_progresso.update(1)
+
+        try:
+            while True:
+                rodada = []
+                for (item_id, nivel), fila in filas.items():
+                    quantidade = min(len(fila), monitor.amostras_na_rodada(item_id, nivel))
+                    rodada.extend(fila.popleft() for _ in range(quantidade))
+
+                if not rodada:
+                    break
+
+                chamadas += len(rodada)
+                falhas = await self._executar_em_pool(rodada, processar, max_em_voo)
+                for (respondente, item), erro, tentativas in falhas:
+                    self._adicionar_falha(respondente.id, item.id_item, erro, tentativas)
+        finally:
+            barra_progresso.close()
+            if registro is not None:
+                registro.fechar()
+
+        resumo = monitor.resumo()
+        print(
+            f"{chamadas} de {len(plano)} chamadas realizadas "
+            f"({1 - chamadas / max(len(plano), 1):.0%} de economia); "
+            f"{int(resumo['convergiu'].sum())} de {len(resumo)} estratos convergiram."
+        )
+        self._reportar_falhas()
+
+        return coletor.finalizar()
+
+    async def executar_cat(
+        self,
+        prova: Prova,
+        populacao: List[Respondente],
+        motor: MotorCAT,
+        max_em_voo: int = 45,
+        limitador: Optional[LimitadorTaxa] = None,
+        registro: Optional[RegistroRespostas] = None,
+    ) -> pd.DataFrame:
+        """
+        Executa a simulação como um teste adaptativo (CAT): cada respondente
+        recebe um item por vez, escolhido pelo `motor` a partir da habilidade
+        provisória estimada com as respostas anteriores, até atingir o erro
+        padrão alvo ou o orçamento de itens.
+
+        As respostas de um respondente são sequenciais, mas vários respondentes
+        são simulados em paralelo. As estimativas finais ficam em
+        `motor.resumo()`.
+
+        Args:
+            prova (Prova): Prova cujos itens formam o banco do CAT (todos os
+                itens do motor precisam estar na prova)
+            populacao (List[Respondente]): Alunos simulados
+            motor (MotorCAT): Banco de itens, estimação e regras de seleção/parada
+            max_em_voo (int): Número máximo de respondentes simultâneos
+            limitador (Optional[LimitadorTaxa]): Limitador de RPM/TPM
+            registro (Optional[RegistroRespostas]): Log em disco das respostas,
+                exclusivo do modo CAT. Em uma retomada, as respostas já
+                registradas para os itens do banco são reaplicadas às sessões
+                antes de continuar.
+
+        Returns:
+            pd.DataFrame: Mesmo formato retornado por `executar` (apenas os itens
+            aplicados).
+
+        Raises:
+            ValueError: Se algum item do banco não estiver na prova ou se o
+                registro tiver mais respostas por respondente do que o CAT
+                aplicaria (ex: registro de uma execução com a grade completa).
+        """
+        if max_em_voo < 1:
+            raise ValueError("max_em_voo deve ser maior ou igual a 1.")
+
+        itens_por_id = {item.id_item: item for item in prova.itens}
+        sem_item = set(motor.parametros_itens) - set(itens_por_id)
+        if sem_item:
+            raise ValueError(
+                f"{len(sem_item)} itens do banco do CAT não estão na prova "
+                f"(ex: {sorted(sem_item)[:3]})."
+            )
+
+        escopo = PlanoEntradas(
+            populacao, [itens_por_id[item_id] for item_id in motor.parametros_itens]
+        )
+        historicos: Dict[int, List[Tuple[str, int]]] = {}
+        if registro is not None:
+            registro.verificar_populacao(populacao)
+            df_registro = registro.carregar(escopo)
+            max_itens = min(motor.max_itens, len(motor.parametros_itens))
+            itens_por_respondente = df_registro["respondente_id"].value_counts()
+            if (itens_por_respondente > max_itens).any():
+                raise ValueError(
+                    f"O registro {registro.caminho} tem até "
+                    f"{itens_por_respondente.max()} respostas por respondente, mais "
+                    f"que as {max_itens} que o CAT aplicaria: ele não parece ser de "
+                    "uma execução CAT com este motor. Use outro arquivo de registro."
+                )
+            if not df_registro.empty:
+                for respondente_id, item_id, acertou in zip(
+                    df_registro["respondente_id"],
+                    df_registro["item_id"].astype(str),
+                    df_registro["acertou"],
+                ):
+                    historicos.setdefault(int(respondente_id), []).append(
+                        (item_id, int(acertou))
+                    )
+        self.falhas = []
+
+        print(
+            f"\nIniciando simulação adaptativa (CAT) com {len(populacao)} respondentes "
+            f"e banco de {len(motor.parametros_itens)} itens, {motor!r}..."
+        )
+
+        coletor = self._criar_coletor(registro, escopo)
+        barra_progresso = tqdm(total=len(populacao), desc="Aplicando testes")
+
+        async def processar(respondente: Respondente) -> None:
+            # A sessão sobrevive a retentativas: continua do último item pendente
+            sessao = motor.iniciar(
+                respondente.id, respondente.habilidade, historicos.get(respondente.id, ())
+            )
+            while True:
+                item_id = motor.selecionar(sessao)
+                if item_id is None:
+                    break
+
+                inputs = {"respondente": respondente, "item": itens_por_id[item_id]}
+                if limitador is not None:
+                    await limitador.adquirir(self._estimar_tokens(inputs))
+
+                resposta = await self.chain.ainvoke(
+                    inputs, self._config_amostras(inputs)
+                )
+                coletor.adicionar([(respondente, inputs["item"], resposta)])
+                motor.registrar(sessao, item_id, self._acertou(resposta, inputs["item"]))
+
+            barra_progresso.update(1)
+
+        try:
+            falhas = await self._executar_em_pool(populacao, processar, max_em_voo)
+        finally:
+            barra_progresso.close()
+            if registro is not None:
+                registro.fechar()
+
+        for respondente, erro, tentativas in falhas:
+            item_pendente = motor.sessoes[respondente.id].item_pendente
+            self._adicionar_falha(respondente.id, item_pendente or "", erro, tentativas)
+
+        resumo = motor.resumo()
+        if not resumo.empty:
+            print(
+                f"Itens por respondente: média {resumo['num_itens'].mean():.1f} "
+                f"(de {len(motor.parametros_itens)}); erro padrão médio "
+                f"{resumo['erro_padrao'].mean():.2f}."
+            )
+        self._reportar_falhas()
+
+        return coletor.finalizar()
+
+    @staticmethod
+    def _config_amostras(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Config da cadeia com o índice da amostra (id do respondente) nos
+        metadados, para que modelos determinísticos (ex: `ChatMockTRI`) não
+        dependam da ordem em que as requisições chegam.
+        """
+        return {"metadata": {"indices_amostra": [inputs["respondente"].id]}}
+
+    async def _amostrar_grupo(
+        self,
+        grupo: GrupoRequisicao,
+        llm_candidatos: Optional[BaseChatModel],
+        limitador: Optional[LimitadorTaxa],
+        cache_candidatos: Optional[CacheCandidatos] = None,
+    ) -> List[str]:
+        """
+        Obtém `grupo.num_amostras` respostas para o prompt do grupo, em uma única
+        requisição com múltiplos candidatos ou pela cadeia (uma amostra). Com
+        `cache_candidatos`, só os respondentes sem resposta em cache são pedidos
+        ao provedor.
+        """
+        inputs = grupo.get_inputs()
+
+        if llm_candidatos is None:
+            if limitador is not None:
+                await limitador.adquirir(self._estimar_tokens(inputs))
+            return [await self.chain.ainvoke(inputs, self._config_amostras(inputs))]
+
+        if cache_candidatos is None:
+            return await self._pedir_candidatos(grupo, llm_candidatos, limitador)
+
+        respostas = await asyncio.to_thread(
+            cache_candidatos.obter, grupo.respondentes, grupo.item
+        )
+        faltantes = [
+            respondente
+            for respondente, resposta in zip(grupo.respondentes, respostas)
+            if resposta is None
+        ]
+        if not faltantes:
+            return respostas
+        if cache_candidatos.cache.somente_leitura:
+            raise ValueError(
+                f"{len(faltantes)} respostas ausentes no cache (modo replay): "
+                f"item {grupo.item.id_item}, respondentes "
+                f"{[respondente.id for respondente in faltantes[:5]]}."
+            )
+
+        novas = await self._pedir_candidatos(
+            GrupoRequisicao(grupo.nivel, grupo.item, faltantes), llm_candidatos, limitador
+        )
+        await asyncio.to_thread(cache_candidatos.gravar, faltantes, grupo.item, novas)
+        pendentes = iter(novas)
+        return [
+            resposta if resposta is not None else next(pendentes)
+            for resposta in respostas
+        ]
+
+    async def _pedir_candidatos(
+        self,
+        grupo: GrupoRequisicao,
+        llm_candidatos: BaseChatModel,
+        limitador: Optional[LimitadorTaxa],
+    ) -> List[str]:
+        """Pede `grupo.num_amostras` candidatos em uma única requisição."""
+        inputs = grupo.get_inputs()
+
+        mensagens = [
+            inputs["respondente"].get_system_message(),
+            inputs["item"].get_human_message(),
+        ]
+        if limitador is not None:
+            await limitador.adquirir(
+                estimar_tokens(mensagens, tokens_resposta=grupo.num_amostras)
+            )
+
+        resultado = await llm_candidatos.agenerate(
+            [mensagens],
+            metadata={
+                "indices_amostra": [respondente.id for respondente in grupo.respondentes]
+            },
+            **get_parametros_candidatos(llm_candidatos, grupo.num_amostras),
+        )
+        respostas = [geracao.text for geracao in resultado.generations[0]]
+
+        if len(respostas) < grupo.num_amostras:
+            raise ValueError(
+                f"O provedor retornou {len(respostas)} candidatos, mas foram "
+                f"pedidos {grupo.num_amostras} ({grupo!r})."
+            )
+
+        return respostas[: grupo.num_amostras]
+
+    async def _executar_em_pool(
+        self,
+        tarefas: Iterable[T],
+        processar: Callable[[T], Awaitable[None]],
+        max_em_voo: int,
+    ) -> List[Tuple[T, Exception, int]]:
+        """
+        Processa as tarefas com trabalhadores concorrentes: cada trabalhador pega
+        a próxima tarefa da fila assim que termina a anterior.
+
+        Sem controlador, há `max_em_voo` trabalhadores. Com controlador, há
+        `controlador.maximo` trabalhadores, mas só `controlador.limite` tarefas
+        ficam em voo ao mesmo tempo (AIMD).
+
+        Tarefas que falham são repetidas com backoff segundo a política de
+        retentativas; as que esgotam as tentativas (ou têm erro permanente) são
+        retornadas como (tarefa, erro, tentativas), sem interromper as demais.
+        """
+        controlador = self.controlador
+        politica = self.politica_retentativa
+
+        fila: asyncio.Queue[T] = asyncio.Queue()
+        for tarefa in tarefas:
+            fila.put_nowait(tarefa)
+
+        falhas: List[Tuple[T, Exception, int]] = []
+
+        async def tentar(tarefa: T) -> None:
+            if controlador is None:
+                await processar(tarefa)
+                return
+
+            await controlador.adquirir()
+            try:
+                await processar(tarefa)
+            except Exception as erro:
+                controlador.registrar_erro(erro)
+                raise
+            else:
+                controlador.registrar_sucesso()
+            finally:
+                await controlador.liberar()
+
+        async def trabalhador() -> None:
+            while True:
+                try:
+                    tarefa = fila.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                tentativas = 0
+                while True:
+                    tentativas += 1
+                    try:
+                        await tentar(tarefa)
+                        break
+                    except Exception as erro:
+                        if not politica.deve_repetir(erro, tentativas):
+                            falhas.append((tarefa, erro, tentativas))
+                            break
+                        # A vaga já foi liberada: a espera não ocupa concorrência
+                        await asyncio.sleep(politica.espera(tentativas))
+
+        num_trabalhadores = controlador.maximo if controlador is not None else max_em_voo
+        trabalhadores = [
+            asyncio.create_task(trabalhador())
+            for _ in range(min(num_trabalhadores, fila.qsize()))
+        ]
+        try:
+            await asyncio.gather(*trabalhadores)
+        finally:
+            for trabalhador_ativo in trabalhadores:
+                trabalhador_ativo.cancel()
+
+        return falhas
+
+    def _descrever_concorrencia(self, max_em_voo: int) -> str:
+        if self.controlador is not None:
+            return repr(self.controlador)
+        return f"{max_em_voo} requisições em voo"
+
+    def _adicionar_falha(
+        self, respondente_id: int, item_id: str, erro: Exception, tentativas: int
+    ) -> None:
+        self.falhas.append(
+            {
+                "respondente_id": respondente_id,
+                "item_id": item_id,
+                "erro": f"{type(erro).__name__}: {erro}",
+                "tentativas": tentativas,
+            }
+        )
+
+    def _reportar_falhas(self) -> None:
+        """
+        Informa os pares (respondente, item) que falharam em todas as tentativas.
+        Eles ficam em `self.falhas` e, havendo registro, são refeitos na próxima
+        execução (não constam como concluídos).
+        """
+        if self.controlador is not None:
+            print(f"Concorrência final: {self.controlador!r}")
+        if not self.falhas:
+            return
+
+        print(
+            f"{len(self.falhas)} respostas falharam após todas as tentativas "
+            "e ficaram sem resultado (ver `Simulador.falhas`)."
+        )
+        erros: Dict[str, int] = {}
+        for falha in self.falhas:
+            erros[falha["erro"]] = erros.get(falha["erro"], 0) + 1
+        for erro, quantidade in sorted(erros.items(), key=lambda par: -par[1])[:5]:
+            print(f"  {quantidade}x {erro}")
+
+    @staticmethod
+    def _planejar_inputs(
+        prova: Prova,
+        populacao: List[Respondente],
+        registro: Optional[RegistroRespostas] = None,
+        plano: Optional[PlanoEntradas] = None,
+    ) -> PlanoEntradas:
+        """
+        Monta o plano (preguiçoso) de pares (respondente, item) a simular,
+        descartando os que já constam no registro de uma execução anterior.
+        Se um `plano` for informado, apenas os seus pares são considerados.
+        """
+        if plano is None:
+            plano = PlanoEntradas(populacao, prova.itens)
+        elif plano.populacao is not populacao or plano.itens is not prova.itens:
+            raise ValueError(
+                "O plano deve ter sido montado com a mesma população e os mesmos "
+                "itens passados ao simulador."
+            )
+
+        if registro is None:
+            return plano
+
+        registro.verificar_populacao(populacao)
+        pendentes = plano.excluir(registro.chaves_concluidas())
+
+        if len(pendentes) < len(plano):
+            print(
+                f"Retomando a partir de {registro.caminho}: "
+                f"{len(plano) - len(pendentes)} respostas já concluídas, "
+                f"{len(pendentes)} pendentes."
+            )
+
+        return pendentes
+
+    @staticmethod
+    def _acertou(resposta: Any, item: Item) -> bool:
+        return str(resposta).strip().upper() == item.gabarito.strip().upper()
+
+    @staticmethod
+    def _estimar_tokens(inputs: Dict[str, Any]) -> int:
+        """
+        Estima os tokens de uma requisição a partir da persona e da questão.
+        """
+        mensagens = [
+            inputs["respondente"].get_system_message(),
+            inputs["item"].get_human_message(),
+        ]
+        return estimar_tokens(mensagens)
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .matriz_respostas import MatrizRespostas
+
+# Incrementar quando o formato da saída de `estimar_parametros` mudar, para
+# invalidar as entradas antigas
+VERSAO_CACHE = 1
+
+
+class CacheEstimativas:
+    """
+    Cache em disco das estimativas de `EstimadorTRI.estimar_parametros`,
+    endereçado pelo conteúdo.
+
+    A chave é um hash (BLAKE2b) dos valores da matriz de respostas, dos ids dos
+    itens e da configuração do estimador (método, modelo, `fator_contraste`,
+    tolerâncias, parâmetros iniciais). Se as respostas e a configuração não
+    mudaram, a estimação é pulada e os parâmetros (com os erros padrão) são
+    lidos do disco. Os ids dos respondentes não entram na chave, pois não
+    afetam as estimativas.
+
+    Cada entrada é um arquivo `<chave>.pkl` no diretório. O tamanho é limitado
+    por `max_entradas` e/ou `max_bytes`: ao ultrapassar, as entradas usadas há
+    mais tempo são removidas (LRU pela data de modificação, atualizada a cada
+    leitura).
+
+    Attributes:
+        diretorio (Path): Diretório das entradas
+        max_entradas (Optional[int]): Limite de entradas (None = sem limite)
+        max_bytes (Optional[int]): Limite do tamanho total (None = sem limite)
+        acertos (int): Consultas encontradas no cache
+        faltas (int): Consultas não encontradas
+        gravacoes (int): Estimativas gravadas
+        removidas (int): Entradas removidas pelo LRU
+    """
+
+    EXTENSAO = ".pkl"
+
+    def __init__(
+        self,
+        diretorio: Union[str, Path],
+        max_entradas: Optional[int] = 64,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        if max_entradas is not None and max_entradas < 1:
+            raise ValueError("max_entradas deve ser maior ou igual a 1.")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes deve ser maior ou igual a 1.")
+
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+
+        self.acertos = 0
+        self.faltas = 0
+        self.gravacoes = 0
+        self.removidas = 0
+
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"CacheEstimativas(diretorio={str(self.diretorio)!r}, "
+            f"entradas={len(self)}, max_entradas={self.max_entradas!r}, "
+            f"max_bytes={self.max_bytes!r})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entradas())
+
+    @staticmethod
+    def gerar_chave(matriz: MatrizRespostas, configuracao: Dict[str, Any]) -> str:
+        """
+        Hash da matriz de respostas (valores, formato e ids dos itens) e da
+        configuração do estimador. A configuração deve ser serializável em JSON
+        (outros objetos entram pelo `repr`).
+        """
+        resumo = hashlib.blake2b(digest_size=20)
+        resumo.update(f"v{VERSAO_CACHE}|{matriz.valores.shape}".encode("utf-8"))
+        resumo.update(repr(list(matriz.ids_itens)).encode("utf-8"))
+        resumo.update(
+            json.dumps(configuracao, sort_keys=True, default=repr).encode("utf-8")
+        )
+        # Memory-maps e fatias também funcionam: o hash lê o buffer contíguo
+        resumo.update(memoryview(np.ascontiguousarray(matriz.valores)).cast("B"))
+        return resumo.hexdigest()
+
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / f"{chave}{self.EXTENSAO}"
+
+    def _entradas(self) -> List[os.DirEntry]:
+        with os.scandir(self.diretorio) as entradas:
+            return [
+                entrada
+                for entrada in entradas
+                if entrada.is_file() and entrada.name.endswith(self.EXTENSAO)
+            ]
+
+    def obter(self, chave: str) -> Optional[pd.DataFrame]:
+        """Retorna as estimativas armazenadas para `chave` (None se não houver)."""
+        caminho = self._caminho(chave)
+        with self._lock:
+            try:
+                df_parametros = pd.read_pickle(caminho)
+                os.utime(caminho)
+            except FileNotFoundError:
+                self.faltas += 1
+                return None
+            except Exception as erro:
+                # Entrada truncada ou de uma versão incompatível: descarta
+                print(f"AVISO: entrada inválida no cache de estimativas ({erro}).")
+                caminho.unlink(missing_ok=True)
+                self.faltas += 1
+                return None
+
+            self.acertos += 1
+            return df_parametros
+
+    def gravar(self, chave: str, df_parametros: pd.DataFrame) -> None:
+        """Armazena as estimativas e aplica os limites de tamanho, se houver."""
+        caminho = self._caminho(chave)
+        temporario = caminho.with_name(f"{caminho.name}.{os.getpid()}.tmp")
+        with self._lock:
+            # Escrita atômica: leitores (inclusive de outros processos) nunca
+            # veem um arquivo pela metade
+            df_parametros.to_pickle(temporario)
+            os.replace(temporario, caminho)
+            self.gravacoes += 1
+            self._remover_antigas()
+
+    def _remover_antigas(self) -> None:
+        entradas = sorted(
+            self._entradas(), key=lambda entrada: entrada.stat().st_mtime_ns
+        )
+        total_bytes = sum(entrada.stat().st_size for entrada in entradas)
+
+        # A entrada mais recente (a recém-gravada) é sempre mantida
+        while len(entradas) > 1 and (
+            (self.max_entradas is not None and len(entradas) > self.max_entradas)
+            or (self.max_bytes is not None and total_bytes > self.max_bytes)
+        ):
+            entrada = entradas.pop(0)
+            total_bytes -= entrada.stat().st_size
+            try:
+                os.unlink(entrada.path)
+                self.removidas += 1
+            except FileNotFoundError:
+                # Já removida por outro processo
+                pass
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores de uso do cache na execução atual."""
+        consultas = self.acertos + self.faltas
+        entradas = self._entradas()
+        return {
+            "entradas": len(entradas),
+            "bytes": sum(entrada.stat().st_size for entrada in entradas),
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "gravacoes": self.gravacoes,
+            "removidas": self.removidas,
+        }
+
+    def limpar(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            for entrada in self._entradas():
+                Path(entrada.path).unlink(missing_ok=True)
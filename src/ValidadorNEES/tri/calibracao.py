@@ -0,0 +1,412 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit, logit
+
+from .matriz_respostas import MatrizRespostas
+
+TipoCalibrador = Literal["sigmoide", "platt", "isotonica"]
+
+# Probabilidades são limitadas a [EPS, 1 - EPS] antes do logit
+EPS = 1e-4
+
+
+class Calibrador(ABC):
+    """
+    Mapeamento da % de acerto simulada (proporção bruta de acertos dos
+    respondentes da LLM) para a % de acerto real do item.
+
+    Subclasses implementam `ajustar`, `aplicar` e `parametros`; o construtor de
+    cada uma aceita os próprios `parametros()`, o que permite gravar e
+    recarregar o calibrador em JSON (`salvar_calibrador`/`carregar_calibrador`).
+    """
+
+    TIPO: str = ""
+
+    @abstractmethod
+    def ajustar(self, p_simulada: np.ndarray, p_real: np.ndarray) -> "Calibrador":
+        """Ajusta o mapeamento aos pares (simulada, real) e retorna o próprio
+        calibrador."""
+
+    @abstractmethod
+    def aplicar(self, p_simulada: Union[np.ndarray, pd.Series]) -> np.ndarray:
+        """Converte % de acerto simuladas em % de acerto calibradas."""
+
+    @abstractmethod
+    def parametros(self) -> Dict[str, Any]:
+        """Parâmetros aceitos pelo construtor (serializáveis em JSON)."""
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {"tipo": self.TIPO, **self.parametros()}
+
+    def __repr__(self) -> str:
+        parametros = ", ".join(
+            f"{nome}={valor!r}" for nome, valor in self.parametros().items()
+        )
+        return f"{type(self).__name__}({parametros})"
+
+
+class CalibradorSigmoide(Calibrador):
+    """
+    p_calibrada = expit(fator_contraste * (p - deslocamento)). Com os valores
+    padrão (4.0, 0.5) equivale a `EstimadorTRI.ajustar_probabilidade_sigmoidal`.
+
+    O ajuste é uma busca em grade vetorizada (todas as combinações de fator e
+    deslocamento avaliadas de uma vez) minimizando o erro quadrático médio.
+
+    Attributes:
+        fator_contraste (float): Inclinação da sigmoide
+        deslocamento (float): % de acerto simulada mapeada em 50%
+    """
+
+    TIPO = "sigmoide"
+    GRADE_FATOR = np.arange(0.25, 20.0 + 1e-9, 0.25)
+    GRADE_DESLOCAMENTO = np.arange(0.0, 1.0 + 1e-9, 0.01)
+
+    def __init__(self, fator_contraste: float = 4.0, deslocamento: float = 0.5) -> None:
+        self.fator_contraste = fator_contraste
+        self.deslocamento = deslocamento
+
+    def ajustar(
+        self, p_simulada: np.ndarray, p_real: np.ndarray
+    ) -> "CalibradorSigmoide":
+        p_simulada = np.asarray(p_simulada, dtype=float)
+        p_real = np.asarray(p_real, dtype=float)
+
+        # (fatores, deslocamentos, itens)
+        previsto = expit(
+            self.GRADE_FATOR[:, np.newaxis, np.newaxis]
+            * (p_simulada - self.GRADE_DESLOCAMENTO[:, np.newaxis])
+        )
+        erro_quadratico = ((previsto - p_real) ** 2).mean(axis=2)
+        i, j = np.unravel_index(np.argmin(erro_quadratico), erro_quadratico.shape)
+
+        self.fator_contraste = float(self.GRADE_FATOR[i])
+        self.deslocamento = float(self.GRADE_DESLOCAMENTO[j])
+        return self
+
+    def aplicar(self, p_simulada: Union[np.ndarray, pd.Series]) -> np.ndarray:
+        p_simulada = np.asarray(p_simulada, dtype=float)
+        return expit(self.fator_contraste * (p_simulada - self.deslocamento))
+
+    def parametros(self) -> Dict[str, Any]:
+        return {
+            "fator_contraste": self.fator_contraste,
+            "deslocamento": self.deslocamento,
+        }
+
+
+class CalibradorPlatt(Calibrador):
+    """
+    Escala de Platt na escala logit: p_calibrada = expit(a * logit(p) + b),
+    ajustada por Newton na entropia cruzada com as probabilidades reais como
+    alvo.
+
+    Attributes:
+        a (float): Inclinação na escala logit
+        b (float): Intercepto na escala logit
+    """
+
+    TIPO = "platt"
+
+    def __init__(self, a: float = 1.0, b: float = 0.0) -> None:
+        self.a = a
+        self.b = b
+
+    def ajustar(
+        self,
+        p_simulada: np.ndarray,
+        p_real: np.ndarray,
+        max_iteracoes: int = 50,
+        penalidade: float = 1e-6,
+    ) -> "CalibradorPlatt":
+        x = logit(np.clip(np.asarray(p_simulada, dtype=float), EPS, 1 - EPS))
+        y = np.asarray(p_real, dtype=float)
+        desenho = np.column_stack([x, np.ones_like(x)])
+        coeficientes = np.array([1.0, 0.0])
+
+        for _ in range(max_iteracoes):
+            q = expit(desenho @ coeficientes)
+            gradiente = desenho.T @ (y - q) - penalidade * coeficientes
+            informacao = (desenho * (q * (1 - q))[:, np.newaxis]).T @ desenho
+            passo = np.linalg.solve(informacao + penalidade * np.eye(2), gradiente)
+            coeficientes += passo
+            if np.abs(passo).max() < 1e-8:
+                break
+
+        self.a, self.b = float(coeficientes[0]), float(coeficientes[1])
+        return self
+
+    def aplicar(self, p_simulada: Union[np.ndarray, pd.Series]) -> np.ndarray:
+        x = logit(np.clip(np.asarray(p_simulada, dtype=float), EPS, 1 - EPS))
+        return expit(self.a * x + self.b)
+
+    def parametros(self) -> Dict[str, Any]:
+        return {"a": self.a, "b": self.b}
+
+
+class CalibradorIsotonico(Calibrador):
+    """
+    Regressão isotônica (não decrescente) pelo algoritmo pool-adjacent-
+    violators. Entre os pontos ajustados a curva é interpolada linearmente e,
+    fora deles, constante.
+
+    Attributes:
+        x (List[float]): % de acerto simulada dos pontos da curva
+        y (List[float]): % de acerto calibrada em cada ponto
+    """
+
+    TIPO = "isotonica"
+
+    def __init__(
+        self, x: Optional[Sequence[float]] = None, y: Optional[Sequence[float]] = None
+    ) -> None:
+        self.x = list(x) if x is not None else [0.0, 1.0]
+        self.y = list(y) if y is not None else [0.0, 1.0]
+
+    def __repr__(self) -> str:
+        return f"CalibradorIsotonico(pontos={len(self.x)})"
+
+    def ajustar(
+        self, p_simulada: np.ndarray, p_real: np.ndarray
+    ) -> "CalibradorIsotonico":
+        p_simulada = np.asarray(p_simulada, dtype=float)
+        p_real = np.asarray(p_real, dtype=float)
+        if not len(p_simulada):
+            raise ValueError("São necessários dados para ajustar o calibrador.")
+
+        # Valores repetidos de p_simulada viram um único ponto (média de p_real)
+        x, inverso, pesos = np.unique(p_simulada, return_inverse=True, return_counts=True)
+        y = np.bincount(inverso, weights=p_real) / pesos
+
+        # Pilha de blocos (média, peso, número de pontos)
+        medias: List[float] = []
+        pesos_blocos: List[float] = []
+        tamanhos: List[int] = []
+        for valor, peso in zip(y, pesos):
+            medias.append(float(valor))
+            pesos_blocos.append(float(peso))
+            tamanhos.append(1)
+            while len(medias) > 1 and medias[-2] > medias[-1]:
+                peso_total = pesos_blocos[-2] + pesos_blocos[-1]
+                medias[-2] = (
+                    medias[-2] * pesos_blocos[-2] + medias[-1] * pesos_blocos[-1]
+                ) / peso_total
+                pesos_blocos[-2] = peso_total
+                tamanhos[-2] += tamanhos[-1]
+                del medias[-1], pesos_blocos[-1], tamanhos[-1]
+
+        self.x = x.tolist()
+        self.y = np.repeat(medias, tamanhos).tolist()
+        return self
+
+    def aplicar(self, p_simulada: Union[np.ndarray, pd.Series]) -> np.ndarray:
+        return np.interp(np.asarray(p_simulada, dtype=float), self.x, self.y)
+
+    def parametros(self) -> Dict[str, Any]:
+        return {"x": self.x, "y": self.y}
+
+
+CALIBRADORES: Dict[str, Type[Calibrador]] = {
+    classe.TIPO: classe
+    for classe in (CalibradorSigmoide, CalibradorPlatt, CalibradorIsotonico)
+}
+
+
+def criar_calibrador(tipo: str, **parametros: Any) -> Calibrador:
+    """Instancia um calibrador pelo tipo ("sigmoide", "platt" ou "isotonica")."""
+    if tipo not in CALIBRADORES:
+        raise ValueError(
+            f"Calibrador '{tipo}' inválido. Opções: {tuple(CALIBRADORES)}"
+        )
+    return CALIBRADORES[tipo](**parametros)
+
+
+def salvar_calibrador(
+    calibrador: Calibrador,
+    caminho: Union[str, Path],
+    metadados: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """
+    Grava o calibrador em JSON. `metadados` (ex: provedor e modelo da LLM,
+    métricas da validação cruzada) são gravados junto, apenas para consulta.
+    """
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(
+            {"calibrador": calibrador.para_dict(), "metadados": metadados or {}},
+            arquivo,
+            ensure_ascii=False,
+            indent=2,
+        )
+    return caminho
+
+
+def carregar_calibrador(caminho: Union[str, Path]) -> Calibrador:
+    """Lê um calibrador gravado com `salvar_calibrador`."""
+    caminho = Path(caminho)
+    if not caminho.is_file():
+        raise ValueError(f"O arquivo de calibração {caminho} não existe!")
+
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)["calibrador"]
+    return criar_calibrador(**dados)
+
+
+def dados_calibracao(
+    dados: Union[pd.DataFrame, MatrizRespostas], df_real: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pares (% de acerto simulada bruta, % de acerto real) dos itens presentes
+    nos resultados e em `df_real` (colunas ID_QUESTÃO e PROB_ACERTO). Os ids
+    são comparados como texto.
+    """
+    matriz = (
+        dados
+        if isinstance(dados, MatrizRespostas)
+        else MatrizRespostas.de_resultados(dados)
+    )
+    p_simulada = pd.Series(
+        matriz.proporcao_acerto(), index=[str(id_item) for id_item in matriz.ids_itens]
+    )
+    p_real = (
+        df_real.dropna(subset=["PROB_ACERTO"])
+        .assign(ID_QUESTÃO=lambda df: df["ID_QUESTÃO"].astype(str))
+        .drop_duplicates("ID_QUESTÃO")
+        .set_index("ID_QUESTÃO")["PROB_ACERTO"]
+    )
+    comuns = p_simulada.index.intersection(p_real.index)
+    if len(comuns) < 2:
+        raise ValueError("São necessários ao menos 2 itens com % de acerto real.")
+    return (
+        p_simulada.loc[comuns].to_numpy(dtype=float),
+        p_real.loc[comuns].to_numpy(dtype=float),
+    )
+
+
+def _avaliar_fold(
+    tipo: str,
+    p_treino: np.ndarray,
+    y_treino: np.ndarray,
+    p_teste: np.ndarray,
+    y_teste: np.ndarray,
+) -> Tuple[float, float]:
+    """Ajusta no treino e retorna (rmse, bias) no teste. O tipo "fixo" é a
+    sigmoide padrão, sem ajuste (referência)."""
+    calibrador = (
+        CalibradorSigmoide()
+        if tipo == "fixo"
+        else criar_calibrador(tipo).ajustar(p_treino, y_treino)
+    )
+    erro = calibrador.aplicar(p_teste) - y_teste
+    return float(np.sqrt(np.mean(erro**2))), float(np.mean(erro))
+
+
+class ResultadoCalibracao:
+    """
+    Resultado de `calibrar`.
+
+    Attributes:
+        calibrador (Calibrador): Melhor calibrador na validação cruzada,
+            reajustado com todos os itens
+        validacao (pd.DataFrame): Uma linha por tipo (inclusive "fixo", a
+            sigmoide padrão) com rmse e bias médios nos folds e o desvio padrão
+            do rmse, ordenada pelo rmse
+    """
+
+    def __init__(self, calibrador: Calibrador, validacao: pd.DataFrame) -> None:
+        self.calibrador = calibrador
+        self.validacao = validacao
+
+    def __repr__(self) -> str:
+        return f"ResultadoCalibracao(calibrador={self.calibrador!r})"
+
+
+def calibrar(
+    p_simulada: Sequence[float],
+    p_real: Sequence[float],
+    tipos: Sequence[TipoCalibrador] = ("sigmoide", "platt", "isotonica"),
+    num_folds: int = 5,
+    num_processos: Optional[int] = 1,
+    semente: Optional[int] = None,
+) -> ResultadoCalibracao:
+    """
+    Compara os calibradores por validação cruzada k-fold e reajusta o melhor,
+    pelo rmse médio fora da amostra, com todos os itens.
+
+    Cada ajuste leva menos de um milissegundo com as ~45-180 questões de uma
+    prova, então os pares tipo x fold rodam no processo atual por padrão; um
+    pool de processos só compensa com muitos itens.
+
+    Args:
+        p_simulada (Sequence[float]): % de acerto simulada bruta de cada item
+        p_real (Sequence[float]): % de acerto real de cada item
+        tipos (Sequence[TipoCalibrador]): Calibradores comparados
+        num_folds (int): Número de folds (k)
+        num_processos (Optional[int]): Processos do pool (1 = no processo
+            atual; None = todos os núcleos)
+        semente (Optional[int]): Semente da divisão em folds
+
+    Returns:
+        ResultadoCalibracao: Calibrador escolhido e tabela da validação.
+    """
+    p_simulada = np.asarray(p_simulada, dtype=float)
+    p_real = np.asarray(p_real, dtype=float)
+    if len(p_simulada) != len(p_real):
+        raise ValueError("p_simulada e p_real devem ter o mesmo tamanho.")
+    if not 2 <= num_folds <= len(p_simulada):
+        raise ValueError("num_folds deve estar entre 2 e o número de itens.")
+    if not tipos:
+        raise ValueError("Informe ao menos um tipo de calibrador.")
+    for tipo in tipos:
+        criar_calibrador(tipo)
+
+    folds = np.array_split(
+        np.random.default_rng(semente).permutation(len(p_simulada)), num_folds
+    )
+    tarefas = [
+        (
+            tipo,
+            p_simulada[np.setdiff1d(np.arange(len(p_simulada)), teste)],
+            p_real[np.setdiff1d(np.arange(len(p_simulada)), teste)],
+            p_simulada[teste],
+            p_real[teste],
+        )
+        for tipo in ("fixo", *tipos)
+        for teste in folds
+    ]
+
+    num_processos = num_processos or os.cpu_count() or 1
+    if num_processos == 1:
+        resultados = [_avaliar_fold(*tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=num_processos) as executor:
+            resultados = list(executor.map(_avaliar_fold, *zip(*tarefas)))
+
+    validacao = (
+        pd.DataFrame(
+            [
+                {"tipo": tarefa[0], "rmse": rmse, "bias": bias}
+                for tarefa, (rmse, bias) in zip(tarefas, resultados)
+            ]
+        )
+        .groupby("tipo", sort=False)
+        .agg(
+            rmse=("rmse", "mean"),
+            rmse_dp=("rmse", "std"),
+            bias=("bias", "mean"),
+        )
+        .sort_values("rmse")
+        .reset_index()
+    )
+
+    melhor = validacao.loc[validacao["tipo"] != "fixo", "tipo"].iloc[0]
+    calibrador = criar_calibrador(melhor).ajustar(p_simulada, p_real)
+    return ResultadoCalibracao(calibrador, validacao)
@@ -0,0 +1,291 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from scipy.stats import norm
+
+ParametrosItem = Tuple[float, float, float]  # (a, b, c) do modelo 3PL
+
+
+class SessaoCAT:
+    """
+    Estado da aplicação adaptativa para um respondente.
+
+    Attributes:
+        respondente_id (int): Id do respondente
+        habilidade (float): Habilidade verdadeira (usada apenas no resumo)
+        itens (List[str]): Itens aplicados, em ordem
+        acertos (List[int]): 1 se acertou o item correspondente, 0 caso contrário
+        theta (float): Estimativa provisória da habilidade
+        erro_padrao (float): Erro padrão da estimativa
+        item_pendente (Optional[str]): Item selecionado e ainda sem resposta
+        encerrada (bool): Se a aplicação terminou
+    """
+
+    def __init__(
+        self,
+        respondente_id: int,
+        habilidade: float,
+        log_verossimilhanca: np.ndarray,
+        theta: float,
+        erro_padrao: float,
+    ) -> None:
+        self.respondente_id = respondente_id
+        self.habilidade = habilidade
+        self.itens: List[str] = []
+        self.acertos: List[int] = []
+        self.theta = theta
+        self.erro_padrao = erro_padrao
+        self.item_pendente: Optional[str] = None
+        self.encerrada = False
+        # Log-verossimilhança acumulada em cada ponto da grade de theta
+        self._log_verossimilhanca = log_verossimilhanca
+
+    def __repr__(self) -> str:
+        return (
+            f"SessaoCAT(respondente_id={self.respondente_id!r}, "
+            f"itens={len(self.itens)}, theta={self.theta:.2f}, "
+            f"erro_padrao={self.erro_padrao:.2f})"
+        )
+
+
+class MotorCAT:
+    """
+    Motor de Teste Adaptativo Computadorizado (CAT) sob o modelo 3PL (2PL com
+    c = 0).
+
+    A cada resposta, a habilidade provisória é reestimada por EAP (média a
+    posteriori) ou MAP (moda a posteriori), com priori N(0, 1) avaliada em uma
+    grade de pontos. O próximo item é o de máxima informação de Fisher no theta
+    provisório, com dois controles de exposição:
+
+    - "randomesque": sorteia entre os `k_aleatorio` itens mais informativos;
+    - taxa máxima: itens aplicados em mais de `taxa_exposicao_maxima` das
+      sessões deixam de ser candidatos.
+
+    A aplicação termina quando o erro padrão fica abaixo de `erro_padrao_alvo`
+    (após `min_itens`) ou ao atingir `max_itens`.
+
+    Attributes:
+        parametros_itens (Dict[str, ParametrosItem]): Banco de itens (a, b, c)
+        metodo (str): "EAP" ou "MAP"
+        erro_padrao_alvo (float): Erro padrão que encerra a aplicação
+        min_itens (int): Itens mínimos por respondente
+        max_itens (int): Orçamento de itens por respondente
+        k_aleatorio (int): Tamanho do sorteio "randomesque" (1 = desligado)
+        taxa_exposicao_maxima (Optional[float]): Fração máxima de sessões em que
+            um item pode ser aplicado (None = sem limite)
+        constante_d (float): Constante de escala D do modelo logístico
+        exposicoes (Dict[str, int]): Número de sessões em que cada item foi aplicado
+        sessoes (Dict[int, SessaoCAT]): Sessões por respondente_id
+    """
+
+    METODOS = ("EAP", "MAP")
+
+    def __init__(
+        self,
+        parametros_itens: Dict[str, ParametrosItem],
+        metodo: str = "EAP",
+        erro_padrao_alvo: float = 0.3,
+        min_itens: int = 1,
+        max_itens: int = 15,
+        k_aleatorio: int = 1,
+        taxa_exposicao_maxima: Optional[float] = None,
+        constante_d: float = 1.0,
+        num_pontos: int = 81,
+        semente: Optional[int] = None,
+    ) -> None:
+        if metodo not in self.METODOS:
+            raise ValueError(f"Método '{metodo}' inválido. Opções: {self.METODOS}")
+        if not parametros_itens:
+            raise ValueError("O banco de itens do CAT está vazio.")
+        if not 1 <= min_itens <= max_itens:
+            raise ValueError("É preciso que 1 <= min_itens <= max_itens.")
+        if k_aleatorio < 1:
+            raise ValueError("k_aleatorio deve ser maior ou igual a 1.")
+
+        self.parametros_itens = parametros_itens
+        self.metodo = metodo
+        self.erro_padrao_alvo = erro_padrao_alvo
+        self.min_itens = min_itens
+        self.max_itens = max_itens
+        self.k_aleatorio = k_aleatorio
+        self.taxa_exposicao_maxima = taxa_exposicao_maxima
+        self.constante_d = constante_d
+
+        self.exposicoes: Dict[str, int] = {item_id: 0 for item_id in parametros_itens}
+        self.sessoes: Dict[int, SessaoCAT] = {}
+
+        self._ids_itens = list(parametros_itens)
+        self._posicao_item = {item_id: k for k, item_id in enumerate(self._ids_itens)}
+        parametros = np.array([parametros_itens[i] for i in self._ids_itens], dtype=float)
+        self._a, self._b, self._c = parametros[:, 0], parametros[:, 1], parametros[:, 2]
+
+        self._grade = np.linspace(-4.0, 4.0, num_pontos)
+        self._log_priori = norm.logpdf(self._grade)
+        self._rng = np.random.default_rng(semente)
+
+    def __repr__(self) -> str:
+        return (
+            f"MotorCAT(itens={len(self._ids_itens)}, metodo={self.metodo!r}, "
+            f"erro_padrao_alvo={self.erro_padrao_alvo!r}, max_itens={self.max_itens!r})"
+        )
+
+    def probabilidade(self, theta: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """P(acerto) dos itens `indices` em cada theta: array (thetas, itens)."""
+        theta = np.asarray(theta, dtype=float)[..., np.newaxis]
+        a, b, c = self._a[indices], self._b[indices], self._c[indices]
+        return c + (1 - c) * expit(self.constante_d * a * (theta - b))
+
+    def informacao(self, theta: float, indices: np.ndarray) -> np.ndarray:
+        """Informação de Fisher dos itens `indices` no ponto theta."""
+        p = np.clip(self.probabilidade(theta, indices), 1e-9, 1 - 1e-9)
+        a, c = self._a[indices], self._c[indices]
+        return (
+            (self.constante_d * a) ** 2 * ((1 - p) / p) * ((p - c) / (1 - c)) ** 2
+        )
+
+    def _estimar(self, log_verossimilhanca: np.ndarray) -> Tuple[float, float]:
+        log_posteriori = self._log_priori + log_verossimilhanca
+        pesos = np.exp(log_posteriori - log_posteriori.max())
+        pesos /= pesos.sum()
+
+        if self.metodo == "EAP":
+            theta = float(pesos @ self._grade)
+            erro_padrao = float(np.sqrt(pesos @ (self._grade - theta) ** 2))
+            return theta, erro_padrao
+
+        # MAP: máximo da grade refinado por interpolação parabólica
+        k = int(np.argmax(log_posteriori))
+        theta = float(self._grade[k])
+        if 0 < k < len(self._grade) - 1:
+            y0, y1, y2 = log_posteriori[k - 1 : k + 2]
+            curvatura = y0 - 2 * y1 + y2
+            if curvatura < 0:
+                passo = self._grade[1] - self._grade[0]
+                theta += float(0.5 * passo * (y0 - y2) / curvatura)
+        return theta, self._erro_padrao_map(theta, log_verossimilhanca)
+
+    def _erro_padrao_map(self, theta: float, log_verossimilhanca: np.ndarray) -> float:
+        # Informação a posteriori aproximada pela curvatura numérica do log
+        passo = self._grade[1] - self._grade[0]
+        log_posteriori = np.interp(
+            [theta - passo, theta, theta + passo],
+            self._grade,
+            self._log_priori + log_verossimilhanca,
+        )
+        curvatura = -(log_posteriori[0] - 2 * log_posteriori[1] + log_posteriori[2])
+        return float(1 / np.sqrt(curvatura / passo**2)) if curvatura > 0 else 1.0
+
+    def iniciar(
+        self,
+        respondente_id: int,
+        habilidade: float = float("nan"),
+        historico: Sequence[Tuple[str, int]] = (),
+    ) -> SessaoCAT:
+        """
+        Cria (ou retorna, se já existir) a sessão do respondente. `historico`
+        permite retomar uma aplicação a partir de respostas já obtidas; itens
+        fora do banco, repetidos ou além de `max_itens` são ignorados.
+        """
+        if respondente_id in self.sessoes:
+            return self.sessoes[respondente_id]
+
+        sessao = SessaoCAT(
+            respondente_id,
+            habilidade,
+            np.zeros_like(self._grade),
+            *self._estimar(np.zeros_like(self._grade)),
+        )
+        self.sessoes[respondente_id] = sessao
+
+        for item_id, acertou in historico:
+            if len(sessao.itens) >= self.max_itens:
+                break
+            if item_id in self._posicao_item and item_id not in sessao.itens:
+                self.exposicoes[item_id] += 1
+                self.registrar(sessao, item_id, acertou)
+        return sessao
+
+    def registrar(self, sessao: SessaoCAT, item_id: str, acertou: int) -> None:
+        """Registra a resposta ao item e atualiza theta e erro padrão."""
+        indice = np.array([self._posicao_item[item_id]])
+        p = np.clip(self.probabilidade(self._grade, indice)[:, 0], 1e-9, 1 - 1e-9)
+        sessao._log_verossimilhanca += np.log(p) if acertou else np.log1p(-p)
+
+        sessao.itens.append(item_id)
+        sessao.acertos.append(int(acertou))
+        sessao.item_pendente = None
+        sessao.theta, sessao.erro_padrao = self._estimar(sessao._log_verossimilhanca)
+
+    def deve_parar(self, sessao: SessaoCAT) -> bool:
+        num_itens = len(sessao.itens)
+        if num_itens >= min(self.max_itens, len(self._ids_itens)):
+            return True
+        return num_itens >= self.min_itens and sessao.erro_padrao <= self.erro_padrao_alvo
+
+    def selecionar(self, sessao: SessaoCAT) -> Optional[str]:
+        """
+        Escolhe o próximo item da sessão (ou None, se a aplicação terminou). O
+        item fica pendente até `registrar`; se a sessão for retomada antes
+        disso, o mesmo item é devolvido.
+        """
+        if sessao.item_pendente is not None:
+            return sessao.item_pendente
+        if sessao.encerrada or self.deve_parar(sessao):
+            sessao.encerrada = True
+            return None
+
+        aplicados = {self._posicao_item[item_id] for item_id in sessao.itens}
+        candidatos = np.array(
+            [k for k in range(len(self._ids_itens)) if k not in aplicados]
+        )
+
+        if self.taxa_exposicao_maxima is not None and self.sessoes:
+            exposicao = (
+                np.array([self.exposicoes[self._ids_itens[k]] for k in candidatos])
+                / len(self.sessoes)
+            )
+            permitidos = candidatos[exposicao < self.taxa_exposicao_maxima]
+            # Se todos estourarem a taxa, ignora o limite em vez de travar
+            if len(permitidos):
+                candidatos = permitidos
+
+        informacao = self.informacao(sessao.theta, candidatos)
+        melhores = candidatos[np.argsort(-informacao)[: self.k_aleatorio]]
+        escolhido = self._ids_itens[int(self._rng.choice(melhores))]
+
+        self.exposicoes[escolhido] += 1
+        sessao.item_pendente = escolhido
+        return escolhido
+
+    def resumo(self) -> pd.DataFrame:
+        """Uma linha por sessão: habilidade, theta estimado, erro padrão e itens."""
+        return pd.DataFrame(
+            [
+                {
+                    "respondente_id": sessao.respondente_id,
+                    "habilidade_respondente": sessao.habilidade,
+                    "theta_estimado": sessao.theta,
+                    "erro_padrao": sessao.erro_padrao,
+                    "num_itens": len(sessao.itens),
+                    "num_acertos": sum(sessao.acertos),
+                }
+                for sessao in self.sessoes.values()
+            ],
+            columns=[
+                "respondente_id",
+                "habilidade_respondente",
+                "theta_estimado",
+                "erro_padrao",
+                "num_itens",
+                "num_acertos",
+            ],
+        )
+
+    def taxas_exposicao(self) -> pd.Series:
+        """Fração das sessões em que cada item foi aplicado."""
+        return pd.Series(self.exposicoes, name="taxa_exposicao") / max(
+            len(self.sessoes), 1
+        )
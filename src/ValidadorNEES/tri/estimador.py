@@ -1,9 +1,16 @@
-from typing import Final, Set
+from typing import Any, Dict, Final, Literal, Optional, Set, TypeAlias, Union
 
 import pandas as pd
 from girth import twopl_jml
 from scipy.special import expit
 
+from .cache_estimativas import CacheEstimativas
+from .calibracao import Calibrador
+from .estimador_mml import EstimadorMML, ModeloTRI, ParametrosItem
+from .matriz_respostas import MatrizRespostas
+
+MetodoEstimacao: TypeAlias = Literal["JML", "MML"]
+
 
 class EstimadorTRI:
     """
@@ -32,38 +39,106 @@ class EstimadorTRI:
             )
 
     @staticmethod
-    def estimar_parametros(df_simulado: pd.DataFrame) -> pd.DataFrame:
+    def estimar_parametros(
+        dados: Union[pd.DataFrame, MatrizRespostas],
+        metodo: MetodoEstimacao = "JML",
+        modelo: ModeloTRI = "2PL",
+        parametros_iniciais: Optional[Dict[Any, ParametrosItem]] = None,
+        fator_contraste: float = 4.0,
+        cache: Optional[CacheEstimativas] = None,
+        calibrador: Optional[Calibrador] = None,
+    ) -> pd.DataFrame:
         """
-        Função que recebe um dataframe com as respostas dos alunos simulados
-        e retorna um dataframe com os parâmetros de discriminação (a) e
-        dificuldade (b) e porcentagem de acerto (%).
-        """
-        EstimadorTRI._verificar_esquema(df_simulado)
+        Função que recebe as respostas dos alunos simulados (DataFrame no
+        formato longo ou `MatrizRespostas` já montada) e retorna um dataframe
+        com os parâmetros de discriminação (a) e dificuldade (b) e porcentagem
+        de acerto (%).
 
-        # se a tabela está no formato adequado
-        df_pivotado = df_simulado.pivot(
-            index="item_id", columns="respondente_id", values="acertou"
-        )
+        Respostas ausentes não contribuem para as estimativas e pares
+        repetidos mantêm apenas a primeira resposta.
 
-        index_series = df_pivotado.index
+        Com `metodo="JML"` (padrão) usa o `twopl_jml` do girth (2PL). Com
+        `metodo="MML"` usa o `EstimadorMML` no `modelo` escolhido (1PL, 2PL ou
+        3PL), partindo de `parametros_iniciais` se informados, e acrescenta as
+        colunas C, EP_A, EP_B e EP_C.
 
-        prob_acerto = pd.Series(df_pivotado.mean(axis=1))
-        prob_acerto = EstimadorTRI.ajustar_probabilidade_sigmoidal(prob_acerto)
+        A % de acerto passa pelo `calibrador` ajustado (ver `calibracao`), se
+        informado, ou pela sigmoide fixa de `ajustar_probabilidade_sigmoidal`.
+
+        Com um `cache`, estimativas de uma matriz de respostas e configuração
+        idênticas a uma execução anterior são lidas do disco, sem reestimar.
+        """
+        if isinstance(dados, MatrizRespostas):
+            matriz = dados
+        else:
+            EstimadorTRI._verificar_esquema(dados)
+            matriz = MatrizRespostas.de_resultados(dados)
+
+        if metodo == "MML":
+            estimador_mml = EstimadorMML(modelo)
+        elif metodo == "JML":
+            if modelo != "2PL":
+                raise ValueError("O método JML (girth) só estima o modelo 2PL.")
+        else:
+            raise ValueError(f"Método '{metodo}' inválido. Opções: JML, MML")
+
+        chave = None
+        if cache is not None:
+            configuracao = {
+                "metodo": metodo,
+                "modelo": modelo,
+                "fator_contraste": fator_contraste,
+                "calibrador": calibrador.para_dict() if calibrador is not None else None,
+                "mml": estimador_mml.configuracao() if metodo == "MML" else None,
+                "parametros_iniciais": (
+                    sorted(
+                        (repr(id_item), list(map(float, parametros)))
+                        for id_item, parametros in parametros_iniciais.items()
+                    )
+                    if parametros_iniciais is not None
+                    else None
+                ),
+            }
+            chave = cache.gerar_chave(matriz, configuracao)
+            tri_dataframe = cache.obter(chave)
+            if tri_dataframe is not None:
+                return tri_dataframe
+
+        index_series = pd.Index(matriz.ids_itens, name="item_id")
+
+        prob_acerto = pd.Series(matriz.proporcao_acerto(), index=index_series)
+        if calibrador is not None:
+            prob_acerto = pd.Series(calibrador.aplicar(prob_acerto), index=index_series)
+        else:
+            prob_acerto = EstimadorTRI.ajustar_probabilidade_sigmoidal(
+                prob_acerto, fator_contraste
+            )
 
-        tri_data = twopl_jml(dataset=df_pivotado.astype(int).to_numpy())
+        if metodo == "MML":
+            resultado = estimador_mml.estimar(matriz, parametros_iniciais)
+            tri_data = resultado.parametros.set_index(index_series)
+        else:
+            tri_girth = twopl_jml(dataset=matriz.para_girth())
+            tri_data = {"A": tri_girth["Discrimination"], "B": tri_girth["Difficulty"]}
 
         tri_dataframe = pd.DataFrame(
             {
-                "A": tri_data["Discrimination"],
-                "B": tri_data["Difficulty"],
-                # obs: o 0.20 é para corrigir um vies que observei na LLM. O ideal é fazer
-                # um modelo (logístico ou algo do tipo) que relaciona a p llm (probabilidade
-                # prevista pela LLM) com a p real.
+                "A": tri_data["A"],
+                "B": tri_data["B"],
+                # obs: a sigmoide fixa corrige um viés que observei na LLM; para
+                # ajustar o mapeamento p llm -> p real por modelo/provedor, use um
+                # `calibrador` (ver `calibracao.calibrar`).
                 "PROB_ACERTO": prob_acerto,
                 "ID_QUESTÃO": index_series,
             },
+            index=index_series,
         )
+        if metodo == "MML":
+            for coluna in ("C", "EP_A", "EP_B", "EP_C"):
+                tri_dataframe[coluna] = tri_data[coluna]
 
+        if chave is not None:
+            cache.gravar(chave, tri_dataframe)
         return tri_dataframe
 
     @staticmethod
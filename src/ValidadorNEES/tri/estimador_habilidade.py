@@ -0,0 +1,237 @@
+from typing import Any, Dict, Literal, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from scipy.stats import norm
+
+from .estimador_mml import ParametrosItem
+from .matriz_respostas import MatrizRespostas
+
+MetodoHabilidade = Literal["EAP", "MAP", "ML"]
+
+
+class EstimadorHabilidade:
+    """
+    Estima a habilidade (theta) de todos os respondentes de uma vez, a partir da
+    matriz de respostas e de parâmetros (a, b, c) dos itens (do ENEM ou
+    estimados).
+
+    - EAP: média a posteriori (priori N(0, 1)) em uma grade de pontos; o erro
+      padrão é o desvio padrão a posteriori.
+    - MAP: moda a posteriori, por Fisher scoring a partir do EAP.
+    - ML: máxima verossimilhança, idem sem a priori. Padrões só com acertos (ou
+      só com erros) não têm estimativa finita: theta fica no limite da escala e
+      o erro padrão fica nulo (NaN).
+
+    As contas são produtos de matrizes sobre blocos de `tamanho_bloco`
+    respondentes, sem laços em Python por respondente.
+
+    Attributes:
+        parametros_itens (Dict[Any, ParametrosItem]): (a, b, c) por item_id
+        metodo (MetodoHabilidade): "EAP", "MAP" ou "ML"
+        constante_d (float): Constante de escala D do modelo logístico
+        limites (Tuple[float, float]): Intervalo da escala de theta
+        tamanho_bloco (int): Respondentes processados por vez
+    """
+
+    METODOS = ("EAP", "MAP", "ML")
+
+    def __init__(
+        self,
+        parametros_itens: Dict[Any, ParametrosItem],
+        metodo: MetodoHabilidade = "EAP",
+        constante_d: float = 1.0,
+        num_pontos: int = 61,
+        limites: Tuple[float, float] = (-4.0, 4.0),
+        max_iteracoes: int = 30,
+        tolerancia: float = 1e-4,
+        tamanho_bloco: int = 100_000,
+    ) -> None:
+        if metodo not in self.METODOS:
+            raise ValueError(f"Método '{metodo}' inválido. Opções: {self.METODOS}")
+        if not parametros_itens:
+            raise ValueError("É preciso informar os parâmetros de ao menos um item.")
+
+        self.parametros_itens = parametros_itens
+        self.metodo = metodo
+        self.constante_d = constante_d
+        self.limites = limites
+        self.max_iteracoes = max_iteracoes
+        self.tolerancia = tolerancia
+        self.tamanho_bloco = tamanho_bloco
+
+        # Itens indexados pelo id em texto: "123" e 123 são o mesmo item
+        self._parametros_por_id = {
+            str(id_item): parametros for id_item, parametros in parametros_itens.items()
+        }
+        self._grade = np.linspace(*limites, num_pontos)
+        self._log_priori = norm.logpdf(self._grade)
+
+    def __repr__(self) -> str:
+        return (
+            f"EstimadorHabilidade(itens={len(self.parametros_itens)}, "
+            f"metodo={self.metodo!r})"
+        )
+
+    def _probabilidade(
+        self, theta: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray
+    ) -> np.ndarray:
+        """P(acerto) (thetas, itens)."""
+        p = c + (1 - c) * expit(self.constante_d * a * (theta[:, np.newaxis] - b))
+        return np.clip(p, 1e-9, 1 - 1e-9)
+
+    def _eap(
+        self,
+        acertos: np.ndarray,
+        observadas: np.ndarray,
+        a: np.ndarray,
+        b: np.ndarray,
+        c: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        EAP e erro padrão a posteriori, mais a moda na grade (da posteriori no
+        MAP, da verossimilhança no ML) refinada por interpolação parabólica,
+        usada como ponto de partida do Fisher scoring.
+        """
+        p = self._probabilidade(self._grade, a, b, c).T  # (itens, pontos)
+        log_verossimilhanca = acertos @ np.log(p) + (observadas - acertos) @ np.log1p(-p)
+        log_posteriori = log_verossimilhanca + self._log_priori
+        pesos = np.exp(log_posteriori - log_posteriori.max(axis=1, keepdims=True))
+        pesos /= pesos.sum(axis=1, keepdims=True)
+
+        theta = pesos @ self._grade
+        variancia = pesos @ self._grade**2 - theta**2
+
+        curva = log_verossimilhanca if self.metodo == "ML" else log_posteriori
+        k = np.clip(np.argmax(curva, axis=1), 1, len(self._grade) - 2)
+        linhas = np.arange(len(k))
+        y0, y1, y2 = curva[linhas, k - 1], curva[linhas, k], curva[linhas, k + 1]
+        curvatura = y0 - 2 * y1 + y2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            deslocamento = np.where(curvatura < 0, 0.5 * (y0 - y2) / curvatura, 0.0)
+        passo = self._grade[1] - self._grade[0]
+        moda = self._grade[k] + np.clip(deslocamento, -1, 1) * passo
+
+        return theta, np.sqrt(np.clip(variancia, 0, None)), moda
+
+    def _maximizar(
+        self,
+        theta: np.ndarray,
+        acertos: np.ndarray,
+        observadas: np.ndarray,
+        a: np.ndarray,
+        b: np.ndarray,
+        c: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fisher scoring de todos os thetas do bloco ao mesmo tempo (MAP ou ML).
+        A cada iteração só os respondentes que ainda não convergiram são
+        recalculados.
+        """
+        usar_priori = self.metodo == "MAP"
+        theta = theta.copy()
+        informacao = np.zeros_like(theta)
+        ativos = np.arange(len(theta))
+
+        for _ in range(self.max_iteracoes):
+            theta_ativo = theta[ativos]
+            observadas_ativas = observadas[ativos]
+
+            p = self._probabilidade(theta_ativo, a, b, c)
+            logistica = (p - c) / (1 - c)
+            derivada = self.constante_d * a * (1 - c) * logistica * (1 - logistica)
+            peso = derivada / (p * (1 - p))
+
+            gradiente = ((acertos[ativos] - observadas_ativas * p) * peso).sum(axis=1)
+            informacao_ativa = (observadas_ativas * derivada * peso).sum(axis=1)
+            if usar_priori:
+                gradiente -= theta_ativo
+                informacao_ativa += 1.0
+
+            passo = np.clip(gradiente / np.maximum(informacao_ativa, 1e-9), -1.0, 1.0)
+            novo_theta = np.clip(theta_ativo + passo, *self.limites)
+            theta[ativos] = novo_theta
+            informacao[ativos] = informacao_ativa
+
+            # Converge quando theta para de mudar (inclusive preso no limite)
+            ativos = ativos[np.abs(novo_theta - theta_ativo) >= self.tolerancia]
+            if not len(ativos):
+                break
+
+        with np.errstate(divide="ignore"):
+            erro_padrao = 1 / np.sqrt(informacao)
+        return theta, erro_padrao
+
+    def estimar(self, dados: Union[pd.DataFrame, MatrizRespostas]) -> pd.DataFrame:
+        """
+        Estima theta para cada respondente.
+
+        Args:
+            dados (Union[pd.DataFrame, MatrizRespostas]): Resultados no formato
+                longo (respondente_id, item_id, acertou) ou matriz já montada.
+                Itens sem parâmetros conhecidos são ignorados.
+
+        Returns:
+            pd.DataFrame: respondente_id, theta_estimado, erro_padrao e
+            num_respostas (respostas a itens com parâmetros).
+        """
+        matriz = (
+            dados
+            if isinstance(dados, MatrizRespostas)
+            else MatrizRespostas.de_resultados(dados)
+        )
+        linhas = [
+            linha
+            for linha, id_item in enumerate(matriz.ids_itens)
+            if str(id_item) in self._parametros_por_id
+        ]
+        if not linhas:
+            raise ValueError("Nenhum item da matriz tem parâmetros conhecidos.")
+
+        parametros = np.array(
+            [self._parametros_por_id[str(matriz.ids_itens[linha])] for linha in linhas],
+            dtype=float,
+        )
+        a, b, c = parametros.T
+
+        thetas, erros_padrao, num_respostas = [], [], []
+        for inicio in range(0, matriz.num_respondentes, self.tamanho_bloco):
+            bloco = matriz.valores[linhas, inicio : inicio + self.tamanho_bloco].T
+            acertos = (bloco == 1).astype(float)
+            observadas = (bloco != MatrizRespostas.AUSENTE).astype(float)
+
+            theta, erro_padrao, moda = self._eap(acertos, observadas, a, b, c)
+            if self.metodo != "EAP":
+                theta, erro_padrao = self._maximizar(
+                    moda, acertos, observadas, a, b, c
+                )
+                if self.metodo == "ML":
+                    # Só acertos ou só erros: a verossimilhança não tem máximo
+                    num_acertos = acertos.sum(axis=1)
+                    num_erros = observadas.sum(axis=1) - num_acertos
+                    theta = np.where(num_erros == 0, self.limites[1], theta)
+                    theta = np.where(num_acertos == 0, self.limites[0], theta)
+                    erro_padrao = np.where(
+                        (num_acertos == 0) | (num_erros == 0), np.nan, erro_padrao
+                    )
+
+            thetas.append(theta)
+            erros_padrao.append(erro_padrao)
+            num_respostas.append(observadas.sum(axis=1).astype(int))
+
+        num_respostas_total = np.concatenate(num_respostas)
+        theta_total = np.concatenate(thetas)
+        if self.metodo == "ML":
+            theta_total = np.where(num_respostas_total > 0, theta_total, np.nan)
+
+        return pd.DataFrame(
+            {
+                "respondente_id": matriz.ids_respondentes,
+                "theta_estimado": theta_total,
+                "erro_padrao": np.where(
+                    num_respostas_total > 0, np.concatenate(erros_padrao), np.nan
+                ),
+                "num_respostas": num_respostas_total,
+            }
+        )
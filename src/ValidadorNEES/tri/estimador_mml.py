@@ -0,0 +1,420 @@
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit, logit
+
+from .matriz_respostas import MatrizRespostas
+
+ModeloTRI = Literal["1PL", "2PL", "3PL"]
+ParametrosItem = Tuple[float, float, float]  # (a, b, c) do modelo 3PL
+
+# Limites dos parâmetros internos (a, d = -a * b, logit(c)) durante o EM
+LIMITES_A = (0.05, 8.0)
+LIMITES_D = (-20.0, 20.0)
+LIMITES_LOGIT_C = (float(logit(1e-4)), float(logit(0.5)))
+
+
+class ResultadoMML:
+    """
+    Resultado de uma estimação do `EstimadorMML`.
+
+    Attributes:
+        parametros (pd.DataFrame): Uma linha por item: ID_QUESTÃO, A, B, C e os
+            erros padrão EP_A, EP_B e EP_C (NaN para parâmetros fixos do modelo)
+        modelo (ModeloTRI): "1PL", "2PL" ou "3PL"
+        log_verossimilhanca (float): Log-verossimilhança marginal final
+        iteracoes (int): Número de ciclos EM executados
+        convergiu (bool): Se a tolerância foi atingida antes de `max_iteracoes`
+    """
+
+    def __init__(
+        self,
+        parametros: pd.DataFrame,
+        modelo: ModeloTRI,
+        log_verossimilhanca: float,
+        iteracoes: int,
+        convergiu: bool,
+    ) -> None:
+        self.parametros = parametros
+        self.modelo = modelo
+        self.log_verossimilhanca = log_verossimilhanca
+        self.iteracoes = iteracoes
+        self.convergiu = convergiu
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultadoMML(modelo={self.modelo!r}, itens={len(self.parametros)}, "
+            f"log_verossimilhanca={self.log_verossimilhanca:.2f}, "
+            f"iteracoes={self.iteracoes}, convergiu={self.convergiu})"
+        )
+
+    def parametros_itens(self) -> Dict[Any, ParametrosItem]:
+        """
+        Parâmetros (a, b, c) por item_id, no formato aceito como ponto de
+        partida (`parametros_iniciais`) e pelo `MotorCAT`.
+        """
+        return {
+            id_item: (float(a), float(b), float(c))
+            for id_item, a, b, c in zip(
+                self.parametros["ID_QUESTÃO"],
+                self.parametros["A"],
+                self.parametros["B"],
+                self.parametros["C"],
+            )
+        }
+
+
+class EstimadorMML:
+    """
+    Estimador de máxima verossimilhança marginal (MML) dos parâmetros dos itens
+    pelo algoritmo EM de Bock e Aitkin, para os modelos 1PL, 2PL e 3PL.
+
+    A habilidade é integrada por quadratura de Gauss-Hermite sob a priori
+    N(0, 1), que fixa a escala. Os respondentes são agrupados por padrão de
+    resposta e o passo E é feito com produtos de matrizes (padrões x itens) @
+    (itens x pontos). O passo M aplica alguns passos de Fisher scoring a todos
+    os itens de uma vez. No 3PL, o parâmetro c recebe uma priori
+    Beta(`priori_c`), como no BILOG, para estabilizar a estimação.
+
+    Os erros padrão vêm da inversa da informação empírica (produto cruzado dos
+    escores por padrão de resposta), propagada para (a, b, c) pelo método delta.
+
+    Attributes:
+        modelo (ModeloTRI): "1PL" (a = 1), "2PL" ou "3PL"
+        num_pontos (int): Pontos de quadratura
+        max_iteracoes (int): Limite de ciclos EM
+        tolerancia (float): Maior variação dos parâmetros que encerra o EM
+        priori_c (Tuple[float, float]): Parâmetros (alfa, beta) da priori Beta de c
+        constante_d (float): Constante de escala D do modelo logístico
+    """
+
+    MODELOS = ("1PL", "2PL", "3PL")
+
+    def __init__(
+        self,
+        modelo: ModeloTRI = "2PL",
+        num_pontos: int = 41,
+        max_iteracoes: int = 500,
+        tolerancia: float = 1e-4,
+        priori_c: Tuple[float, float] = (5.0, 17.0),
+        constante_d: float = 1.0,
+    ) -> None:
+        if modelo not in self.MODELOS:
+            raise ValueError(f"Modelo '{modelo}' inválido. Opções: {self.MODELOS}")
+        if num_pontos < 5:
+            raise ValueError("num_pontos deve ser maior ou igual a 5.")
+
+        self.modelo = modelo
+        self.num_pontos = num_pontos
+        self.max_iteracoes = max_iteracoes
+        self.tolerancia = tolerancia
+        self.priori_c = priori_c
+        self.constante_d = constante_d
+
+        pontos, pesos = np.polynomial.hermite_e.hermegauss(num_pontos)
+        self._pontos = pontos
+        self._log_pesos = np.log(pesos / pesos.sum())
+
+    def __repr__(self) -> str:
+        return (
+            f"EstimadorMML(modelo={self.modelo!r}, num_pontos={self.num_pontos!r}, "
+            f"tolerancia={self.tolerancia!r})"
+        )
+
+    def configuracao(self) -> Dict[str, Any]:
+        """Opções que afetam as estimativas (usadas na chave do cache)."""
+        return {
+            "modelo": self.modelo,
+            "num_pontos": self.num_pontos,
+            "max_iteracoes": self.max_iteracoes,
+            "tolerancia": self.tolerancia,
+            "priori_c": list(self.priori_c),
+            "constante_d": self.constante_d,
+        }
+
+    @property
+    def _num_parametros(self) -> int:
+        return {"1PL": 1, "2PL": 2, "3PL": 3}[self.modelo]
+
+    @staticmethod
+    def _padroes_de_resposta(matriz: MatrizRespostas) -> Tuple[np.ndarray, np.ndarray]:
+        """Padrões de resposta distintos (padrões, itens) e quantos respondentes
+        têm cada um."""
+        por_respondente = np.ascontiguousarray(matriz.valores.T)
+        linhas = por_respondente.view(
+            np.dtype((np.void, por_respondente.dtype.itemsize * matriz.num_itens))
+        ).ravel()
+        _, primeiras, contagens = np.unique(
+            linhas, return_index=True, return_counts=True
+        )
+        return por_respondente[primeiras], contagens.astype(float)
+
+    def _valores_iniciais(
+        self,
+        matriz: MatrizRespostas,
+        parametros_iniciais: Optional[Dict[Any, ParametrosItem]],
+    ) -> np.ndarray:
+        """Parâmetros internos (itens, 3) = (a, d, logit(c))."""
+        alfa, beta = self.priori_c
+        c = np.full(matriz.num_itens, alfa / (alfa + beta) if self.modelo == "3PL" else 0.0)
+        p = np.clip(np.nan_to_num(matriz.proporcao_acerto(), nan=0.5), 0.02, 0.98)
+        p = np.clip((p - c) / (1 - c), 0.02, 0.98)
+
+        a = np.ones(matriz.num_itens)
+        d = logit(p) / self.constante_d
+
+        for linha, id_item in enumerate(matriz.ids_itens):
+            if parametros_iniciais and id_item in parametros_iniciais:
+                a_i, b_i, c_i = parametros_iniciais[id_item]
+                if self.modelo != "1PL":
+                    a[linha] = a_i
+                d[linha] = -a[linha] * b_i
+                if self.modelo == "3PL":
+                    c[linha] = c_i
+
+        return np.column_stack(
+            [
+                np.clip(a, *LIMITES_A),
+                np.clip(d, *LIMITES_D),
+                np.clip(logit(np.clip(c, 1e-4, 0.5)), *LIMITES_LOGIT_C),
+            ]
+        )
+
+    def _probabilidade_e_jacobiano(
+        self, parametros: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        P(acerto) (itens, pontos) e suas derivadas em relação aos parâmetros
+        livres do modelo (itens, pontos, k).
+        """
+        a, d, logit_c = (parametros[:, k, np.newaxis] for k in range(3))
+        c = expit(logit_c) if self.modelo == "3PL" else np.zeros_like(a)
+
+        s = expit(self.constante_d * (a * self._pontos + d))
+        p = c + (1 - c) * s
+        derivada = (1 - c) * s * (1 - s) * self.constante_d
+
+        colunas = [derivada]
+        if self.modelo != "1PL":
+            colunas.insert(0, derivada * self._pontos)
+        if self.modelo == "3PL":
+            colunas.append(c * (1 - c) * (1 - s))
+        return np.clip(p, 1e-9, 1 - 1e-9), np.stack(colunas, axis=-1)
+
+    def _indices_livres(self) -> List[int]:
+        return {"1PL": [1], "2PL": [0, 1], "3PL": [0, 1, 2]}[self.modelo]
+
+    def _priori_c(self, parametros: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Gradiente e informação da priori Beta em logit(c) (zeros fora do 3PL)."""
+        k = self._num_parametros
+        gradiente = np.zeros((len(parametros), k))
+        informacao = np.zeros((len(parametros), k, k))
+        if self.modelo == "3PL":
+            alfa, beta = self.priori_c
+            c = expit(parametros[:, 2])
+            gradiente[:, 2] = (alfa - 1) * (1 - c) - (beta - 1) * c
+            informacao[:, 2, 2] = (alfa + beta - 2) * c * (1 - c)
+        return gradiente, informacao
+
+    def _passo_m(
+        self,
+        parametros: np.ndarray,
+        acertos_esperados: np.ndarray,
+        respostas_esperadas: np.ndarray,
+        passos: int = 5,
+    ) -> np.ndarray:
+        """Fisher scoring, vetorizado em todos os itens, da log-verossimilhança
+        completa esperada."""
+        livres = self._indices_livres()
+        identidade = 1e-6 * np.eye(self._num_parametros)
+
+        for _ in range(passos):
+            p, jacobiano = self._probabilidade_e_jacobiano(parametros)
+            peso = 1 / (p * (1 - p))
+
+            # Somas em q como produtos de matrizes em lote (mais rápidos que einsum)
+            residuo = (acertos_esperados - respostas_esperadas * p) * peso
+            gradiente = (residuo[:, np.newaxis, :] @ jacobiano)[:, 0]
+            informacao = (
+                jacobiano * (respostas_esperadas * peso)[..., np.newaxis]
+            ).transpose(0, 2, 1) @ jacobiano
+            gradiente_priori, informacao_priori = self._priori_c(parametros)
+
+            passo = np.linalg.solve(
+                informacao + informacao_priori + identidade,
+                (gradiente + gradiente_priori)[..., np.newaxis],
+            )[..., 0]
+            # Limita o passo para evitar saltos em itens mal condicionados
+            passo /= np.maximum(1.0, np.abs(passo).max(axis=1, keepdims=True))
+
+            parametros = parametros.copy()
+            parametros[:, livres] += passo
+            parametros[:, 0] = np.clip(parametros[:, 0], *LIMITES_A)
+            parametros[:, 1] = np.clip(parametros[:, 1], *LIMITES_D)
+            parametros[:, 2] = np.clip(parametros[:, 2], *LIMITES_LOGIT_C)
+
+            if np.abs(passo).max() < self.tolerancia:
+                break
+
+        return parametros
+
+    def _posteriori(
+        self,
+        parametros: np.ndarray,
+        acertos: np.ndarray,
+        observadas: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Passo E: posteriori de cada padrão nos pontos de quadratura (padrões,
+        pontos) e log-verossimilhança marginal de cada padrão.
+        """
+        p, _ = self._probabilidade_e_jacobiano(parametros)
+        log_p, log_q = np.log(p), np.log1p(-p)
+
+        log_posteriori = (
+            acertos @ log_p + (observadas - acertos) @ log_q + self._log_pesos
+        )
+        maximo = log_posteriori.max(axis=1, keepdims=True)
+        posteriori = np.exp(log_posteriori - maximo)
+        soma = posteriori.sum(axis=1, keepdims=True)
+        return posteriori / soma, (maximo + np.log(soma))[:, 0]
+
+    def _erros_padrao(
+        self,
+        parametros: np.ndarray,
+        acertos: np.ndarray,
+        observadas: np.ndarray,
+        contagens: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Covariância dos parâmetros livres por item (itens, k, k), pela inversa
+        da informação empírica (produto cruzado dos escores dos padrões).
+        """
+        num_itens, k = len(parametros), self._num_parametros
+        posteriori, _ = self._posteriori(parametros, acertos, observadas)
+        p, jacobiano = self._probabilidade_e_jacobiano(parametros)
+        peso_jacobiano = jacobiano / (p * (1 - p))[..., np.newaxis]
+
+        # Escore do padrão u no item i: sum_q post_uq (x_ui - P_iq) w_iq J_iqk
+        termo_acerto = posteriori @ peso_jacobiano.transpose(1, 0, 2).reshape(
+            len(self._pontos), num_itens * k
+        )
+        termo_esperado = posteriori @ (
+            p[..., np.newaxis] * peso_jacobiano
+        ).transpose(1, 0, 2).reshape(len(self._pontos), num_itens * k)
+        escores = acertos.repeat(k, axis=1) * termo_acerto - observadas.repeat(
+            k, axis=1
+        ) * termo_esperado
+
+        informacao = (escores * contagens[:, np.newaxis]).T @ escores
+        _, informacao_priori = self._priori_c(parametros)
+        for i in range(num_itens):
+            bloco = slice(i * k, (i + 1) * k)
+            informacao[bloco, bloco] += informacao_priori[i]
+
+        covariancia = np.linalg.pinv(informacao)
+        return np.stack(
+            [covariancia[i * k : (i + 1) * k, i * k : (i + 1) * k] for i in range(num_itens)]
+        )
+
+    def estimar(
+        self,
+        dados: Union[pd.DataFrame, MatrizRespostas],
+        parametros_iniciais: Optional[Dict[Any, ParametrosItem]] = None,
+    ) -> ResultadoMML:
+        """
+        Estima os parâmetros dos itens.
+
+        Args:
+            dados (Union[pd.DataFrame, MatrizRespostas]): Resultados no formato
+                longo (respondente_id, item_id, acertou) ou matriz já montada.
+                Respostas ausentes são ignoradas.
+            parametros_iniciais (Optional[Dict[Any, ParametrosItem]]): Ponto de
+                partida (a, b, c) por item_id (ex: de uma estimação anterior ou
+                de `carregar_parametros_previos`). Itens sem entrada partem da
+                proporção de acerto.
+
+        Returns:
+            ResultadoMML: Parâmetros, erros padrão e diagnóstico da convergência.
+        """
+        matriz = (
+            dados
+            if isinstance(dados, MatrizRespostas)
+            else MatrizRespostas.de_resultados(dados)
+        )
+        if matriz.num_itens == 0 or matriz.num_respondentes == 0:
+            raise ValueError("Não há respostas para estimar os parâmetros.")
+
+        padroes, contagens = self._padroes_de_resposta(matriz)
+        acertos = (padroes == 1).astype(float)
+        observadas = (padroes != MatrizRespostas.AUSENTE).astype(float)
+
+        parametros = self._valores_iniciais(matriz, parametros_iniciais)
+        convergiu = False
+        iteracoes = 0
+
+        for iteracoes in range(1, self.max_iteracoes + 1):
+            posteriori, _ = self._posteriori(parametros, acertos, observadas)
+            ponderada = posteriori * contagens[:, np.newaxis]
+
+            anteriores = parametros
+            parametros = self._passo_m(
+                parametros, acertos.T @ ponderada, observadas.T @ ponderada
+            )
+
+            if np.abs(parametros - anteriores).max() < self.tolerancia:
+                convergiu = True
+                break
+
+        if not convergiu:
+            print(
+                f"AVISO: o EM não convergiu em {self.max_iteracoes} iterações "
+                f"(tolerância {self.tolerancia})."
+            )
+
+        _, log_marginais = self._posteriori(parametros, acertos, observadas)
+        covariancia = self._erros_padrao(parametros, acertos, observadas, contagens)
+
+        return ResultadoMML(
+            parametros=self._tabela_parametros(matriz, parametros, covariancia),
+            modelo=self.modelo,
+            log_verossimilhanca=float(contagens @ log_marginais),
+            iteracoes=iteracoes,
+            convergiu=convergiu,
+        )
+
+    def _tabela_parametros(
+        self, matriz: MatrizRespostas, parametros: np.ndarray, covariancia: np.ndarray
+    ) -> pd.DataFrame:
+        """Converte (a, d, logit(c)) e a covariância em (a, b, c) e erros padrão
+        (método delta)."""
+        a, d, logit_c = parametros.T
+        b = -d / a
+        c = expit(logit_c) if self.modelo == "3PL" else np.zeros_like(a)
+
+        nan = np.full_like(a, np.nan)
+        if self.modelo == "1PL":
+            ep_a, ep_b = nan, np.sqrt(covariancia[:, 0, 0])
+        else:
+            var_a, var_d, cov_ad = (
+                covariancia[:, 0, 0],
+                covariancia[:, 1, 1],
+                covariancia[:, 0, 1],
+            )
+            # b = -d / a: db/da = d / a^2, db/dd = -1 / a
+            var_b = (d / a**2) ** 2 * var_a + var_d / a**2 - 2 * (d / a**3) * cov_ad
+            ep_a, ep_b = np.sqrt(var_a), np.sqrt(np.clip(var_b, 0, None))
+        ep_c = c * (1 - c) * np.sqrt(covariancia[:, 2, 2]) if self.modelo == "3PL" else nan
+
+        return pd.DataFrame(
+            {
+                "ID_QUESTÃO": matriz.ids_itens,
+                "A": a,
+                "B": b,
+                "C": c,
+                "EP_A": ep_a,
+                "EP_B": ep_b,
+                "EP_C": ep_c,
+            }
+        )
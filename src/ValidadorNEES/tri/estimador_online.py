@@ -0,0 +1,250 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+
+from ..core.respondente import Respondente
+from .estimador import EstimadorTRI
+
+# Limites de (a, b) nas estimativas por estrato
+LIMITES_A = (0.05, 8.0)
+LIMITES_B = (-6.0, 6.0)
+
+
+class SimulacaoInterrompida(BaseException):
+    """
+    Levantada quando o `criterio_parada` do `EstimadorOnline` pede o fim da
+    simulação. As respostas já obtidas continuam no registro (se houver).
+
+    Herda de BaseException (como `asyncio.CancelledError`) para não ser tratada
+    como falha de chamada pelas retentativas do `Simulador`, que capturam
+    `Exception`.
+
+    Attributes:
+        parametros (pd.DataFrame): Estimativas no momento da interrupção
+    """
+
+    def __init__(self, mensagem: str, parametros: pd.DataFrame) -> None:
+        super().__init__(mensagem)
+        self.parametros = parametros
+
+
+class EstimadorOnline:
+    """
+    Estimação incremental dos parâmetros dos itens, alimentada pelo
+    `Simulador` à medida que os lotes de respostas chegam.
+
+    Para cada item são mantidas apenas estatísticas suficientes por estrato de
+    habilidade (os 7 níveis de persona, que são o que o prompt distingue):
+    número de respostas, de acertos e soma das habilidades. Como a habilidade
+    de cada respondente simulado é conhecida, A e B saem de uma regressão
+    logística agrupada P(acerto | nível) = expit(a * (theta_nivel - b)), com
+    theta_nivel igual à habilidade média do estrato. Cada `snapshot` parte das
+    estimativas anteriores (poucas iterações) e custa O(itens x níveis),
+    independente do número de respostas.
+
+    Attributes:
+        a_cada (Optional[int]): A cada quantas respostas gerar um snapshot
+            automático (None = apenas sob demanda)
+        ao_atualizar (Optional[Callable[[pd.DataFrame], None]]): Chamado com
+            cada snapshot automático
+        criterio_parada (Optional[Callable[[pd.DataFrame], bool]]): Se retornar
+            True para um snapshot automático, a simulação é interrompida com
+            `SimulacaoInterrompida`
+        min_respostas (int): Respostas mínimas de um item para estimar A e B
+        total (int): Respostas recebidas até agora
+    """
+
+    def __init__(
+        self,
+        a_cada: Optional[int] = None,
+        ao_atualizar: Optional[Callable[[pd.DataFrame], None]] = None,
+        criterio_parada: Optional[Callable[[pd.DataFrame], bool]] = None,
+        min_respostas: int = 20,
+    ) -> None:
+        if a_cada is not None and a_cada < 1:
+            raise ValueError("a_cada deve ser maior ou igual a 1.")
+
+        self.a_cada = a_cada
+        self.ao_atualizar = ao_atualizar
+        self.criterio_parada = criterio_parada
+        self.min_respostas = min_respostas
+        self.total = 0
+
+        num_niveis = len(Respondente.NOMES_NIVEIS)
+        self._posicao_item: Dict[Any, int] = {}
+        self._n = np.zeros((0, num_niveis))
+        self._acertos = np.zeros((0, num_niveis))
+        self._soma_habilidade = np.zeros((0, num_niveis))
+        # (inclinação, intercepto) da última estimativa, ponto de partida da próxima
+        self._coeficientes = np.zeros((0, 2))
+        self._proximo_snapshot = a_cada
+
+    def __repr__(self) -> str:
+        return (
+            f"EstimadorOnline(itens={len(self._posicao_item)}, total={self.total}, "
+            f"a_cada={self.a_cada!r})"
+        )
+
+    def _linhas(self, ids_itens: Sequence[Any]) -> np.ndarray:
+        """Linha de cada item, criando (e aumentando os arrays) se necessário."""
+        novos = [
+            item_id
+            for item_id in dict.fromkeys(ids_itens)
+            if item_id not in self._posicao_item
+        ]
+        if novos:
+            for item_id in novos:
+                self._posicao_item[item_id] = len(self._posicao_item)
+            extra = np.zeros((len(novos), self._n.shape[1]))
+            self._n = np.vstack([self._n, extra])
+            self._acertos = np.vstack([self._acertos, extra])
+            self._soma_habilidade = np.vstack([self._soma_habilidade, extra])
+            self._coeficientes = np.vstack(
+                [self._coeficientes, np.tile([1.0, 0.0], (len(novos), 1))]
+            )
+        return np.array([self._posicao_item[item_id] for item_id in ids_itens])
+
+    def registrar(
+        self,
+        ids_itens: Sequence[Any],
+        habilidades: Sequence[float],
+        acertos: Sequence[int],
+    ) -> None:
+        """
+        Acumula um lote de respostas e, se `a_cada` for atingido, gera um
+        snapshot automático.
+
+        Args:
+            ids_itens (Sequence[Any]): Item de cada resposta
+            habilidades (Sequence[float]): Habilidade do respondente de cada resposta
+            acertos (Sequence[int]): 1 se acertou, 0 caso contrário
+        """
+        if len(ids_itens) == 0:
+            return
+
+        habilidades = np.asarray(habilidades, dtype=float)
+        niveis = np.searchsorted(
+            np.array(Respondente.LIMITES_NIVEIS), habilidades - 0.8, side="left"
+        )
+        linhas = self._linhas(ids_itens)
+
+        np.add.at(self._n, (linhas, niveis), 1)
+        np.add.at(self._acertos, (linhas, niveis), np.asarray(acertos, dtype=float))
+        np.add.at(self._soma_habilidade, (linhas, niveis), habilidades)
+        self.total += len(linhas)
+
+        if self._proximo_snapshot is not None and self.total >= self._proximo_snapshot:
+            while self._proximo_snapshot <= self.total:
+                self._proximo_snapshot += self.a_cada
+            self._atualizar()
+
+    def registrar_resultados(self, df_resultados: pd.DataFrame) -> None:
+        """Acumula resultados no formato do `ColetorResultados` (ex: de um
+        registro de uma execução anterior)."""
+        self.registrar(
+            df_resultados["item_id"].astype(str).tolist(),
+            df_resultados["habilidade_respondente"].to_numpy(dtype=float),
+            df_resultados["acertou"].to_numpy(dtype=float),
+        )
+
+    def _atualizar(self) -> None:
+        parametros = self.snapshot()
+        if self.ao_atualizar is not None:
+            self.ao_atualizar(parametros)
+        if self.criterio_parada is not None and self.criterio_parada(parametros):
+            raise SimulacaoInterrompida(
+                f"Simulação interrompida pelo critério de parada após "
+                f"{self.total} respostas.",
+                parametros,
+            )
+
+    def _ajustar(self, iteracoes: int = 10, penalidade: float = 1e-2) -> None:
+        """
+        Regressão logística agrupada por item (IRLS vetorizado em todos os
+        itens), com uma penalidade ridge leve para estratos sem erros ou sem
+        acertos.
+        """
+        n = self._n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            theta = np.where(n > 0, self._soma_habilidade / n, 0.0)
+        # Coordenadas (theta, 1) de cada estrato: (itens, níveis, 2)
+        desenho = np.stack([theta, np.ones_like(theta)], axis=-1)
+        coeficientes = self._coeficientes.copy()
+
+        for _ in range(iteracoes):
+            p = expit(np.einsum("ilk,ik->il", desenho, coeficientes))
+            gradiente = (
+                (self._acertos - n * p)[:, np.newaxis, :] @ desenho
+            )[:, 0] - penalidade * coeficientes
+            informacao = (
+                desenho * (n * p * (1 - p))[..., np.newaxis]
+            ).transpose(0, 2, 1) @ desenho + penalidade * np.eye(2)
+            passo = np.linalg.solve(informacao, gradiente[..., np.newaxis])[..., 0]
+            passo /= np.maximum(1.0, np.abs(passo).max(axis=1, keepdims=True))
+            coeficientes += passo
+            if np.abs(passo).max() < 1e-6:
+                break
+
+        self._coeficientes = coeficientes
+
+    def snapshot(self) -> pd.DataFrame:
+        """
+        Estimativas atuais no formato de `EstimadorTRI.estimar_parametros`
+        (A, B, PROB_ACERTO, ID_QUESTÃO), com a coluna extra N (respostas por
+        item). Itens com menos de `min_respostas` respostas ou com respostas em
+        um único nível ficam com A e B nulos.
+        """
+        ids_itens: List[Any] = list(self._posicao_item)
+        index_series = pd.Index(ids_itens, name="item_id")
+        if not ids_itens:
+            return pd.DataFrame(
+                columns=["A", "B", "PROB_ACERTO", "ID_QUESTÃO", "N"], index=index_series
+            )
+
+        self._ajustar()
+        inclinacao, intercepto = self._coeficientes.T
+        a = np.clip(inclinacao, *LIMITES_A)
+        b = np.clip(-intercepto / a, *LIMITES_B)
+
+        n_item = self._n.sum(axis=1)
+        estimavel = (n_item >= self.min_respostas) & (
+            np.count_nonzero(self._n, axis=1) >= 2
+        )
+        prob_acerto = pd.Series(self._acertos.sum(axis=1) / n_item, index=index_series)
+
+        return pd.DataFrame(
+            {
+                "A": np.where(estimavel, a, np.nan),
+                "B": np.where(estimavel, b, np.nan),
+                "PROB_ACERTO": EstimadorTRI.ajustar_probabilidade_sigmoidal(prob_acerto),
+                "ID_QUESTÃO": index_series,
+                "N": n_item.astype(int),
+            },
+            index=index_series,
+        )
+
+    def correlacoes(
+        self, df_parametros_reais: pd.DataFrame, method: str = "spearman"
+    ) -> Dict[str, float]:
+        """
+        Correlação entre as estimativas atuais e parâmetros de referência
+        (colunas ID_QUESTÃO, A, B e PROB_ACERTO), nos itens em comum já
+        estimados. Útil como `criterio_parada` (ex: abortar se a correlação de
+        PROB_ACERTO continuar baixa após N respostas).
+        """
+        df_comparativo = (
+            self.snapshot()
+            .reset_index(drop=True)
+            .merge(df_parametros_reais, on="ID_QUESTÃO", suffixes=("", "_real"))
+        )
+        return {
+            parametro: float(
+                df_comparativo[parametro].corr(
+                    df_comparativo[f"{parametro}_real"], method=method
+                )
+            )
+            for parametro in ("A", "B", "PROB_ACERTO")
+            if f"{parametro}_real" in df_comparativo
+        }
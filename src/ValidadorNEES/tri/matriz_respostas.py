@@ -0,0 +1,223 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Final, List, Literal, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from girth import INVALID_RESPONSE
+
+PoliticaDuplicadas = Literal["primeira", "erro"]
+
+
+class MatrizRespostas:
+    """
+    Matriz compacta (itens x respondentes) das respostas dicotômicas, no formato
+    esperado pelos estimadores TRI.
+
+    Os valores ficam em um único array int8: 1 (acertou), 0 (errou) ou
+    `AUSENTE` (-1, par não respondido). Os ids de itens e respondentes são
+    mapeados para linhas e colunas por dicionários. A matriz pode ser gravada
+    em disco e reaberta como memory-map (`carregar(..., mmap=True)`), de modo
+    que vários processos (ex: workers de bootstrap) leiam o mesmo arquivo sem
+    copiar os dados.
+
+    Attributes:
+        valores (np.ndarray): Array int8 (itens, respondentes)
+        ids_itens (List[Any]): Id do item de cada linha
+        ids_respondentes (np.ndarray): Id do respondente de cada coluna (int64)
+        posicao_item (Dict[Any, int]): Linha de cada item_id
+        posicao_respondente (Dict[int, int]): Coluna de cada respondente_id
+    """
+
+    AUSENTE: Final[int] = -1
+
+    ARQUIVO_VALORES: Final[str] = "valores.npy"
+    ARQUIVO_RESPONDENTES: Final[str] = "respondentes.npy"
+    ARQUIVO_ITENS: Final[str] = "itens.json"
+
+    def __init__(
+        self,
+        valores: np.ndarray,
+        ids_itens: Sequence[Any],
+        ids_respondentes: Sequence[int],
+    ) -> None:
+        if valores.dtype != np.int8 or valores.ndim != 2:
+            raise ValueError("valores deve ser um array int8 (itens, respondentes).")
+        if valores.shape != (len(ids_itens), len(ids_respondentes)):
+            raise ValueError(
+                f"Formato {valores.shape} incompatível com {len(ids_itens)} itens "
+                f"e {len(ids_respondentes)} respondentes."
+            )
+
+        self.valores = valores
+        self.ids_itens = list(ids_itens)
+        self.ids_respondentes = np.asarray(ids_respondentes, dtype=np.int64)
+
+        self.posicao_item: Dict[Any, int] = {
+            item_id: linha for linha, item_id in enumerate(self.ids_itens)
+        }
+        self.posicao_respondente: Dict[int, int] = {
+            int(respondente_id): coluna
+            for coluna, respondente_id in enumerate(self.ids_respondentes)
+        }
+        if len(self.posicao_item) < len(self.ids_itens) or len(
+            self.posicao_respondente
+        ) < len(self.ids_respondentes):
+            raise ValueError("Os ids de itens e respondentes devem ser únicos.")
+
+    def __repr__(self) -> str:
+        return (
+            f"MatrizRespostas(itens={self.num_itens}, "
+            f"respondentes={self.num_respondentes}, "
+            f"ausentes={self.num_ausentes()})"
+        )
+
+    @property
+    def num_itens(self) -> int:
+        return self.valores.shape[0]
+
+    @property
+    def num_respondentes(self) -> int:
+        return self.valores.shape[1]
+
+    @property
+    def mascara(self) -> np.ndarray:
+        """Array booleano (itens, respondentes): True onde há resposta."""
+        return self.valores != self.AUSENTE
+
+    @classmethod
+    def de_resultados(
+        cls,
+        df_resultados: pd.DataFrame,
+        ids_itens: Optional[Sequence[Any]] = None,
+        ids_respondentes: Optional[Sequence[int]] = None,
+        duplicadas: PoliticaDuplicadas = "primeira",
+    ) -> "MatrizRespostas":
+        """
+        Monta a matriz a partir dos resultados no formato longo (colunas
+        respondente_id, item_id e acertou), em uma única passada vetorizada.
+
+        Pares sem resposta ficam como `AUSENTE`, assim como linhas com
+        `acertou` nulo.
+
+        Args:
+            df_resultados (pd.DataFrame): Resultados da simulação
+            ids_itens (Optional[Sequence[Any]]): Itens (e ordem) das linhas. Se
+                None, usa os itens dos resultados em ordem crescente. Linhas de
+                itens fora da lista são ignoradas.
+            ids_respondentes (Optional[Sequence[int]]): Respondentes (e ordem)
+                das colunas, com a mesma regra de `ids_itens`
+            duplicadas (PoliticaDuplicadas): "primeira" mantém a primeira
+                resposta de um par repetido; "erro" levanta ValueError
+
+        Returns:
+            MatrizRespostas: Matriz (itens, respondentes).
+        """
+        if duplicadas not in ("primeira", "erro"):
+            raise ValueError(f"Política de duplicadas '{duplicadas}' inválida.")
+
+        acertou = df_resultados["acertou"].to_numpy(dtype=float, na_value=np.nan)
+
+        if ids_itens is None:
+            linhas, uniques_itens = pd.factorize(df_resultados["item_id"], sort=True)
+            ids_itens = np.asarray(uniques_itens).tolist()
+        else:
+            linhas = pd.Index(ids_itens).get_indexer(df_resultados["item_id"])
+
+        if ids_respondentes is None:
+            colunas, uniques_respondentes = pd.factorize(
+                df_resultados["respondente_id"], sort=True
+            )
+            ids_respondentes = np.asarray(uniques_respondentes, dtype=np.int64)
+        else:
+            colunas = pd.Index(ids_respondentes).get_indexer(
+                df_resultados["respondente_id"]
+            )
+
+        validas = (linhas >= 0) & (colunas >= 0) & ~np.isnan(acertou)
+        num_respondentes = len(ids_respondentes)
+        posicoes = linhas[validas].astype(np.int64) * num_respondentes + colunas[validas]
+
+        respostas = acertou[validas] > 0
+        valores = np.full(
+            (len(ids_itens), num_respondentes), cls.AUSENTE, dtype=np.int8
+        )
+        valores.ravel()[posicoes] = respostas
+
+        # Menos células preenchidas que respostas = pares repetidos. Só nesse
+        # caso paga-se a ordenação para manter a primeira ocorrência de cada par.
+        repetidas = len(posicoes) - int(np.count_nonzero(valores != cls.AUSENTE))
+        if repetidas:
+            if duplicadas == "erro":
+                raise ValueError(
+                    f"{repetidas} pares (respondente, item) aparecem mais de uma vez."
+                )
+            print(f"{repetidas} respostas repetidas foram descartadas.")
+            posicoes_unicas, primeiras = np.unique(posicoes, return_index=True)
+            valores.ravel()[posicoes_unicas] = respostas[primeiras]
+
+        return cls(valores, ids_itens, ids_respondentes)
+
+    def num_ausentes(self) -> int:
+        return int(np.count_nonzero(self.valores == self.AUSENTE))
+
+    def num_respostas(self) -> np.ndarray:
+        """Número de respostas (não ausentes) por item."""
+        return np.count_nonzero(self.mascara, axis=1)
+
+    def proporcao_acerto(self) -> np.ndarray:
+        """Proporção de acerto por item, ignorando ausentes (NaN se não houver)."""
+        acertos = np.count_nonzero(self.valores == 1, axis=1)
+        respostas = self.num_respostas()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(respostas > 0, acertos / respostas, np.nan)
+
+    def para_girth(self) -> np.ndarray:
+        """
+        Cópia int32 no formato do girth: ausentes viram `INVALID_RESPONSE` e
+        não contribuem para as estimativas.
+        """
+        dados = self.valores.astype(np.int32)
+        dados[dados == self.AUSENTE] = INVALID_RESPONSE
+        return dados
+
+    def selecionar_itens(self, ids_itens: Sequence[Any]) -> "MatrizRespostas":
+        """Nova matriz apenas com os itens informados (na ordem dada)."""
+        faltando = [item_id for item_id in ids_itens if item_id not in self.posicao_item]
+        if faltando:
+            raise ValueError(f"Itens fora da matriz: {faltando[:5]}")
+
+        linhas = [self.posicao_item[item_id] for item_id in ids_itens]
+        return MatrizRespostas(
+            np.ascontiguousarray(self.valores[linhas]), ids_itens, self.ids_respondentes
+        )
+
+    def salvar(self, caminho: Union[str, Path]) -> Path:
+        """
+        Grava a matriz no diretório `caminho` (valores .npy, ids dos
+        respondentes .npy e ids dos itens em JSON).
+        """
+        caminho = Path(caminho)
+        caminho.mkdir(parents=True, exist_ok=True)
+
+        np.save(caminho / self.ARQUIVO_VALORES, self.valores)
+        np.save(caminho / self.ARQUIVO_RESPONDENTES, self.ids_respondentes)
+        with open(caminho / self.ARQUIVO_ITENS, "w", encoding="utf-8") as arquivo:
+            json.dump(self.ids_itens, arquivo, ensure_ascii=False)
+        return caminho
+
+    @classmethod
+    def carregar(cls, caminho: Union[str, Path], mmap: bool = True) -> "MatrizRespostas":
+        """
+        Lê uma matriz gravada com `salvar`. Com `mmap`, os valores são mapeados
+        somente para leitura, sem carregar o arquivo na memória.
+        """
+        caminho = Path(caminho)
+        if not (caminho / cls.ARQUIVO_VALORES).is_file():
+            raise ValueError(f"Nenhuma matriz de respostas encontrada em {caminho}.")
+
+        valores = np.load(caminho / cls.ARQUIVO_VALORES, mmap_mode="r" if mmap else None)
+        ids_respondentes = np.load(caminho / cls.ARQUIVO_RESPONDENTES)
+        with open(caminho / cls.ARQUIVO_ITENS, encoding="utf-8") as arquivo:
+            ids_itens: List[Any] = json.load(arquivo)
+        return cls(valores, ids_itens, ids_respondentes)
@@ -0,0 +1,193 @@
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+PARAMETROS_METRICAS: Tuple[str, ...] = ("A", "B", "PROB_ACERTO")
+METRICAS: Tuple[str, ...] = (
+    "n",
+    "pearson",
+    "spearman",
+    "bias",
+    "rmse",
+    "mae",
+    "acuracia",
+)
+# Quantis dos valores reais que definem as faixas da acurácia (como no
+# `ValidadorTRI`: 25% / 50% / 25%)
+QUANTIS_FAIXAS: Tuple[float, ...] = (0.25, 0.50)
+
+
+def empilhar_execucoes(
+    df_real: pd.DataFrame,
+    execucoes: Mapping[Any, pd.DataFrame],
+    parametros: Sequence[str] = PARAMETROS_METRICAS,
+) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+    """
+    Alinha várias execuções simuladas aos parâmetros reais.
+
+    Args:
+        df_real (pd.DataFrame): Parâmetros reais (ID_QUESTÃO e `parametros`)
+        execucoes (Mapping[Any, pd.DataFrame]): Saída de
+            `EstimadorTRI.estimar_parametros` (ou equivalente) por execução
+        parametros (Sequence[str]): Colunas comparadas
+
+    Returns:
+        Tuple[pd.Index, np.ndarray, np.ndarray]: Ids dos itens reais, valores
+        reais (parâmetros, itens) e simulados (execuções, parâmetros, itens).
+        Itens ausentes em uma execução ficam NaN.
+    """
+    df_real = df_real.drop_duplicates("ID_QUESTÃO").set_index("ID_QUESTÃO")
+    ids_itens = df_real.index
+    reais = df_real[list(parametros)].to_numpy(dtype=float).T
+
+    simulados = np.full((len(execucoes), len(parametros), len(ids_itens)), np.nan)
+    for r, df_simulado in enumerate(execucoes.values()):
+        posicoes = ids_itens.get_indexer(df_simulado["ID_QUESTÃO"])
+        valores = df_simulado[list(parametros)].to_numpy(dtype=float)
+        conhecidos = posicoes >= 0
+        # Atribuição em ordem inversa: em ids repetidos vale a primeira linha
+        simulados[r][:, posicoes[conhecidos][::-1]] = valores[conhecidos][::-1].T
+    return ids_itens, reais, simulados
+
+
+def limites_faixas(reais: np.ndarray) -> List[np.ndarray]:
+    """Pontos de corte internos das faixas de cada parâmetro (quantis dos
+    valores reais)."""
+    return [
+        np.unique(np.nanquantile(valores, QUANTIS_FAIXAS)) for valores in reais
+    ]
+
+
+def _correlacao(x: np.ndarray, y: np.ndarray, validos: np.ndarray) -> np.ndarray:
+    """Pearson ao longo do último eixo, só nas posições válidas."""
+    n = validos.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media_x = np.where(validos, x, 0).sum(axis=-1) / n
+        media_y = np.where(validos, y, 0).sum(axis=-1) / n
+        dx = np.where(validos, x - media_x[..., np.newaxis], 0)
+        dy = np.where(validos, y - media_y[..., np.newaxis], 0)
+        return (dx * dy).sum(axis=-1) / np.sqrt(
+            (dx**2).sum(axis=-1) * (dy**2).sum(axis=-1)
+        )
+
+
+def calcular_metricas(
+    reais: np.ndarray,
+    simulados: np.ndarray,
+    limites: Optional[Sequence[np.ndarray]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Métricas de recuperação de todas as execuções e parâmetros de uma vez.
+
+    Cada métrica usa, por execução, os itens com valor real e simulado (NaN é
+    ignorado). A acurácia compara as faixas (abaixo do 1º quartil, até a
+    mediana e acima, como no `ValidadorTRI`) dos valores reais e simulados.
+
+    Args:
+        reais (np.ndarray): Valores reais (parâmetros, itens)
+        simulados (np.ndarray): Valores simulados (execuções, parâmetros, itens)
+        limites (Optional[Sequence[np.ndarray]]): Cortes das faixas por
+            parâmetro (None = `limites_faixas(reais)`)
+
+    Returns:
+        Dict[str, np.ndarray]: Array (execuções, parâmetros) para cada nome em
+        `METRICAS`.
+    """
+    simulados = np.asarray(simulados, dtype=float)
+    if simulados.ndim != 3 or simulados.shape[1:] != reais.shape:
+        raise ValueError(
+            "simulados deve ter formato (execuções, parâmetros, itens) compatível "
+            f"com reais {reais.shape}; recebido {simulados.shape}."
+        )
+    if limites is None:
+        limites = limites_faixas(reais)
+
+    reais_exec = np.broadcast_to(reais, simulados.shape)
+    validos = ~np.isnan(simulados) & ~np.isnan(reais_exec)
+    n = validos.sum(axis=-1)
+    erro = np.where(validos, simulados - reais_exec, 0)
+
+    # Postos calculados só entre os itens válidos de cada execução
+    postos_reais = rankdata(
+        np.where(validos, reais_exec, np.nan), axis=-1, nan_policy="omit"
+    )
+    postos_simulados = rankdata(
+        np.where(validos, simulados, np.nan), axis=-1, nan_policy="omit"
+    )
+
+    faixas_iguais = np.stack(
+        [
+            np.searchsorted(cortes, reais_exec[:, p], side="left")
+            == np.searchsorted(cortes, simulados[:, p], side="left")
+            for p, cortes in enumerate(limites)
+        ],
+        axis=1,
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "n": n,
+            "pearson": _correlacao(simulados, reais_exec, validos),
+            "spearman": _correlacao(postos_simulados, postos_reais, validos),
+            "bias": erro.sum(axis=-1) / n,
+            "rmse": np.sqrt((erro**2).sum(axis=-1) / n),
+            "mae": np.abs(erro).sum(axis=-1) / n,
+            "acuracia": (faixas_iguais & validos).sum(axis=-1) / n,
+        }
+
+
+def comparar_execucoes(
+    df_real: pd.DataFrame,
+    execucoes: Mapping[Any, pd.DataFrame],
+    nomes_chave: Optional[Sequence[str]] = None,
+    parametros: Sequence[str] = PARAMETROS_METRICAS,
+) -> pd.DataFrame:
+    """
+    Compara muitas execuções simuladas (ex: modelos x temperaturas x sementes)
+    com os parâmetros reais em uma única passada vetorizada.
+
+    Args:
+        df_real (pd.DataFrame): Parâmetros reais (ID_QUESTÃO e `parametros`)
+        execucoes (Mapping[Any, pd.DataFrame]): Parâmetros estimados por
+            execução; a chave identifica a configuração (ex: ("gemini", 0.7, 1))
+        nomes_chave (Optional[Sequence[str]]): Nomes das colunas da chave (ex:
+            ("modelo", "temperatura", "semente")); None = coluna "execucao"
+        parametros (Sequence[str]): Parâmetros comparados
+
+    Returns:
+        pd.DataFrame: Formato longo, uma linha por execução e parâmetro, com as
+        colunas da chave, "parametro" e as `METRICAS`.
+    """
+    if not execucoes:
+        raise ValueError("Nenhuma execução informada.")
+
+    _, reais, simulados = empilhar_execucoes(df_real, execucoes, parametros)
+    metricas = calcular_metricas(reais, simulados)
+
+    chaves = list(execucoes)
+    if nomes_chave is None:
+        df_chaves = pd.DataFrame({"execucao": chaves})
+    else:
+        chaves = [chave if isinstance(chave, tuple) else (chave,) for chave in chaves]
+        if any(len(chave) != len(nomes_chave) for chave in chaves):
+            raise ValueError("Todas as chaves devem ter um valor por nome em nomes_chave.")
+        df_chaves = pd.DataFrame(chaves, columns=list(nomes_chave))
+
+    num_execucoes, num_parametros = len(execucoes), len(parametros)
+    return pd.concat(
+        [
+            df_chaves.loc[df_chaves.index.repeat(num_parametros)].reset_index(drop=True),
+            pd.DataFrame(
+                {
+                    "parametro": np.tile(list(parametros), num_execucoes),
+                    **{
+                        nome: valores.reshape(-1)
+                        for nome, valores in metricas.items()
+                    },
+                }
+            ),
+        ],
+        axis=1,
+    )
@@ -0,0 +1,251 @@
+from typing import Dict, Literal, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+SentidoTeste = Literal["maior", "menor", "bilateral"]
+
+# Hipótese alternativa de cada métrica no teste de permutação: correlações e
+# acurácia maiores, RMSE menor e BIAS diferente de zero do que sem associação
+SENTIDO_TESTE: Dict[str, SentidoTeste] = {
+    "spearman": "maior",
+    "pearson": "maior",
+    "bias": "bilateral",
+    "rmse": "menor",
+    "acuracia": "maior",
+}
+
+
+def _faixas(valores: np.ndarray, limites: np.ndarray) -> np.ndarray:
+    """Faixa de cada valor, com intervalos fechados à direita (como `pd.cut`)."""
+    return np.searchsorted(limites, valores, side="left")
+
+
+def _pearson_ponderado(
+    pesos: np.ndarray, x: np.ndarray, y: np.ndarray
+) -> np.ndarray:
+    """Correlação de Pearson por linha de `pesos` (reamostras, itens); x e y
+    são (itens,) ou (reamostras, itens)."""
+    n = pesos.sum(axis=1)
+    media_x = (pesos * x).sum(axis=1) / n
+    media_y = (pesos * y).sum(axis=1) / n
+    covariancia = (pesos * x * y).sum(axis=1) / n - media_x * media_y
+    variancia_x = (pesos * x**2).sum(axis=1) / n - media_x**2
+    variancia_y = (pesos * y**2).sum(axis=1) / n - media_y**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return covariancia / np.sqrt(variancia_x * variancia_y)
+
+
+class _PostosReamostra:
+    """
+    Postos médios (com empates) dos valores de uma reamostra bootstrap descrita
+    por contagens (reamostras, itens), sem ordenar cada reamostra: os valores
+    distintos são ordenados uma única vez e o posto de cada um é a soma
+    acumulada das contagens dos menores mais a média das posições empatadas.
+    """
+
+    def __init__(self, valores: np.ndarray) -> None:
+        _, self.grupos = np.unique(valores, return_inverse=True)
+        self.ordem = np.argsort(self.grupos, kind="stable")
+        self.inicios = np.flatnonzero(
+            np.diff(self.grupos[self.ordem], prepend=-1)
+        )
+
+    def postos(self, contagens: np.ndarray) -> np.ndarray:
+        contagens_grupo = np.add.reduceat(contagens[:, self.ordem], self.inicios, axis=1)
+        anteriores = np.cumsum(contagens_grupo, axis=1) - contagens_grupo
+        return (anteriores + (contagens_grupo + 1) / 2)[:, self.grupos]
+
+
+def metricas_pareadas(
+    real: np.ndarray, simulado: np.ndarray, limites: Optional[np.ndarray] = None
+) -> Dict[str, float]:
+    """
+    Métricas do `ValidadorTRI` para um par de séries (Spearman, Pearson, BIAS e
+    RMSE) e, se houver `limites` das faixas, a acurácia.
+    """
+    diferenca = simulado - real
+    metricas = {
+        "spearman": float(np.corrcoef(rankdata(real), rankdata(simulado))[0, 1]),
+        "pearson": float(np.corrcoef(real, simulado)[0, 1]),
+        "bias": float(diferenca.mean()),
+        "rmse": float(np.sqrt((diferenca**2).mean())),
+    }
+    if limites is not None:
+        metricas["acuracia"] = float(
+            np.mean(_faixas(real, limites) == _faixas(simulado, limites))
+        )
+    return metricas
+
+
+def _bootstrap_lote(
+    real: np.ndarray,
+    simulado: np.ndarray,
+    indices: np.ndarray,
+    postos_real: _PostosReamostra,
+    postos_simulado: _PostosReamostra,
+    acertos_faixa: Optional[np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """Métricas de um lote de reamostras (matriz de índices (reamostras,
+    itens)) a partir das contagens de cada item em cada reamostra."""
+    num_reamostras, num_itens = indices.shape
+    deslocamento = np.arange(num_reamostras)[:, np.newaxis] * num_itens
+    contagens = np.bincount(
+        (indices + deslocamento).ravel(), minlength=num_reamostras * num_itens
+    ).reshape(num_reamostras, num_itens).astype(float)
+
+    diferenca = simulado - real
+    metricas = {
+        "spearman": _pearson_ponderado(
+            contagens, postos_real.postos(contagens), postos_simulado.postos(contagens)
+        ),
+        "pearson": _pearson_ponderado(contagens, real, simulado),
+        "bias": contagens @ diferenca / num_itens,
+        "rmse": np.sqrt(contagens @ diferenca**2 / num_itens),
+    }
+    if acertos_faixa is not None:
+        metricas["acuracia"] = contagens @ acertos_faixa / num_itens
+    return metricas
+
+
+def _permutacao_lote(
+    real: np.ndarray,
+    simulado: np.ndarray,
+    permutacoes: np.ndarray,
+    sinais: np.ndarray,
+    limites: Optional[np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Métricas sob a hipótese nula de um lote de permutações (matriz de índices
+    (permutações, itens)) de `simulado`. Permutar não muda os postos nem as
+    médias e variâncias, então as correlações e o RMSE só dependem do produto
+    cruzado. O BIAS usa troca aleatória de sinais das diferenças (`sinais`).
+    """
+    num_itens = len(real)
+
+    def produto_padronizado(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        x = (x - x.mean()) / x.std()
+        y = (y - y.mean()) / y.std()
+        with np.errstate(invalid="ignore"):
+            return y[permutacoes] @ x / num_itens
+
+    metricas = {
+        "spearman": produto_padronizado(rankdata(real), rankdata(simulado)),
+        "pearson": produto_padronizado(real, simulado),
+        "bias": sinais @ (simulado - real) / num_itens,
+        "rmse": np.sqrt(
+            (np.sum(real**2) + np.sum(simulado**2) - 2 * simulado[permutacoes] @ real)
+            / num_itens
+        ),
+    }
+    if limites is not None:
+        faixas_simulado = _faixas(simulado, limites)
+        metricas["acuracia"] = (
+            faixas_simulado[permutacoes] == _faixas(real, limites)
+        ).mean(axis=1)
+    return metricas
+
+
+def significancia_metricas(
+    real: Sequence[float],
+    simulado: Sequence[float],
+    limites: Optional[Sequence[float]] = None,
+    num_reamostras: int = 10_000,
+    confianca: float = 0.95,
+    semente: Optional[int] = None,
+    tamanho_lote: int = 2_000,
+) -> pd.DataFrame:
+    """
+    Intervalos de confiança bootstrap (percentis, reamostrando os itens) e
+    p-valores de permutação das métricas de recuperação de um parâmetro.
+
+    As reamostras são geradas em lotes como matrizes de índices e avaliadas
+    com operações vetorizadas: no bootstrap, cada reamostra vira um vetor de
+    contagens por item (as somas viram produtos de matrizes e os postos do
+    Spearman saem das contagens acumuladas sobre os valores ordenados uma
+    única vez); na permutação, os postos são calculados uma única vez.
+
+    Os limites das faixas da acurácia ficam fixos em todas as reamostras.
+
+    Args:
+        real (Sequence[float]): Valores reais (pares com NaN são descartados)
+        simulado (Sequence[float]): Valores simulados
+        limites (Optional[Sequence[float]]): Cortes internos das faixas da
+            acurácia (None = sem acurácia)
+        num_reamostras (int): Reamostras bootstrap e permutações
+        confianca (float): Nível de confiança dos intervalos
+        semente (Optional[int]): Semente das reamostragens
+        tamanho_lote (int): Reamostras avaliadas por vez (limita a memória)
+
+    Returns:
+        pd.DataFrame: Uma linha por métrica com valor, ic_inf, ic_sup e p_valor.
+    """
+    if num_reamostras < 1:
+        raise ValueError("num_reamostras deve ser maior ou igual a 1.")
+    if not 0 < confianca < 1:
+        raise ValueError("confianca deve estar entre 0 e 1.")
+
+    real = np.asarray(real, dtype=float)
+    simulado = np.asarray(simulado, dtype=float)
+    validos = ~np.isnan(real) & ~np.isnan(simulado)
+    real, simulado = real[validos], simulado[validos]
+    num_itens = len(real)
+    if num_itens < 3:
+        raise ValueError("São necessários ao menos 3 itens com valores reais e simulados.")
+    limites = np.asarray(limites, dtype=float) if limites is not None else None
+
+    observadas = metricas_pareadas(real, simulado, limites)
+    postos_real = _PostosReamostra(real)
+    postos_simulado = _PostosReamostra(simulado)
+    acertos_faixa = (
+        (_faixas(real, limites) == _faixas(simulado, limites)).astype(float)
+        if limites is not None
+        else None
+    )
+
+    rng = np.random.default_rng(semente)
+    bootstrap: Dict[str, list] = {nome: [] for nome in observadas}
+    permutacao: Dict[str, list] = {nome: [] for nome in observadas}
+    for inicio in range(0, num_reamostras, tamanho_lote):
+        tamanho = min(tamanho_lote, num_reamostras - inicio)
+
+        indices = rng.integers(0, num_itens, (tamanho, num_itens))
+        for nome, valores in _bootstrap_lote(
+            real, simulado, indices, postos_real, postos_simulado, acertos_faixa
+        ).items():
+            bootstrap[nome].append(valores)
+
+        permutacoes = rng.permuted(
+            np.broadcast_to(np.arange(num_itens), (tamanho, num_itens)), axis=1
+        )
+        sinais = rng.choice([-1.0, 1.0], (tamanho, num_itens))
+        for nome, valores in _permutacao_lote(
+            real, simulado, permutacoes, sinais, limites
+        ).items():
+            permutacao[nome].append(valores)
+
+    alfa = (1 - confianca) / 2
+    linhas = []
+    for nome, valor in observadas.items():
+        replicas = np.concatenate(bootstrap[nome])
+        nulas = np.concatenate(permutacao[nome])
+        sentido = SENTIDO_TESTE[nome]
+        if sentido == "maior":
+            extremos = nulas >= valor
+        elif sentido == "menor":
+            extremos = nulas <= valor
+        else:
+            extremos = np.abs(nulas) >= abs(valor)
+        ic_inf, ic_sup = np.nanquantile(replicas, [alfa, 1 - alfa])
+        linhas.append(
+            {
+                "metrica": nome,
+                "valor": valor,
+                "ic_inf": float(ic_inf),
+                "ic_sup": float(ic_sup),
+                "p_valor": float((np.count_nonzero(extremos) + 1) / (len(nulas) + 1)),
+            }
+        )
+    return pd.DataFrame(linhas)
+
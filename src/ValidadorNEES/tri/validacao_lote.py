@@ -0,0 +1,325 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, TypeAlias, Union
+
+import numpy as np
+import pandas as pd
+
+from .cache_estimativas import CacheEstimativas
+from .estimador import EstimadorTRI, MetodoEstimacao
+from .estimador_mml import ModeloTRI
+from .validador import ValidadorTRI
+
+MetodoLigacao: TypeAlias = Literal["ancoras", "real"]
+
+# Métricas que deixam de ser informativas quando a edição é ligada aos próprios
+# parâmetros reais: a ligação iguala média e desvio de B aos reais (BIAS de B
+# nulo por construção) e reduz artificialmente os erros de A e B
+METRICAS_CIRCULARES: Tuple[str, ...] = ("a_bias", "a_rmse", "b_bias", "b_rmse")
+
+
+def carregar_parametros_reais(
+    caminho_itens: Union[str, Path], linguas_excluidas: Sequence[int] = (0, 1)
+) -> pd.DataFrame:
+    """
+    Lê os parâmetros reais dos itens de um CSV de enunciados do ENEM (CO_ITEM,
+    NU_PARAM_A, NU_PARAM_B, PROB_ACERTO e, se houver, NU_PARAM_C e TP_LINGUA) no
+    formato do `ValidadorTRI` (ID_QUESTÃO, A, B, PROB_ACERTO e C). Itens de
+    língua estrangeira (`linguas_excluidas`) e sem parâmetros são descartados.
+    """
+    if not os.path.isfile(caminho_itens):
+        raise ValueError(f"O arquivo de itens {caminho_itens} não existe!")
+
+    df_itens = pd.read_csv(caminho_itens)
+    if "TP_LINGUA" in df_itens.columns:
+        df_itens = df_itens[~df_itens["TP_LINGUA"].isin(linguas_excluidas)]
+    if "NU_PARAM_C" not in df_itens.columns:
+        df_itens = df_itens.assign(NU_PARAM_C=0.0)
+
+    return (
+        df_itens[["CO_ITEM", "NU_PARAM_A", "NU_PARAM_B", "NU_PARAM_C", "PROB_ACERTO"]]
+        .dropna(subset=["NU_PARAM_A", "NU_PARAM_B"])
+        .rename(
+            columns={
+                "CO_ITEM": "ID_QUESTÃO",
+                "NU_PARAM_A": "A",
+                "NU_PARAM_B": "B",
+                "NU_PARAM_C": "C",
+            }
+        )
+        .reset_index(drop=True)
+    )
+
+
+class EdicaoProva:
+    """
+    Uma edição do ENEM a validar: parâmetros reais dos itens e resultados da
+    simulação correspondente.
+
+    Attributes:
+        nome (str): Identificação da edição (ex: "2017")
+        caminho_itens (Path): CSV de enunciados com os parâmetros reais
+        caminho_resultados (Path): CSV de resultados da simulação
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        caminho_itens: Union[str, Path],
+        caminho_resultados: Union[str, Path],
+    ) -> None:
+        self.nome = nome
+        self.caminho_itens = Path(caminho_itens)
+        self.caminho_resultados = Path(caminho_resultados)
+
+    def __repr__(self) -> str:
+        return (
+            f"EdicaoProva(nome={self.nome!r}, caminho_itens={str(self.caminho_itens)!r}, "
+            f"caminho_resultados={str(self.caminho_resultados)!r})"
+        )
+
+
+def _processar_edicao(
+    edicao: EdicaoProva,
+    metodo: MetodoEstimacao,
+    modelo: ModeloTRI,
+    diretorio_cache: Optional[Path],
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """
+    Pipeline de uma edição (executado em um processo do pool): carrega os
+    parâmetros reais e os resultados, estima os parâmetros e calcula as métricas
+    de % de acerto (que não dependem da escala).
+    """
+    df_real = carregar_parametros_reais(edicao.caminho_itens)
+
+    if not edicao.caminho_resultados.is_file():
+        raise ValueError(f"Resultados não encontrados: {edicao.caminho_resultados}")
+    df_respostas = pd.read_csv(edicao.caminho_resultados)
+    df_respostas = df_respostas[df_respostas["item_id"].isin(df_real["ID_QUESTÃO"])]
+    if df_respostas.empty:
+        raise ValueError(
+            f"Edição {edicao.nome}: nenhum item dos resultados tem parâmetros reais."
+        )
+
+    cache = CacheEstimativas(diretorio_cache) if diretorio_cache is not None else None
+    df_simulado = EstimadorTRI.estimar_parametros(
+        df_respostas, metodo, modelo, cache=cache
+    )
+    df_real = df_real[df_real["ID_QUESTÃO"].isin(df_simulado["ID_QUESTÃO"])]
+
+    validador = ValidadorTRI(df_real, df_simulado)
+    metricas = {
+        f"prob_de_acerto_{nome}": valor
+        for nome, valor in validador.obter_metricas_parametro("PROB_ACERTO").items()
+    }
+    metricas["acuracia"] = validador.obter_dados_discretos_para_relatorio()["metricas"][
+        "acuracia"
+    ]
+    metricas["num_itens"] = len(df_simulado)
+    metricas["num_respostas"] = len(df_respostas)
+
+    return df_real, df_simulado.reset_index(drop=True), metricas
+
+
+def constantes_media_desvio(
+    b_referencia: Sequence[float], b_novo: Sequence[float]
+) -> Tuple[float, float]:
+    """
+    Constantes (A, B) do método média/desvio: b na escala de referência =
+    A * b + B (e a = a / A).
+    """
+    b_referencia = np.asarray(b_referencia, dtype=float)
+    b_novo = np.asarray(b_novo, dtype=float)
+    if len(b_referencia) < 2 or len(b_novo) < 2:
+        raise ValueError("São necessários ao menos 2 itens para a ligação.")
+
+    inclinacao = float(np.std(b_referencia, ddof=1) / np.std(b_novo, ddof=1))
+    intercepto = float(np.mean(b_referencia) - inclinacao * np.mean(b_novo))
+    return inclinacao, intercepto
+
+
+def transformar_escala(
+    df_parametros: pd.DataFrame, inclinacao: float, intercepto: float
+) -> pd.DataFrame:
+    """Aplica a transformação linear de escala aos parâmetros A e B (C e
+    PROB_ACERTO não mudam)."""
+    df_transformado = df_parametros.copy()
+    df_transformado["A"] = df_parametros["A"] / inclinacao
+    df_transformado["B"] = inclinacao * df_parametros["B"] + intercepto
+    return df_transformado
+
+
+class ResultadoLote:
+    """
+    Resultado de `validar_edicoes`.
+
+    Attributes:
+        tabela (pd.DataFrame): Uma linha por edição com as métricas de
+            recuperação (% de acerto, acurácia e A/B após a ligação) e as
+            constantes e o método da ligação (`ligacao_metodo`)
+        parametros (pd.DataFrame): Parâmetros reais e estimados (já na escala
+            comum) de todos os itens, com a coluna EDICAO
+    """
+
+    def __init__(self, tabela: pd.DataFrame, parametros: pd.DataFrame) -> None:
+        self.tabela = tabela
+        self.parametros = parametros
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultadoLote(edicoes={len(self.tabela)}, "
+            f"itens={len(self.parametros)})"
+        )
+
+
+def _constantes_ligacao(
+    resultados: Dict[str, Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]],
+    ligacao: MetodoLigacao,
+    referencia: str,
+) -> Dict[str, Tuple[float, float, int, Optional[MetodoLigacao]]]:
+    """(A, B, número de itens usados, método efetivamente usado) da ligação
+    de cada edição. A edição de referência no método "ancoras" não é
+    transformada (método None)."""
+    constantes: Dict[str, Tuple[float, float, int, Optional[MetodoLigacao]]] = {}
+    df_referencia = resultados[referencia][1].assign(
+        ID_QUESTÃO=lambda df: df["ID_QUESTÃO"].astype(str)
+    )
+
+    for nome, (df_real, df_simulado, _) in resultados.items():
+        if ligacao == "ancoras" and nome == referencia:
+            constantes[nome] = (1.0, 0.0, len(df_simulado), None)
+            continue
+
+        if ligacao == "ancoras":
+            ancoras = df_simulado.assign(
+                ID_QUESTÃO=lambda df: df["ID_QUESTÃO"].astype(str)
+            ).merge(df_referencia, on="ID_QUESTÃO", suffixes=("", "_referencia"))
+            if len(ancoras) >= 2:
+                inclinacao, intercepto = constantes_media_desvio(
+                    ancoras["B_referencia"], ancoras["B"]
+                )
+                constantes[nome] = (inclinacao, intercepto, len(ancoras), "ancoras")
+                continue
+            print(
+                f"AVISO: a edição {nome} tem {len(ancoras)} itens em comum com "
+                f"{referencia}; usando média/desvio dos parâmetros reais."
+            )
+
+        # Média/desvio contra os parâmetros reais da própria edição (escala ENEM)
+        pares = df_simulado.merge(
+            df_real, on="ID_QUESTÃO", suffixes=("", "_real")
+        )
+        inclinacao, intercepto = constantes_media_desvio(pares["B_real"], pares["B"])
+        constantes[nome] = (inclinacao, intercepto, len(pares), "real")
+
+    return constantes
+
+
+def validar_edicoes(
+    edicoes: Sequence[EdicaoProva],
+    ligacao: Optional[MetodoLigacao] = "ancoras",
+    edicao_referencia: Optional[str] = None,
+    metodo: MetodoEstimacao = "MML",
+    modelo: ModeloTRI = "2PL",
+    num_processos: Optional[int] = None,
+    diretorio_cache: Optional[Union[str, Path]] = None,
+) -> ResultadoLote:
+    """
+    Valida várias edições em paralelo: cada edição (carga, estimação e
+    validação) roda em um processo do pool. Em seguida os parâmetros estimados
+    são postos em uma escala comum e as métricas de A e B são calculadas.
+
+    Ligação (método média/desvio):
+    - "ancoras": itens em comum com a edição de referência (a primeira, por
+      padrão); edições sem ao menos 2 itens em comum caem no método "real";
+    - "real": parâmetros reais de cada edição (escala do ENEM);
+    - None: sem ligação (cada edição na escala da própria estimação).
+
+    Uma edição ligada pelos próprios parâmetros reais ("real" ou a falta de
+    âncoras) é comparada com os mesmos valores usados na ligação: nesse caso
+    só as correlações de A e B são informativas, e as `METRICAS_CIRCULARES`
+    (BIAS e RMSE) ficam NaN na tabela.
+
+    Args:
+        edicoes (Sequence[EdicaoProva]): Edições a validar (nomes únicos)
+        ligacao (Optional[MetodoLigacao]): Método de ligação das escalas
+        edicao_referencia (Optional[str]): Nome da edição de referência
+        metodo (MetodoEstimacao): Método de `EstimadorTRI.estimar_parametros`
+        modelo (ModeloTRI): Modelo TRI estimado
+        num_processos (Optional[int]): Processos do pool (None = um por edição,
+            limitado ao número de núcleos)
+        diretorio_cache (Optional[Union[str, Path]]): Diretório de um
+            `CacheEstimativas` compartilhado pelos processos (None = sem cache)
+
+    Returns:
+        ResultadoLote: Tabela consolidada e parâmetros de todas as edições.
+    """
+    nomes = [edicao.nome for edicao in edicoes]
+    if not edicoes:
+        raise ValueError("Nenhuma edição informada.")
+    if len(set(nomes)) < len(nomes):
+        raise ValueError("Os nomes das edições devem ser únicos.")
+    referencia = edicao_referencia or nomes[0]
+    if referencia not in nomes:
+        raise ValueError(f"Edição de referência '{referencia}' não está no lote.")
+
+    num_processos = num_processos or min(len(edicoes), os.cpu_count() or 1)
+    diretorio_cache = Path(diretorio_cache) if diretorio_cache is not None else None
+    resultados: Dict[str, Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]] = {}
+
+    print(f"Validando {len(edicoes)} edições com {num_processos} processos...")
+    with ProcessPoolExecutor(max_workers=num_processos) as executor:
+        futuros = {
+            executor.submit(
+                _processar_edicao, edicao, metodo, modelo, diretorio_cache
+            ): edicao.nome
+            for edicao in edicoes
+        }
+        for futuro in as_completed(futuros):
+            nome = futuros[futuro]
+            resultados[nome] = futuro.result()
+            print(f"  Edição {nome} concluída.")
+
+    constantes = (
+        _constantes_ligacao(resultados, ligacao, referencia)
+        if ligacao is not None
+        else {nome: (1.0, 0.0, 0, None) for nome in nomes}
+    )
+
+    linhas_tabela: List[Dict[str, Any]] = []
+    parametros: List[pd.DataFrame] = []
+    for nome in nomes:
+        df_real, df_simulado, metricas = resultados[nome]
+        inclinacao, intercepto, num_itens_ligacao, metodo_ligacao = constantes[nome]
+        df_ligado = transformar_escala(df_simulado, inclinacao, intercepto)
+
+        validador = ValidadorTRI(df_real, df_ligado)
+        linha: Dict[str, Any] = {"EDICAO": nome, **metricas}
+        for parametro in ("A", "B"):
+            for metrica, valor in validador.obter_metricas_parametro(parametro).items():
+                linha[f"{parametro.lower()}_{metrica}"] = valor
+        if metodo_ligacao == "real":
+            linha.update(dict.fromkeys(METRICAS_CIRCULARES, np.nan))
+        linha.update(
+            {
+                "ligacao_metodo": metodo_ligacao,
+                "ligacao_a": inclinacao,
+                "ligacao_b": intercepto,
+                "ligacao_num_itens": num_itens_ligacao,
+            }
+        )
+        linhas_tabela.append(linha)
+
+        parametros.append(
+            validador.df_real.join(
+                validador.df_simulado, lsuffix="_REAL", rsuffix="_ESTIMADO"
+            )
+            .reset_index()
+            .assign(EDICAO=nome)
+        )
+
+    return ResultadoLote(
+        tabela=pd.DataFrame(linhas_tabela),
+        parametros=pd.concat(parametros, ignore_index=True),
+    )
@@ -1,14 +1,19 @@
 from enum import Enum
-from typing import Any, Dict, Final, Literal, Set, TypeAlias
+from typing import Any, Dict, Final, Literal, Optional, Sequence, Set, TypeAlias
 
 import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score, confusion_matrix
 
+from ..core.respondente import Respondente
+from .estimador_habilidade import EstimadorHabilidade, MetodoHabilidade
+from .significancia import significancia_metricas
+
 ParametroInteresse: TypeAlias = Literal[
     "A", "B", "PROB_ACERTO"
 ]  # parâmetros TRI de interesse
 CorrelationMethod: TypeAlias = Literal["pearson", "spearman"]
+OrigemParametros: TypeAlias = Literal["real", "simulado"]
 
 
 class BinDificuldade(Enum):
@@ -43,10 +48,9 @@ class ValidadorTRI:
 
             df_parametros_simulados: pd.DataFrame = Dataframe contendo os parâmetros (a, b) simulados.
         """
-        df_real = df_parametros_reais.copy(deep=True)
-        df_simulado = df_parametros_simulados.copy(deep=True)
-
-        self._verificar_esquema(df_real, df_simulado)
+        # Sem cópias: `_alinhar_dataframes` guarda novos DataFrames (set_index),
+        # então os originais não são alterados
+        self._verificar_esquema(df_parametros_reais, df_parametros_simulados)
         self._alinhar_dataframes(df_parametros_reais, df_parametros_simulados)
         self._calcular_limites_dificuldade()
 
@@ -131,6 +135,60 @@ class ValidadorTRI:
         ) ** 2
         return float(np.sqrt(np.mean(diferenca_quadratica)))
 
+    def obter_metricas_parametro(self, parametro: ParametroInteresse) -> Dict[str, float]:
+        """
+        Correlações (Spearman e Pearson), BIAS e RMSE entre os valores reais e
+        simulados de um parâmetro (A, B ou PROB_ACERTO).
+        """
+        return {
+            "spearman": self._calcular_correlacao("spearman", parametro),
+            "pearson": self._calcular_correlacao("pearson", parametro),
+            "bias": self._calcular_bias(parametro),
+            "rmse": self._calcular_rmse(parametro),
+        }
+
+    def obter_significancia(
+        self,
+        parametros: Sequence[ParametroInteresse] = ("A", "B", "PROB_ACERTO"),
+        num_reamostras: int = 10_000,
+        confianca: float = 0.95,
+        semente: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Incerteza das métricas: intervalo de confiança bootstrap (reamostrando
+        as questões) e p-valor de permutação (hipótese nula: nenhuma associação
+        entre valores reais e simulados) de Spearman, Pearson, BIAS e RMSE de
+        cada parâmetro e da acurácia da análise discreta (PROB_ACERTO).
+
+        Args:
+            parametros (Sequence[ParametroInteresse]): Parâmetros analisados
+            num_reamostras (int): Reamostras bootstrap e permutações
+            confianca (float): Nível de confiança dos intervalos
+            semente (Optional[int]): Semente das reamostragens
+
+        Returns:
+            pd.DataFrame: Uma linha por parâmetro e métrica, com as colunas
+            parametro, metrica, valor, ic_inf, ic_sup e p_valor.
+        """
+        tabelas = []
+        for parametro in parametros:
+            limites = (
+                self.limites_dificuldades[1:-1] if parametro == "PROB_ACERTO" else None
+            )
+            tabela = significancia_metricas(
+                self.df_real[parametro].to_numpy(dtype=float),
+                self.df_simulado[parametro].to_numpy(dtype=float),
+                limites=limites,
+                num_reamostras=num_reamostras,
+                confianca=confianca,
+                semente=semente,
+            )
+            tabelas.append(tabela.assign(parametro=parametro))
+
+        return pd.concat(tabelas, ignore_index=True)[
+            ["parametro", "metrica", "valor", "ic_inf", "ic_sup", "p_valor"]
+        ]
+
     def _calcular_limites_dificuldade(self) -> None:
         """Calcula os pontos de corte de dificuldade com base nos quantis dos dados REAIS."""
         quantis = [0, 0.25, 0.50, 1.0]
@@ -247,3 +305,91 @@ class ValidadorTRI:
             },
             "labels": labels,
         }
+
+    def obter_dados_habilidade_para_relatorio(
+        self,
+        df_resultados: pd.DataFrame,
+        metodo: MetodoHabilidade = "EAP",
+        parametros: OrigemParametros = "real",
+        constante_d: float = 1.0,
+    ) -> Dict[str, Any]:
+        """
+        Verifica se as respostas geradas pela LLM recuperam a habilidade
+        (theta) dos respondentes simulados: estima theta de cada respondente
+        com os parâmetros reais (ou simulados) dos itens e compara com
+        `habilidade_respondente`, no geral e por faixa (os 7 níveis da persona).
+
+        Args:
+            df_resultados (pd.DataFrame): Resultados da simulação (respondente_id,
+                habilidade_respondente, item_id, acertou)
+            metodo (MetodoHabilidade): "EAP", "MAP" ou "ML"
+            parametros (OrigemParametros): Parâmetros dos itens usados na
+                estimação: "real" (ENEM) ou "simulado" (estimados). A coluna C é
+                usada se existir (3PL).
+            constante_d (float): Constante de escala D do modelo logístico
+        """
+        df_parametros = self.df_real if parametros == "real" else self.df_simulado
+        coluna_c = (
+            df_parametros["C"]
+            if "C" in df_parametros.columns
+            else pd.Series(0.0, index=df_parametros.index)
+        )
+        parametros_itens = {
+            id_item: (float(a), float(b), float(c))
+            for id_item, a, b, c in zip(
+                df_parametros.index, df_parametros["A"], df_parametros["B"], coluna_c
+            )
+        }
+
+        df_theta = EstimadorHabilidade(
+            parametros_itens, metodo=metodo, constante_d=constante_d
+        ).estimar(df_resultados)
+
+        habilidades = df_resultados.drop_duplicates("respondente_id").set_index(
+            "respondente_id"
+        )["habilidade_respondente"]
+        df_theta["habilidade_respondente"] = (
+            df_theta["respondente_id"].map(habilidades).astype(float)
+        )
+        df_theta["faixa"] = np.asarray(Respondente.NOMES_NIVEIS)[
+            np.searchsorted(
+                np.array(Respondente.LIMITES_NIVEIS),
+                df_theta["habilidade_respondente"].to_numpy() - 0.8,
+                side="left",
+            )
+        ]
+        df_theta["erro"] = df_theta["theta_estimado"] - df_theta["habilidade_respondente"]
+
+        validos = df_theta.dropna(subset=["theta_estimado", "habilidade_respondente"])
+        metricas_por_faixa = (
+            validos.assign(erro_quadratico=validos["erro"] ** 2)
+            .groupby("faixa", sort=False)
+            .agg(
+                n=("erro", "size"),
+                habilidade_media=("habilidade_respondente", "mean"),
+                theta_medio=("theta_estimado", "mean"),
+                bias=("erro", "mean"),
+                rmse=("erro_quadratico", "mean"),
+                erro_padrao_medio=("erro_padrao", "mean"),
+            )
+            .reindex([nome for nome in Respondente.NOMES_NIVEIS])
+            .dropna(subset=["n"])
+        )
+        metricas_por_faixa["rmse"] = np.sqrt(metricas_por_faixa["rmse"])
+
+        return {
+            "metricas": {
+                "theta_correlacao_pearson": float(
+                    validos["theta_estimado"].corr(validos["habilidade_respondente"])
+                ),
+                "theta_correlacao_spearman": float(
+                    validos["theta_estimado"].corr(
+                        validos["habilidade_respondente"], method="spearman"
+                    )
+                ),
+                "theta_bias": float(validos["erro"].mean()),
+                "theta_rmse": float(np.sqrt((validos["erro"] ** 2).mean())),
+            },
+            "metricas_por_faixa": metricas_por_faixa,
+            "df_habilidades": df_theta,
+        }
@@ -7,6 +7,8 @@ import pandas as pd
 import seaborn as sns
 
 # Supondo que os seus módulos estejam na estrutura src/
+from src.ValidadorNEES.tri.cache_estimativas import CacheEstimativas
+from src.ValidadorNEES.tri.calibracao import carregar_calibrador
 from src.ValidadorNEES.tri.estimador import EstimadorTRI
 from src.ValidadorNEES.tri.validador import BinDificuldade, ValidadorTRI
 
@@ -23,6 +25,15 @@ enunciados_path = (
 respostas_path = (
     current_path / "data" / "03_processed" / "resultados_simulacao_2017.csv"
 )
+# Estimativas já calculadas para as mesmas respostas são reaproveitadas
+cache_estimativas_path = current_path / "data" / "03_processed" / "cache_estimativas"
+# Gerado por calibrar_probabilidade.py; sem ele, usa a sigmoide fixa
+calibrador_path = (
+    current_path
+    / "data"
+    / "03_processed"
+    / "calibrador_google_gemini-1.5-flash-8b.json"
+)
 
 # --- 2. PREPARAÇÃO DO DATAFRAME DE PARÂMETROS REAIS (df_real) ---
 colunas_para_carregar = [
@@ -53,13 +64,29 @@ df_real = df_parametros_reais.rename(
 df_respostas = pd.read_csv(respostas_path)
 ids_questoes_validas = df_real["ID_QUESTÃO"].unique()
 df_respostas_filtrado = df_respostas[df_respostas["item_id"].isin(ids_questoes_validas)]
-df_simulado = EstimadorTRI.estimar_parametros(df_respostas_filtrado)  # type: ignore
+cache_estimativas = CacheEstimativas(cache_estimativas_path, max_entradas=32)
+calibrador = carregar_calibrador(calibrador_path) if calibrador_path.is_file() else None
+df_simulado = EstimadorTRI.estimar_parametros(
+    df_respostas_filtrado, cache=cache_estimativas, calibrador=calibrador  # type: ignore
+)
+print(f"Cache de estimativas: {cache_estimativas.estatisticas()}")
 
 # --- 4. EXECUÇÃO DA VALIDAÇÃO ---
 print("\n--- Iniciando a Validação dos Parâmetros ---")
 validador = ValidadorTRI(df_real, df_simulado)
 dados_continuos = validador.obter_dados_continuos_para_relatorio()
 dados_discretos = validador.obter_dados_discretos_para_relatorio()
+# IC 95% bootstrap e p-valor de permutação de cada métrica (poucos itens = muito ruído)
+significancia = validador.obter_significancia(
+    parametros=["PROB_ACERTO"], num_reamostras=10_000, semente=2017
+).set_index("metrica")
+print(significancia.to_string())
+
+
+def formatar_ic(metrica: str, formato: str = ".3f") -> str:
+    linha = significancia.loc[metrica]
+    return f"[{linha['ic_inf']:{formato}}, {linha['ic_sup']:{formato}}]"
+
 
 # --- 5. GERAÇÃO DO RELATÓRIO VISUAL ---
 print("--- Gerando o relatório visual ---")
@@ -91,7 +118,8 @@ ax1.legend()
 ax1.text(
     0.05,
     0.95,
-    f"Corr = {corr_prob:.3f}",
+    f"Corr = {corr_prob:.3f} {formatar_ic('spearman')}\n"
+    f"p = {significancia.loc['spearman', 'p_valor']:.4f}",
     transform=ax1.transAxes,
     fontsize=12,
     verticalalignment="top",
@@ -121,10 +149,14 @@ ax4 = axes[1, 1]
 ax4.axis("off")  # Oculta os eixos do gráfico
 metricas_texto = (
     f"**ANÁLISE CONTÍNUA**\n"
-    f"RMSE (% de acerto): {dados_continuos['metricas']['prob_de_acerto_rmse']:.3f}\n"
-    f"BIAS (% de acerto): {dados_continuos['metricas']['prob_de_acerto_bias']:.3f}\n"
+    f"RMSE (% de acerto): {dados_continuos['metricas']['prob_de_acerto_rmse']:.3f} "
+    f"{formatar_ic('rmse')}\n"
+    f"BIAS (% de acerto): {dados_continuos['metricas']['prob_de_acerto_bias']:.3f} "
+    f"{formatar_ic('bias')}\n"
     f"**ANÁLISE DISCRETA**\n"
-    f"Acurácia: {dados_discretos['metricas']['acuracia']:.2%}"
+    f"Acurácia: {dados_discretos['metricas']['acuracia']:.2%} "
+    f"{formatar_ic('acuracia', '.2%')} (p = {significancia.loc['acuracia', 'p_valor']:.4f})\n"
+    f"(IC 95% bootstrap; p-valor de permutação)"
 )
 ax4.text(
     0.0,
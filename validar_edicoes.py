@@ -0,0 +1,54 @@
+# Arquivo: validar_edicoes.py (na pasta raiz do projeto)
+
+from pathlib import Path
+
+from src.ValidadorNEES.tri.validacao_lote import EdicaoProva, validar_edicoes
+
+PROJECT_ROOT = Path(__file__).parent
+
+# --- CONFIGURAÇÃO ---
+# Edições a validar: (nome, CSV de enunciados com parâmetros reais, CSV de resultados)
+EDICOES = [
+    EdicaoProva(
+        "2017",
+        PROJECT_ROOT / "data" / "01_raw" / "ENEM" / "2022" / "2017_ENUNCIADOS_SEM_IMAGEM.csv",
+        PROJECT_ROOT / "data" / "03_processed" / "resultados_simulacao_2017.csv",
+    ),
+]
+# "ancoras": itens em comum com a edição de referência; "real": escala do ENEM
+# (parâmetros reais de cada edição; só as correlações de A e B são
+# informativas, BIAS/RMSE ficam NaN); None: sem ligação
+LIGACAO = "ancoras"
+EDICAO_REFERENCIA = None  # None = primeira edição
+METODO_ESTIMACAO = "MML"
+MODELO_TRI = "2PL"
+NUM_PROCESSOS = None  # None = um processo por edição (até o número de núcleos)
+# Estimativas de respostas já estimadas são reaproveitadas (None = sem cache)
+DIRETORIO_CACHE_ESTIMATIVAS = PROJECT_ROOT / "data" / "03_processed" / "cache_estimativas"
+CAMINHO_TABELA = PROJECT_ROOT / "data" / "04_reports" / "recuperacao_edicoes.csv"
+CAMINHO_PARAMETROS = PROJECT_ROOT / "data" / "04_reports" / "parametros_edicoes.csv"
+
+
+def main() -> None:
+    resultado = validar_edicoes(
+        EDICOES,
+        ligacao=LIGACAO,
+        edicao_referencia=EDICAO_REFERENCIA,
+        metodo=METODO_ESTIMACAO,
+        modelo=MODELO_TRI,
+        num_processos=NUM_PROCESSOS,
+        diretorio_cache=DIRETORIO_CACHE_ESTIMATIVAS,
+    )
+
+    CAMINHO_TABELA.parent.mkdir(parents=True, exist_ok=True)
+    resultado.tabela.to_csv(CAMINHO_TABELA, index=False)
+    resultado.parametros.to_csv(CAMINHO_PARAMETROS, index=False)
+
+    print("\n--- Recuperação por edição ---")
+    print(resultado.tabela.to_string(index=False))
+    print(f"\nTabela salva em '{CAMINHO_TABELA}'.")
+    print(f"Parâmetros salvos em '{CAMINHO_PARAMETROS}'.")
+
+
+if __name__ == "__main__":
+    main()